@@ -0,0 +1,115 @@
+"""Per-message cost of the compiled body fast path vs. FastAPI's full one.
+
+A handler taking only a pydantic model skips FastAPI's dependency
+solving and validates the raw JSON in one pass. This publishes
+`MESSAGES` records through FastStream's in-process test brokers - which
+call handlers inline, so the difference is all decode overhead - once
+with the fast path and once with it switched off:
+
+    python benchmarks/body_decode.py
+"""
+
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import AbstractAsyncContextManager
+
+from faststream.confluent import TestKafkaBroker
+from faststream.rabbit import TestRabbitBroker
+from pydantic import BaseModel
+
+from fastloom.signals import route
+from fastloom.signals.kafka.depends import KafkaSubscriber
+from fastloom.signals.kafka.settings import KafkaSubscriptable
+from fastloom.signals.rabbit.depends import (
+    RabbitSubscriber,
+    RabbitSubscriptable,
+)
+
+MESSAGES = 5_000
+TOPIC = "fastloom.benchmark.body"
+
+
+class Item(BaseModel):
+    sku: str
+    qty: int
+
+
+class Order(BaseModel):
+    id: int
+    customer: str
+    items: list[Item]
+
+
+PAYLOAD = Order(
+    id=1,
+    customer="c-1",
+    items=[Item(sku=f"sku-{i}", qty=i) for i in range(10)],
+).model_dump()
+
+type Publish = Callable[[], Awaitable[object]]
+type Setup = Callable[[], tuple[AbstractAsyncContextManager, Publish]]
+
+
+def kafka() -> tuple[AbstractAsyncContextManager, Publish]:
+    KafkaSubscriber(
+        KafkaSubscriptable(
+            ENVIRONMENT="bench", PROJECT_NAME="p", KAFKA_URI="localhost:1"
+        )
+    )
+
+    @KafkaSubscriber.router.subscriber(TOPIC, group_id="bench")
+    async def handler(order: Order): ...
+
+    broker = KafkaSubscriber.router.broker
+    return TestKafkaBroker(broker), lambda: broker.publish(PAYLOAD, TOPIC)
+
+
+def rabbit() -> tuple[AbstractAsyncContextManager, Publish]:
+    RabbitSubscriber(
+        RabbitSubscriptable(
+            ENVIRONMENT="bench", PROJECT_NAME="p", RABBIT_URI="amqp://x"
+        )
+    )
+
+    @RabbitSubscriber.subscriber(TOPIC)
+    async def handler(order: Order): ...
+
+    broker = RabbitSubscriber.router.broker
+    return TestRabbitBroker(broker), lambda: broker.publish(
+        PAYLOAD, TOPIC, exchange=RabbitSubscriber.exchange
+    )
+
+
+async def per_message(setup: Setup, unbind: Callable[[], None]) -> float:
+    testing, publish = setup()
+    try:
+        async with testing:
+            for _ in range(100):  # warm-up
+                await publish()
+            started = time.perf_counter()
+            for _ in range(MESSAGES):
+                await publish()
+            return (time.perf_counter() - started) / MESSAGES
+    finally:
+        unbind()
+
+
+async def main() -> None:
+    fast_path_model = route._fast_path_model
+    for name, setup, unbind in (
+        ("kafka", kafka, KafkaSubscriber.unbind),
+        ("rabbit", rabbit, RabbitSubscriber.unbind),
+    ):
+        route._fast_path_model = lambda _dependent: None
+        slow = await per_message(setup, unbind)
+        route._fast_path_model = fast_path_model
+        fast = await per_message(setup, unbind)
+        print(
+            f"{name:<7} full {slow * 1e6:>6.1f}us  fast {fast * 1e6:>6.1f}us"
+            f"  ({1 - fast / slow:.0%} less per message)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""Throughput of `ordered_subscriber` vs. a plain sequential subscriber.
+
+Each handler call awaits `LATENCY` seconds, standing in for I/O, over
+records spread across `KEYS` keys of one partition. A plain subscriber
+handles one record at a time, so it tops out at `1 / LATENCY` records/s;
+`ordered_subscriber` overlaps records of different keys.
+
+By default it runs against FastStream's in-process test broker. With
+`KAFKA_URI` set it produces to a live broker and times consumption from
+the start of the topic:
+
+    python benchmarks/kafka_ordered.py
+
+    docker run -d -p 9092:9092 apache/kafka:3.9.0
+    KAFKA_URI=localhost:9092 python benchmarks/kafka_ordered.py
+"""
+
+import asyncio
+import os
+import time
+import uuid
+from collections.abc import Callable
+
+from faststream.confluent import TestKafkaBroker
+
+from fastloom.signals.kafka.depends import KafkaSubscriber
+from fastloom.signals.kafka.settings import KafkaSubscriptable
+
+RECORDS = 2_000
+KEYS = 64
+LATENCY = 0.002
+CONCURRENCY = 32
+
+
+def register(
+    name: str, register_subscriber: Callable[..., Callable[..., object]]
+) -> tuple[str, asyncio.Event]:
+    topic = f"fastloom.benchmark.{name}.{uuid.uuid4().hex[:8]}"
+    handled = 0
+    finished = asyncio.Event()
+
+    @register_subscriber(topic, group_id=topic, auto_offset_reset="earliest")
+    async def handler(body: dict) -> None:
+        nonlocal handled
+        await asyncio.sleep(LATENCY)
+        handled += 1
+        if handled == RECORDS:
+            finished.set()
+
+    return topic, finished
+
+
+async def produce(topic: str) -> None:
+    for seq in range(RECORDS):
+        await KafkaSubscriber.router.broker.publish(
+            {"seq": seq}, topic, key=f"k{seq % KEYS}".encode()
+        )
+
+
+def report(name: str, elapsed: float) -> None:
+    print(f"{name:<32} {RECORDS / elapsed:>10,.0f} records/s")
+
+
+async def main() -> None:
+    uri = os.getenv("KAFKA_URI")
+    KafkaSubscriber(
+        KafkaSubscriptable(
+            ENVIRONMENT="bench",
+            PROJECT_NAME="fastloom",
+            KAFKA_URI=uri or "localhost:9092",
+        )
+    )
+    runs = {
+        "router.subscriber": register(
+            "plain", KafkaSubscriber.router.subscriber
+        ),
+        f"ordered_subscriber x{CONCURRENCY}": register(
+            "ordered",
+            lambda *topics, **kwargs: KafkaSubscriber.ordered_subscriber(
+                *topics, concurrency=CONCURRENCY, **kwargs
+            ),
+        ),
+    }
+    broker = KafkaSubscriber.router.broker
+
+    if uri is None:
+        # the test broker calls handlers inline from publish
+        async with TestKafkaBroker(broker):
+            for name, (topic, finished) in runs.items():
+                started = time.perf_counter()
+                await produce(topic)
+                await finished.wait()
+                report(name, time.perf_counter() - started)
+        return
+
+    await broker.connect()
+    for topic, _ in runs.values():
+        await produce(topic)
+    started = time.perf_counter()
+    await broker.start()
+    try:
+        # both subscribers consume at once, each on its own topic
+        pending = {name: finished for name, (_, finished) in runs.items()}
+        while pending:
+            for name, finished in list(pending.items()):
+                if finished.is_set():
+                    report(name, time.perf_counter() - started)
+                    del pending[name]
+            await asyncio.sleep(0.01)
+    finally:
+        await broker.stop()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""Producer throughput and latency of each `KafkaTuning` profile.
+
+Throughput publishes `RECORDS` compressible ~1 KiB records with up to
+`IN_FLIGHT` awaiting their delivery report. Latency awaits one record at
+a time, which is what `linger_ms` delays. Needs a live broker:
+
+    docker run -d -p 9092:9092 apache/kafka:3.9.0
+    KAFKA_URI=localhost:9092 python benchmarks/kafka_profiles.py
+"""
+
+import asyncio
+import os
+import statistics
+import time
+import uuid
+
+from fastloom.signals.kafka.depends import KafkaSubscriber
+from fastloom.signals.kafka.profiles import KafkaProfile
+from fastloom.signals.kafka.settings import KafkaSubscriptable
+
+RECORDS = 20_000
+IN_FLIGHT = 1_000
+LATENCY_SAMPLES = 200
+PAYLOAD = {"items": [{"sku": f"sku-{i}", "qty": i} for i in range(40)]}
+
+
+async def throughput(topic: str) -> float:
+    broker = KafkaSubscriber.router.broker
+    slots = asyncio.Semaphore(IN_FLIGHT)
+
+    async def publish(seq: int) -> None:
+        async with slots:
+            await broker.publish(PAYLOAD, topic, key=str(seq).encode())
+
+    started = time.perf_counter()
+    await asyncio.gather(*(publish(seq) for seq in range(RECORDS)))
+    return RECORDS / (time.perf_counter() - started)
+
+
+async def latency(topic: str) -> list[float]:
+    broker = KafkaSubscriber.router.broker
+    latencies = []
+    for _ in range(LATENCY_SAMPLES):
+        started = time.perf_counter()
+        await broker.publish(PAYLOAD, topic)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+async def main() -> None:
+    settings = KafkaSubscriptable(
+        ENVIRONMENT="bench",
+        PROJECT_NAME="fastloom",
+        KAFKA_URI=os.getenv("KAFKA_URI", "localhost:9092"),
+    )
+    profiles: list[KafkaProfile | None] = [
+        None,
+        "low_latency",
+        "balanced",
+        "high_throughput",
+    ]
+    for profile in profiles:
+        KafkaSubscriber(settings, tuning=profile)
+        broker = KafkaSubscriber.router.broker
+        topic = f"fastloom.benchmark.profiles.{uuid.uuid4().hex[:8]}"
+        await broker.connect()
+        try:
+            await broker.publish(PAYLOAD, topic)  # creates the topic
+            rate = await throughput(topic)
+            p50, p99 = (
+                statistics.quantiles(await latency(topic), n=100)[q] * 1e3
+                for q in (49, 98)
+            )
+        finally:
+            await broker.stop()
+            KafkaSubscriber.unbind()
+        print(
+            f"{profile or 'faststream defaults':<20} {rate:>10,.0f} records/s"
+            f"  p50 {p50:>6.1f}ms  p99 {p99:>6.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
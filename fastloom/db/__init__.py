@@ -0,0 +1,9 @@
+from contextvars import ContextVar
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pymongo.asynchronous.client_session import AsyncClientSession
+
+Session: ContextVar["AsyncClientSession | None"] = ContextVar(
+    "mongo_session", default=None
+)
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any
+from zlib import crc32
+
+from opentelemetry import context as otel_context
+from opentelemetry import propagate
+
+from fastloom.date import utcnow
+from fastloom.db import Session
+from fastloom.signals.rabbit.depends import RabbitSubscriber
+
+if TYPE_CHECKING:
+    from pymongo.asynchronous.collection import AsyncCollection
+
+    from fastloom.db.settings import MongoSettings
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_COLLECTION = "signals_outbox"
+
+
+def get_outbox_shard(document_id: Any, shards: int) -> int:
+    """
+    :return: a stable shard for `document_id`, so every event of one
+    document is relayed in order by the same relay
+    """
+    return crc32(str(document_id).encode()) % shards
+
+
+async def enqueue(
+    collection: AsyncCollection,
+    routing_key: str,
+    body: dict[str, Any],
+    shard: int,
+) -> None:
+    """
+    writes the event in the current `MongoTransactionManager` session (if
+    any), so it commits or aborts together with the document itself, with
+    the current trace context for the relay to publish it under
+    """
+    trace: dict[str, str] = {}
+    propagate.inject(trace)
+    await collection.insert_one(
+        {
+            "shard": shard,
+            "routing_key": routing_key,
+            "body": body,
+            "trace": trace,
+            "created_at": utcnow(),
+        },
+        session=Session.get(),
+    )
+
+
+class OutboxRelay:
+    """
+    drains one shard of the signals outbox into RabbitMQ, through the
+    broker's publish middlewares:
+    ```
+    relay = OutboxRelay(collection, shard=0)
+    task = asyncio.create_task(relay.run())
+    ```
+    every pass publishes up to `batch_size` events with pipelined confirms
+    and deletes the confirmed ones, under a `RedisGuardGate` lease so only
+    one relay per shard drains at a time
+    """
+
+    collection: AsyncCollection
+    shard: int
+    batch_size: int
+    interval: float
+    lease_ttl: int
+
+    def __init__(
+        self,
+        collection: AsyncCollection,
+        shard: int = 0,
+        batch_size: int = 100,
+        interval: float = 1.0,
+        lease_ttl: int = 30,
+    ):
+        """
+        :param collection: the outbox collection
+        :param shard: the shard this relay drains
+        :param batch_size: max events published per pass
+        :param interval: seconds to idle after a pass that wasn't full
+        :param lease_ttl: seconds a pass may hold the shard's lease
+        """
+        self.collection = collection
+        self.shard = shard
+        self.batch_size = batch_size
+        self.interval = interval
+        self.lease_ttl = lease_ttl
+
+    async def drain(self) -> int:
+        """
+        :return: number of events confirmed and removed from the outbox
+
+        events that were nacked, returned or timed out stay in the outbox
+        for the next pass
+        """
+        events = (
+            await self.collection.find({"shard": self.shard})
+            .sort("_id", 1)
+            .limit(self.batch_size)
+            .to_list()
+        )
+        if not events:
+            return 0
+        # NOTE: confirms must land well inside the lease, or a second relay
+        # could pick the same events up while this pass still waits on them
+        async with RabbitSubscriber.batch(timeout=self.lease_ttl / 2) as batch:
+            for event in events:
+                # published under the writer's trace, not the relay's
+                token = otel_context.attach(
+                    propagate.extract(event.get("trace") or {})
+                )
+                try:
+                    batch.publish(event["routing_key"], event["body"])
+                finally:
+                    otel_context.detach(token)
+        failed = {failure.index for failure in batch.failures}
+        for failure in batch.failures:
+            logger.warning(
+                f"outbox event {events[failure.index]['_id']} not published:"
+                f" {failure.error!r}"
+            )
+        if published := [
+            event["_id"]
+            for index, event in enumerate(events)
+            if index not in failed
+        ]:
+            await self.collection.delete_many({"_id": {"$in": published}})
+        return len(published)
+
+    async def run(self) -> None:
+        # deferred: fastloom.cache.gate imports the tenant settings, which
+        # import fastloom.db.signals, which imports this module
+        from fastloom.cache.gate import RedisGuardGate
+
+        gate_key = f"{OUTBOX_COLLECTION}:{self.shard}"
+        while True:
+            drained = 0
+            try:
+                async with RedisGuardGate(
+                    gate_key, ttl=self.lease_ttl
+                ) as acquired:
+                    if acquired:
+                        drained = await self.drain()
+            except Exception:
+                logger.exception(f"outbox relay {self.shard} failed a pass")
+            if drained < self.batch_size:
+                await asyncio.sleep(self.interval)
+
+
+async def start_outbox_relays(
+    settings: MongoSettings,
+) -> list[asyncio.Task[None]]:
+    """
+    :return: one running relay task per `MONGO_OUTBOX_SHARDS`
+    """
+    from fastloom.db.lifehooks import get_mongo_client
+
+    client = await get_mongo_client(settings.MONGO_URI)
+    collection = client[settings.MONGO_DATABASE][OUTBOX_COLLECTION]
+    await collection.create_index([("shard", 1), ("_id", 1)])
+    return [
+        asyncio.create_task(
+            OutboxRelay(
+                collection,
+                shard=shard,
+                batch_size=settings.MONGO_OUTBOX_BATCH_SIZE,
+                interval=settings.MONGO_OUTBOX_POLL_INTERVAL,
+            ).run()
+        )
+        for shard in range(settings.MONGO_OUTBOX_SHARDS)
+    ]
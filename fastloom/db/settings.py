@@ -1,6 +1,10 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class MongoSettings(BaseModel):
     MONGO_URI: str
     MONGO_DATABASE: str
+    MONGO_OUTBOX: bool = False
+    MONGO_OUTBOX_SHARDS: int = Field(1, ge=1)
+    MONGO_OUTBOX_BATCH_SIZE: int = Field(100, ge=1)
+    MONGO_OUTBOX_POLL_INTERVAL: float = Field(1.0, gt=0)
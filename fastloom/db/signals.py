@@ -1,6 +1,6 @@
 import logging
 from enum import StrEnum, auto
-from typing import TYPE_CHECKING, Any
+from typing import TYPE_CHECKING, Any, ClassVar
 from uuid import UUID
 
 if TYPE_CHECKING:
@@ -44,6 +44,7 @@ else:
 
 from pydantic import BaseModel, ConfigDict, PrivateAttr, model_validator
 
+from fastloom.db.outbox import OUTBOX_COLLECTION, enqueue, get_outbox_shard
 from fastloom.signals.rabbit.depends import RabbitSubscriber
 
 logger = logging.getLogger(__name__)
@@ -73,6 +74,8 @@ class BaseDocumentSignal(Document):
         default_factory=set
     )
     _PROJECT_NAME: str = ""
+    _OUTBOX: ClassVar[bool] = False
+    _OUTBOX_SHARDS: ClassVar[int] = 1
 
     @model_validator(mode="after")
     def validate_state_management(self):
@@ -93,11 +96,22 @@ class BaseDocumentSignal(Document):
             logger.debug(f"prevented publishing event: {_event_key}")
             return
         logger.debug(f"publishing event: {_event_key}")
-        await self.get_publisher(message.operation).publish(
-            message,
-        )
+        if self._OUTBOX:
+            await self._enqueue(message)
+        else:
+            await self.get_publisher(message.operation).publish(
+                message,
+            )
         self._sent_events.add(_event_key)
 
+    async def _enqueue(self, message: SignalMessage):
+        await enqueue(
+            self.get_pymongo_collection().database[OUTBOX_COLLECTION],
+            routing_key=self.get_subscription_topic(message.operation),
+            body=message.model_dump(mode="json"),
+            shard=get_outbox_shard(self.id, self._OUTBOX_SHARDS),
+        )
+
     @classmethod
     def get_subscription_topic(cls, operation: Operations):
         return (
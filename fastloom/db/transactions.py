@@ -1,13 +1,17 @@
 import functools
 from collections.abc import Awaitable, Callable
+from contextvars import Token
 
 from pymongo import AsyncMongoClient
 from pymongo.asynchronous.client_session import AsyncClientSession
 
+from fastloom.db import Session
 from fastloom.db.lifehooks import get_mongo_client
 
 
 class MongoTransactionManager:
+    _token: Token[AsyncClientSession | None]
+
     def __init__(self, mongo_uri: str):
         self.mongo_uri = mongo_uri
 
@@ -15,6 +19,7 @@ class MongoTransactionManager:
         self.client: AsyncMongoClient = await get_mongo_client(self.mongo_uri)
         self.session: AsyncClientSession = self.client.start_session()
         await self.session.start_transaction()
+        self._token = Session.set(self.session)
         return self.session
 
     async def __aexit__(
@@ -23,6 +28,7 @@ class MongoTransactionManager:
         exc_val: BaseException | None = None,
         exc_tb: object | None = None,
     ):
+        Session.reset(self._token)
         if exc_type:
             await self.session.abort_transaction()
         else:
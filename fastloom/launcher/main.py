@@ -1,3 +1,4 @@
+import asyncio
 import logging
 from collections.abc import AsyncGenerator
 from contextlib import asynccontextmanager
@@ -10,6 +11,8 @@ from starlette.middleware.cors import CORSMiddleware
 
 from fastloom.cache.http import setup_http_cache
 from fastloom.cache.settings import RedisSettings
+from fastloom.db.outbox import start_outbox_relays
+from fastloom.db.settings import MongoSettings
 from fastloom.launcher.settings import LauncherSettings
 from fastloom.launcher.utils import (
     combine_lifespans,
@@ -49,8 +52,26 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
         await Migrator().run()
 
+    relays = []
+    if (
+        Configs.documents_enabled
+        and Configs[MongoSettings].general.MONGO_OUTBOX  # type: ignore[misc]
+    ):
+        if not Configs.cache_enabled:
+            # NOTE: the relays lease their shards through RedisGuardGate;
+            # without one the outbox would only ever fill up
+            raise RuntimeError(
+                "MONGO_OUTBOX needs Redis for the relay leases, "
+                "add RedisSettings to the service settings"
+            )
+        relays = await start_outbox_relays(Configs[MongoSettings].general)  # type: ignore[misc]
+
     yield
 
+    for relay in relays:
+        relay.cancel()
+    await asyncio.gather(*relays, return_exceptions=True)
+
 
 @lru_cache
 def app():
@@ -2,23 +2,31 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from collections.abc import Sequence
-from types import UnionType
-from typing import (
-    TYPE_CHECKING,
-    Any,
-    Literal,
-    NamedTuple,
-    Union,
-    get_args,
-    get_origin,
-)
+import os
+import socket
+import time
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple
 
 from fastloom.meta import SelfSustaining
+from fastloom.signals.kafka.metrics import (
+    ConsumerStats,
+    backoff_attempts,
+    handler_duration,
+)
+from fastloom.signals.kafka.profiles import (
+    KafkaProfile,
+    KafkaTuning,
+    resolve_tuning,
+)
 from fastloom.signals.kafka.settings import KafkaSettings, KafkaSubscriptable
-from fastloom.utils import exponential_backoff
+from fastloom.signals.route import TOMBSTONE, patch_fastapi_body_wrapping
+from fastloom.signals.route import Tombstone as Tombstone
+from fastloom.signals.slots import claim_worker_slot
+from fastloom.utils import backoff_ladder, exponential_backoff
 
 if TYPE_CHECKING:
+    from faststream import BaseMiddleware
     from faststream._internal.types import BrokerMiddleware
     from faststream.confluent.fastapi import KafkaRouter
     from faststream.confluent.message import KafkaMessage
@@ -29,33 +37,26 @@ if TYPE_CHECKING:
     from faststream.confluent.response import KafkaPublishCommand
     from faststream.middlewares import AckPolicy
 
-logger = logging.getLogger(__name__)
-
-
-class Tombstone:
-    """Sentinel marking a message body as a genuine null value - not a byte
-    pattern (`b"null"`, `b""`), so it can never collide with real content."""
-
-    __slots__ = ()
-
-    def __repr__(self) -> str:
-        return "TOMBSTONE"
+    from fastloom.signals.kafka.rebalance import RebalanceHook
+    from fastloom.signals.kafka.table import KafkaTable, TableStore
+    from fastloom.signals.kafka.transactions import TransactionPolicy
 
-    def __bool__(self) -> bool:
-        return False
-
-    @classmethod
-    def __get_pydantic_core_schema__(cls, source_type: Any, handler: Any):
-        from pydantic_core import core_schema
+logger = logging.getLogger(__name__)
 
-        return core_schema.is_instance_schema(cls)
+type RetryMode = Literal["sleep", "topics", "pause"]
 
-    @classmethod
-    def __get_pydantic_json_schema__(cls, schema: Any, handler: Any):
-        return {"const": "TOMBSTONE"}
+# carried by records forwarded to a retry / dead-letter topic
+RETRY_ATTEMPT_HEADER = "x-retry-attempt"
+RETRY_ORIGIN_HEADER = "x-retry-origin"
+RETRY_DUE_HEADER = "x-retry-due"
+RETRY_ERROR_HEADER = "x-retry-error"
 
+# keeps a record when it returns True - sees its headers and key only
+type RecordFilter = Callable[[Mapping[str, str], bytes | None], bool]
 
-TOMBSTONE = Tombstone()
+# static membership's session timeout, unless KAFKA_SESSION_TIMEOUT_MS
+# says otherwise - long enough to ride out a rolling restart
+_STATIC_SESSION_TIMEOUT_MS = 45_000
 
 
 def get_kafka_router(
@@ -65,7 +66,12 @@ def get_kafka_router(
     allow_auto_create_topics: bool,
     acks: Literal[0, 1, -1, "all"],
     enable_idempotence: bool,
+    tuning: KafkaProfile | KafkaTuning | None = None,
 ) -> KafkaRouter:
+    """
+    :param tuning: batching / fetch profile, or its knobs; `KAFKA_PROFILE`
+    and the single `KAFKA_*` knobs of the settings take precedence
+    """
     if enable_idempotence:
         acks = "all"
 
@@ -86,6 +92,9 @@ def get_kafka_router(
         enable_idempotence=enable_idempotence,
         allow_auto_create_topics=allow_auto_create_topics,
         middlewares=middlewares,
+        **resolve_tuning(
+            tuning, settings.KAFKA_PROFILE, settings.tuning_overrides()
+        ).router_kwargs(),
     )
 
 
@@ -139,7 +148,7 @@ def _patch_tombstone_consumption(
     # body with a dedicated sentinel at parse time; by default decode_message
     # collapses it to None, matching #2933's own Optional[Model] = None
     # behavior exactly. A handler typed Model | Tombstone opts out of that
-    # collapse instead - see _patch_fastapi_body_wrapping.
+    # collapse instead - see patch_fastapi_body_wrapping.
     if getattr(parser_cls, "_fastloom_tombstone_consumption", False):
         return
 
@@ -161,108 +170,7 @@ def _patch_tombstone_consumption(
     parser_cls.decode_message = decode_message
     parser_cls._fastloom_tombstone_consumption = True
 
-    _patch_fastapi_body_wrapping()
-
-
-def _accepts_tombstone(annotation: Any) -> bool:
-    """Whether a handler's declared body type opts into the raw sentinel."""
-    if annotation is Tombstone:
-        return True
-
-    if get_origin(annotation) in (Union, UnionType):
-        return any(_accepts_tombstone(arg) for arg in get_args(annotation))
-
-    return False
-
-
-_fastapi_route_patched = False
-
-
-def _patch_fastapi_body_wrapping() -> None:
-    global _fastapi_route_patched
-    if _fastapi_route_patched:
-        return
-    _fastapi_route_patched = True
-
-    import inspect
-    from itertools import dropwhile
-
-    import faststream._internal.fastapi.route as route
-
-    def build_faststream_to_fastapi_parser(
-        *,
-        dependent: Any,
-        fastapi_config: Any,
-        context: Any,
-        response_field: Any,
-        response_model_include: Any,
-        response_model_exclude: Any,
-        response_model_by_alias: Any,
-        response_model_exclude_unset: Any,
-        response_model_exclude_defaults: Any,
-        response_model_exclude_none: Any,
-    ) -> Any:
-        assert dependent.call
-
-        consume = route.make_fastapi_execution(
-            dependent=dependent,
-            fastapi_config=fastapi_config,
-            response_field=response_field,
-            response_model_include=response_model_include,
-            response_model_exclude=response_model_exclude,
-            response_model_by_alias=response_model_by_alias,
-            response_model_exclude_unset=response_model_exclude_unset,
-            response_model_exclude_defaults=response_model_exclude_defaults,
-            response_model_exclude_none=response_model_exclude_none,
-        )
-
-        dependencies_names = tuple(i.name for i in dependent.dependencies)
-        call_params = inspect.signature(dependent.call).parameters
-        first_arg = next(
-            dropwhile(lambda i: i in dependencies_names, call_params),
-            None,
-        )
-        first_arg_accepts_tombstone = (
-            first_arg is not None
-            and _accepts_tombstone(call_params[first_arg].annotation)
-        )
-
-        async def parsed_consumer(message: Any) -> Any:
-            if first_arg_accepts_tombstone and message.body is TOMBSTONE:
-                body: Any = TOMBSTONE
-            else:
-                body = await message.decode()
-
-            fastapi_body: dict[str, Any] | list[Any] | None | Tombstone
-            if first_arg is not None:
-                if isinstance(body, dict):
-                    path = fastapi_body = body or {}
-                elif (
-                    isinstance(body, list) or body is None or body is TOMBSTONE
-                ):
-                    fastapi_body, path = body, {}
-                else:
-                    path = fastapi_body = {first_arg: body}
-
-                stream_message = route.StreamMessage(
-                    body=fastapi_body,
-                    headers={"context__": context, **message.headers},
-                    path={**path, **message.path},
-                )
-            else:
-                stream_message = route.StreamMessage(
-                    body={},
-                    headers={"context__": context},
-                    path={},
-                )
-
-            return await consume(stream_message, message)
-
-        return parsed_consumer
-
-    route.build_faststream_to_fastapi_parser = (
-        build_faststream_to_fastapi_parser
-    )
+    patch_fastapi_body_wrapping()
 
 
 class _MessageKey(NamedTuple):
@@ -287,7 +195,16 @@ class KafkaSubscriber(SelfSustaining):
     _base_delay: int
     _max_delay: int
     _exceptions: tuple[type[Exception], ...]
+    _retry: RetryMode
+    _retry_tiers: list[int]
     _retry_state: dict[tuple[str, int], _RetryState]
+    _resumes: set[asyncio.Task[None]]
+    _revoke_timeout: float
+    _assignor: str | None
+    _session_timeout_ms: int | None
+    _instance_id: str | None
+    _instances: dict[str, int]
+    _router_subscriber: Callable[..., Any]
 
     def __init__(
         self,
@@ -299,9 +216,13 @@ class KafkaSubscriber(SelfSustaining):
         allow_auto_create_topics: bool = True,
         acks: Literal[0, 1, -1, "all"] = 1,
         enable_idempotence: bool = False,
+        retry: RetryMode = "sleep",
+        tuning: KafkaProfile | KafkaTuning | None = None,
+        revoke_timeout: float = 10.0,
     ):
         """See docs/signals.md#kafka for the retry/backoff, ack_policy, and
-        producer-durability semantics of these params."""
+        producer-durability semantics of these params; `revoke_timeout` is
+        how long a revoked partition's in-flight records get to finish."""
         from faststream import BaseMiddleware
         from faststream.middlewares import AckPolicy
 
@@ -309,7 +230,25 @@ class KafkaSubscriber(SelfSustaining):
         self._base_delay = base_delay
         self._max_delay = max_delay
         self._exceptions = tuple(exceptions or [Exception])
+        self._retry = retry
+        self._retry_tiers = backoff_ladder(base_delay, max_delay)
         self._retry_state = {}
+        self._resumes = set()
+        self._revoke_timeout = revoke_timeout
+        self._assignor = settings.KAFKA_ASSIGNOR
+        self._session_timeout_ms = settings.KAFKA_SESSION_TIMEOUT_MS
+        self._instance_id = None
+        self._instances = {}
+        if settings.KAFKA_STATIC_MEMBERSHIP:
+            slot = claim_worker_slot(
+                f"fastloom-kafka-{settings.PROJECT_NAME}"
+                f"-{settings.ENVIRONMENT}"
+            )
+            host = settings.KAFKA_INSTANCE_ID or socket.gethostname()
+            self._instance_id = f"{host}-{slot}"
+            self._session_timeout_ms = (
+                self._session_timeout_ms or _STATIC_SESSION_TIMEOUT_MS
+            )
         subscriber = self
 
         class _RetryMiddleware(BaseMiddleware):
@@ -318,11 +257,20 @@ class KafkaSubscriber(SelfSustaining):
                 if key is None:
                     return await call_next(msg)
 
+                if subscriber._retry == "topics" and (
+                    await subscriber._hold_until_due(msg, key)
+                ):
+                    # it comes round again once it's due
+                    return None
                 try:
-                    result = await call_next(msg)
-                except subscriber._exceptions:
-                    if msg.is_manual:
-                        await subscriber._backoff(key)
+                    result = await subscriber._timed(call_next, msg, key)
+                except subscriber._exceptions as exc:
+                    if not msg.is_manual:
+                        raise
+                    if await subscriber._retry_later(msg, key, exc):
+                        # the retry topic owns the record now -
+                        # returning normally lets the offset commit
+                        return None
                     raise
                 else:
                     subscriber._clear_retry_state(key)
@@ -330,10 +278,11 @@ class KafkaSubscriber(SelfSustaining):
 
         self.router = get_kafka_router(
             settings,
-            middlewares=[_RetryMiddleware],
+            middlewares=[_RetryMiddleware, _filter_middleware()],
             allow_auto_create_topics=allow_auto_create_topics,
             acks=acks,
             enable_idempotence=enable_idempotence,
+            tuning=tuning,
         )
         # broker.config.ack_policy is a read-only composition of every
         # subscriber's own config - this is the one underlying dataclass
@@ -342,6 +291,416 @@ class KafkaSubscriber(SelfSustaining):
         self.router.broker.config.broker_config.ack_policy = (
             ack_policy if ack_policy is not None else AckPolicy.NACK_ON_ERROR
         )
+        if settings.KAFKA_STATS_INTERVAL_MS:
+            ConsumerStats(settings.KAFKA_STATS_INTERVAL_MS).attach(
+                self.router.broker.config.broker_config
+            )
+        # every subscription - `router.subscriber(...)` used directly too -
+        # gets the group membership settings and a rebalance listener
+        self._router_subscriber = self.router.subscriber
+        self.router.subscriber = self._subscribe  # type: ignore[method-assign]
+
+    @classmethod
+    def subscriber(
+        cls, *topics: str, filter: RecordFilter | None = None, **kwargs: Any
+    ) -> Callable[[Any], Any]:
+        """
+        :param topics: topics to consume
+        :param filter: drops the records it returns False for, by headers
+        and key, before their body is decoded
+        :param kwargs: additional faststream subscriber arguments
+        :return: decorator registering the handler
+        """
+        _filter_by(filter, kwargs)
+        return cls.router.subscriber(*topics, **kwargs)
+
+    @classmethod
+    def retry_subscriber(
+        cls, topic: str, group_id: str, **kwargs: Any
+    ) -> Callable[[Any], Any]:
+        """
+        :param topic: the topic whose retries to consume
+        :param group_id: the group of the topic's own subscriber; each
+        tier consumes as `{group_id}.retry.{delay}`
+        :param kwargs: additional faststream subscriber arguments
+        :return: decorator registering a consumer per retry tier, stacked
+        on top of the topic's own `router.subscriber(...)`
+
+        every tier gets its own consumer, so a record waiting out a long
+        tier never holds back a shorter one
+        """
+        if cls._retry != "topics":
+            raise ValueError('retry_subscriber needs retry="topics"')
+        kwargs.setdefault("auto_offset_reset", "earliest")
+        subscribers = [
+            cls.router.subscriber(
+                cls._retry_topic(topic, delay),
+                group_id=f"{group_id}.retry.{delay}",
+                **kwargs,
+            )
+            for delay in cls._retry_tiers
+        ]
+
+        def _inner(func):
+            for subscriber in subscribers:
+                func = subscriber(func)
+            return func
+
+        return _inner
+
+    @classmethod
+    def ordered_subscriber(
+        cls,
+        *topics: str,
+        concurrency: int = 16,
+        max_attempts: int = 5,
+        filter: RecordFilter | None = None,
+        **kwargs: Any,
+    ) -> Callable[[Any], Any]:
+        """
+        :param topics: topics to consume
+        :param concurrency: records handled at once; records sharing a
+        partition and key still run one at a time, in offset order
+        :param max_attempts: handler calls before a failing record is
+        forwarded to the retry topics with `retry="topics"`; otherwise it
+        keeps retrying in place
+        :param filter: see `subscriber`
+        :param kwargs: additional faststream subscriber arguments
+        :return: decorator registering the handler
+
+        offsets are committed up to the lowest record not yet handled; a
+        record failing with one of the subscriber's `exceptions` retries in
+        place with its backoff
+        """
+        from faststream.middlewares import AckPolicy
+
+        from fastloom.signals.kafka.ordered import KeyOrderedDispatcher
+
+        if kwargs.get("batch"):
+            raise ValueError("ordered_subscriber takes single records")
+        if "ack_policy" in kwargs:
+            raise ValueError("ordered_subscriber commits offsets itself")
+        _filter_by(filter, kwargs)
+        dispatcher = KeyOrderedDispatcher(
+            concurrency,
+            cls._base_delay,
+            cls._max_delay,
+            name=",".join(topics),
+            exceptions=cls._exceptions,
+            max_attempts=max_attempts,
+            on_exhausted=cls._forward if cls._retry == "topics" else None,
+        )
+        # MANUAL keeps FastStream from committing the poll position, which
+        # runs ahead of the records still in flight
+        subscriber = cls._subscribe(
+            *topics, hooks=[dispatcher], ack_policy=AckPolicy.MANUAL, **kwargs
+        )
+
+        async def drain(_app: Any) -> None:
+            await dispatcher.drain()
+
+        cls.router.on_broker_shutdown(drain)
+
+        def _inner(func):
+            subscriber(dispatcher.wrap(func, cls._current_message))
+            return func
+
+        return _inner
+
+    @classmethod
+    def transactional_subscriber(
+        cls,
+        *topics: str,
+        group_id: str,
+        policy: TransactionPolicy | None = None,
+        transactional_id: str | None = None,
+        filter: RecordFilter | None = None,
+        **kwargs: Any,
+    ) -> Callable[[Any], Any]:
+        """
+        :param topics: topics to consume
+        :param group_id: the consumer group, whose offsets commit along
+        with the outputs
+        :param policy: transaction size and commit interval
+        :param transactional_id: unique per running process, defaults to
+        `{group_id}.{hostname}.{pid}`
+        :param filter: see `subscriber`
+        :param kwargs: additional faststream subscriber arguments
+        :return: decorator registering a handler that returns the records
+        to produce - a `KafkaOutput`, an iterable of them, or None
+        """
+        from faststream.middlewares import AckPolicy
+
+        from fastloom.signals.kafka.transactions import (
+            TransactionPolicy,
+            Transactor,
+        )
+
+        if cls._retry == "topics":
+            raise ValueError(
+                "transactional_subscriber can't forward to retry topics"
+            )
+        if "ack_policy" in kwargs or (kwargs.get("max_workers") or 1) > 1:
+            raise ValueError(
+                "transactional_subscriber commits offsets itself, in order"
+            )
+        _filter_by(filter, kwargs)
+        policy = policy or TransactionPolicy()
+        transactional_id = (
+            transactional_id
+            or f"{group_id}.{socket.gethostname()}.{os.getpid()}"
+        )
+        kwargs.setdefault("isolation_level", "read_committed")
+
+        def config() -> dict[str, Any]:
+            connection = cls.router.broker.config.broker_config
+            return connection.connection_config.producer_config | {
+                "transactional.id": transactional_id,
+                "transaction.timeout.ms": int(policy.timeout * 1000),
+                "enable.idempotence": True,
+                "acks": "all",
+            }
+
+        transactor = Transactor(policy, config, name=transactional_id)
+        subscriber = cls._subscribe(
+            *topics,
+            hooks=[transactor],
+            group_id=group_id,
+            ack_policy=AckPolicy.MANUAL,
+            **kwargs,
+        )
+
+        async def close(_app: Any) -> None:
+            await transactor.close()
+
+        cls.router.on_broker_shutdown(close)
+
+        def _inner(func):
+            subscriber(transactor.wrap(func, cls._current_message))
+            return func
+
+        return _inner
+
+    @classmethod
+    def table[T](
+        cls,
+        topic: str,
+        model: type[T],
+        store: TableStore[T] | None = None,
+        filter: RecordFilter | None = None,
+        **kwargs: Any,
+    ) -> KafkaTable[T]:
+        """
+        :param topic: a compacted topic
+        :param model: the record value type
+        :param store: where the table is kept, in memory by default
+        :param filter: see `subscriber`; a dropped record leaves its key
+        as it was
+        :param kwargs: additional faststream subscriber arguments
+        :return: the table, filled and kept current by its own consumer
+
+        every process reads every partition, in a consumer group of its
+        own that commits no offsets - the store keeps its own
+        """
+        from faststream.middlewares import AckPolicy
+
+        from fastloom.signals.kafka.table import KafkaTable, MemoryTableStore
+
+        if (
+            kwargs.get("batch")
+            or "group_id" in kwargs
+            or "ack_policy" in kwargs
+        ):
+            raise ValueError("a table consumes single records on its own")
+        _filter_by(filter, kwargs)
+        connection = cls.router.broker.config.broker_config.connection_config
+        strategy = connection.consumer_config.get(
+            "partition.assignment.strategy",
+            kwargs.get("partition_assignment_strategy", cls._assignor or ""),
+        )
+        table = KafkaTable(
+            topic,
+            model,
+            store if store is not None else MemoryTableStore(),
+            cooperative="cooperative" in str(strategy),
+        )
+        kwargs.setdefault("isolation_level", "read_committed")
+        # a stored position past the retention gets the beginning
+        kwargs.setdefault("auto_offset_reset", "earliest")
+        subscriber = cls.router.subscriber(
+            topic,
+            group_id=f"{topic}.table.{socket.gethostname()}.{os.getpid()}",
+            # its own group, of one member that starts from its store
+            group_instance_id=None,
+            ack_policy=AckPolicy.MANUAL,
+            on_assign=table.on_assign,
+            on_revoke=table.on_revoke,
+            decoder=_no_body,
+            **kwargs,
+        )
+        start, stop = subscriber.start, subscriber.stop
+
+        # the store opens before the first assignment and closes after
+        # the last record - broker shutdown hooks run while it still polls
+        async def open_and_start() -> None:
+            table.open()
+            await start()
+
+        async def stop_and_close() -> None:
+            await stop()
+            await table.close()
+
+        subscriber.start = open_and_start  # type: ignore[method-assign]
+        subscriber.stop = stop_and_close  # type: ignore[method-assign]
+
+        async def materialize() -> None:
+            if (message := cls._current_message()) is not None:
+                table.apply(message.raw_message)
+
+        subscriber(materialize)
+        return table
+
+    @classmethod
+    def _subscribe(
+        cls,
+        *topics: str,
+        hooks: Sequence[RebalanceHook] = (),
+        **kwargs: Any,
+    ) -> Any:
+        """
+        :param hooks: get the subscription's revoked partitions, to finish
+        and commit their work before the partitions move
+        :param kwargs: FastStream's subscriber arguments
+        :return: FastStream's subscriber
+
+        `router.subscriber`, with the group membership settings as defaults
+        and a rebalance listener around `on_revoke` / `on_lost`
+        """
+        from faststream.middlewares import AckPolicy
+
+        from fastloom.signals.kafka.rebalance import RebalanceListener
+
+        group_id = kwargs.get("group_id")
+        if cls._assignor is not None:
+            kwargs.setdefault("partition_assignment_strategy", cls._assignor)
+        if cls._session_timeout_ms is not None:
+            kwargs.setdefault("session_timeout_ms", cls._session_timeout_ms)
+        if cls._instance_id is not None and group_id is not None:
+            # unique within the group - a second subscription of the same
+            # group in this process gets a suffix, in registration order
+            n = cls._instances.get(group_id, 0)
+            cls._instances[group_id] = n + 1
+            kwargs.setdefault(
+                "group_instance_id",
+                f"{cls._instance_id}-{n}" if n else cls._instance_id,
+            )
+        ack_policy = kwargs.get(
+            "ack_policy", cls.router.broker.config.broker_config.ack_policy
+        )
+        listener = RebalanceListener(
+            ",".join(topics),
+            cls._revoke_timeout,
+            # records are acked in turn, so the position is how far it got -
+            # unless several workers handle them at once, when it runs ahead
+            # of the ones still in flight
+            commit_positions=(
+                group_id is not None
+                and ack_policy is not AckPolicy.MANUAL
+                and (kwargs.get("max_workers") or 1) <= 1
+            ),
+            hooks=hooks,
+            on_revoke=kwargs.pop("on_revoke", None),
+            on_lost=kwargs.pop("on_lost", None),
+        )
+        subscriber = cls._router_subscriber(
+            *topics,
+            on_revoke=listener.on_revoke,
+            on_lost=listener.on_lost,
+            **kwargs,
+        )
+        start = subscriber.start
+
+        async def start_listening() -> None:
+            listener.loop = asyncio.get_running_loop()
+            await start()
+
+        subscriber.start = start_listening  # type: ignore[method-assign]
+        return subscriber
+
+    @classmethod
+    def _current_message(cls) -> KafkaMessage | None:
+        return cls.router.broker.context.get_local("message")
+
+    @staticmethod
+    def _retry_topic(topic: str, delay: int) -> str:
+        return f"{topic}.retry.{delay}"
+
+    @staticmethod
+    def _dead_letter_topic(topic: str) -> str:
+        return f"{topic}.dlq"
+
+    async def _hold_until_due(
+        self, message: KafkaMessage, key: _MessageKey
+    ) -> bool:
+        """
+        :return: whether a retried record that isn't due yet was handed
+        back - its partition paused until it's due, and sought back to it
+
+        every record of a tier topic waits the same delay, so the one at
+        the head is always the first due - holding its partition only holds
+        back records that aren't due yet either
+        """
+        if (due := message.headers.get(RETRY_DUE_HEADER)) is None:
+            return False
+        if (delay := int(due) / 1000 - time.time()) <= 0:
+            return False
+        consumer = getattr(message.consumer, "consumer", None)
+        if consumer is None or not message.is_manual:
+            # not a live confluent consumer - FastStream's test broker - or
+            # one that auto-commits, which can't hand a record back
+            await asyncio.sleep(delay)
+            return False
+        self._pause_partition(consumer, key, delay)
+        await message.nack()
+        return True
+
+    async def _forward(self, message: KafkaMessage, exc: Exception) -> None:
+        raw = message.raw_message
+        records = raw if isinstance(raw, Sequence) else [raw]
+        for record in records:
+            headers = {
+                name: _header_value(value)
+                for name, value in record.headers() or ()
+                if value is not None
+            }
+            attempt = int(headers.get(RETRY_ATTEMPT_HEADER, 0)) + 1
+            origin = headers.get(RETRY_ORIGIN_HEADER)
+            if not isinstance(origin, str):
+                origin = headers[RETRY_ORIGIN_HEADER] = record.topic()
+            headers[RETRY_ATTEMPT_HEADER] = str(attempt)
+            headers[RETRY_ERROR_HEADER] = repr(exc)
+            if attempt > len(self._retry_tiers):
+                topic = self._dead_letter_topic(origin)
+                headers.pop(RETRY_DUE_HEADER, None)
+            else:
+                delay = self._retry_tiers[attempt - 1]
+                topic = self._retry_topic(origin, delay)
+                headers[RETRY_DUE_HEADER] = str(
+                    int((time.time() + delay) * 1000)
+                )
+            logger.warning(
+                "kafka consumer error, forwarding %s[%s]@%s to %s",
+                record.topic(),
+                record.partition(),
+                record.offset(),
+                topic,
+            )
+            await self.router.broker.publish(
+                record.value(),
+                topic=topic,
+                key=record.key(),
+                headers=headers,
+            )
 
     @staticmethod
     def _locate(message: KafkaMessage) -> _MessageKey | None:
@@ -360,13 +719,87 @@ class KafkaSubscriber(SelfSustaining):
             return None
         return _MessageKey(topic, partition, offset)
 
+    @staticmethod
+    async def _timed(
+        call_next: Callable[[Any], Awaitable[Any]],
+        message: KafkaMessage,
+        key: _MessageKey,
+    ) -> Any:
+        start, error = time.perf_counter(), True
+        try:
+            result = await call_next(message)
+            error = False
+            return result
+        finally:
+            handler_duration.record(
+                time.perf_counter() - start,
+                {"topic": key.topic, "error": error},
+            )
+
     def _clear_retry_state(self, key: _MessageKey) -> None:
         partition_key = key.partition_key
         last = self._retry_state.get(partition_key)
         if last is not None and last.offset == key.offset:
             del self._retry_state[partition_key]
 
+    async def _retry_later(
+        self, message: KafkaMessage, key: _MessageKey, exc: Exception
+    ) -> bool:
+        """
+        :return: whether the record was handed to a retry topic; otherwise
+        the caller re-raises so the record is nacked and redelivered
+        """
+        if self._retry == "topics":
+            try:
+                await self._forward(message, exc)
+            except Exception:
+                logger.exception("failed to forward for retry")
+            else:
+                return True
+        elif self._retry == "pause":
+            await self._pause(message, key)
+            return False
+        await self._backoff(key)
+        return False
+
     async def _backoff(self, key: _MessageKey) -> None:
+        await asyncio.sleep(self._next_delay(key))
+
+    async def _pause(self, message: KafkaMessage, key: _MessageKey) -> None:
+        """
+        pauses just the failed record's partition for the backoff delay;
+        the nack that follows seeks it back to the record
+        """
+        consumer = getattr(message.consumer, "consumer", None)
+        if consumer is None:
+            # not a live confluent consumer - FastStream's test broker
+            return await self._backoff(key)
+
+        self._pause_partition(consumer, key, self._next_delay(key))
+
+    def _pause_partition(
+        self, consumer: Any, key: _MessageKey, delay: float
+    ) -> None:
+        from confluent_kafka import TopicPartition
+
+        partition = TopicPartition(key.topic, key.partition)
+        # NOTE: pause/resume only flip local fetch state, so unlike poll
+        # they don't need FastStream's consumer thread
+        consumer.pause([partition])
+        task = asyncio.create_task(self._resume(consumer, partition, delay))
+        self._resumes.add(task)
+        task.add_done_callback(self._resumes.discard)
+
+    @staticmethod
+    async def _resume(consumer: Any, partition: Any, delay: float) -> None:
+        await asyncio.sleep(delay)
+        try:
+            consumer.resume([partition])
+        except Exception:
+            # revoked while paused - its next owner starts unpaused anyway
+            logger.debug("failed to resume %s", partition, exc_info=True)
+
+    def _next_delay(self, key: _MessageKey) -> float:
         partition_key = key.partition_key
         last = self._retry_state.get(partition_key)
         attempt = (
@@ -375,6 +808,9 @@ class KafkaSubscriber(SelfSustaining):
             else 1
         )
         self._retry_state[partition_key] = _RetryState(key.offset, attempt)
+        backoff_attempts.add(
+            1, {"topic": key.topic, "partition": key.partition}
+        )
 
         delay = exponential_backoff(attempt, self._base_delay, self._max_delay)
         logger.warning(
@@ -385,4 +821,65 @@ class KafkaSubscriber(SelfSustaining):
             delay,
             attempt,
         )
-        await asyncio.sleep(delay)
+        return delay
+
+
+def _header_value(value: bytes) -> str | bytes:
+    """
+    :return: `value` as text when it is - the producer encodes it back to
+    the same bytes, and FastStream's test broker only takes text - or the
+    bytes themselves
+    """
+    try:
+        return value.decode()
+    except UnicodeDecodeError:
+        return value
+
+
+def _filter_by(filter: RecordFilter | None, kwargs: dict[str, Any]) -> None:
+    """
+    :param kwargs: the subscription's FastStream arguments, whose parser
+    gets the filter - a subscriber of its own, unlike its handler, which
+    may be stacked under other subscriptions
+    """
+    if filter is None:
+        return
+    if kwargs.get("batch"):
+        raise ValueError("filter= takes single records")
+    kwargs["parser"] = _filtering_parser(filter, kwargs.get("parser"))
+
+
+def _filter_middleware() -> type[BaseMiddleware]:
+    from faststream import BaseMiddleware
+
+    class _FilterMiddleware(BaseMiddleware):
+        async def consume_scope(self, call_next, msg):
+            if getattr(msg, "_fastloom_dropped", False):
+                # returning normally acks / commits it like a handled one
+                return None
+            return await call_next(msg)
+
+    return _FilterMiddleware
+
+
+def _filtering_parser(keep: RecordFilter, parser: Any = None) -> Any:
+    """
+    :param parser: the subscription's own parser, composed like FastStream
+    composes any custom parser
+    :return: a parser marking the records `keep` returns False for, which
+    `_filter_middleware` then drops before their body is decoded
+    """
+    from faststream._internal.endpoint.utils import ParserComposition
+
+    async def parse(msg: Any, original: Any) -> Any:
+        message = await ParserComposition(parser, original)(msg)
+        if not keep(message.headers, msg.key()):
+            message._fastloom_dropped = True
+        return message
+
+    return parse
+
+
+async def _no_body(message: Any) -> None:
+    # a table reads the raw record itself - no point decoding it first
+    return None
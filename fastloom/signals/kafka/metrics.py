@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import json
+import logging
+import time
+from copy import copy
+from dataclasses import replace
+from functools import partial
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
+
+if TYPE_CHECKING:
+    from faststream.confluent.configs.broker import KafkaBrokerConfig
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+# a consumer whose statistics are this many intervals old is gone
+_STALE_INTERVALS = 3
+
+handler_duration = meter.create_histogram(
+    "kafka.consumer.handler.duration",
+    unit="s",
+    description="Time in a Kafka handler, per record or batch",
+)
+backoff_attempts = meter.create_counter(
+    "kafka.consumer.backoff_attempts",
+    description="Failed Kafka records backed off before being retried",
+)
+
+
+class _PartitionStats(NamedTuple):
+    topic: str
+    partition: int
+    lag: int
+    records: int
+
+
+class _ClientStats(NamedTuple):
+    group: str
+    received: float
+    rebalances: int
+    partitions: list[_PartitionStats]
+
+
+class ConsumerStats:
+    """The latest librdkafka statistics of every consumer of a broker.
+
+    librdkafka hands them to each consumer's `stats_cb` every
+    `statistics.interval.ms`, from inside its poll; the observable
+    instruments report the latest of them when the metrics are collected,
+    so nothing queries the brokers on the way.
+    """
+
+    def __init__(self, interval_ms: int):
+        """
+        :param interval_ms: `statistics.interval.ms` of every consumer
+        """
+        self.interval_ms = interval_ms
+        # librdkafka's client name -> its latest statistics
+        self._clients: dict[str, _ClientStats] = {}
+        meter.create_observable_gauge(
+            "kafka.consumer.lag",
+            callbacks=[self._observe_lag],
+            description="Records between a partition's committed offset "
+            "and its high watermark",
+        )
+        meter.create_observable_counter(
+            "kafka.consumer.records",
+            callbacks=[self._observe_records],
+            description="Records fetched from a partition",
+        )
+        meter.create_observable_counter(
+            "kafka.consumer.rebalances",
+            callbacks=[self._observe_rebalances],
+            description="Rebalances a consumer went through",
+        )
+
+    def attach(self, broker_config: KafkaBrokerConfig) -> None:
+        """has every consumer the broker builds from now on report here"""
+        build = broker_config.builder
+
+        def builder(*topics: Any, group_id: str | None = None, **kwargs: Any):
+            config = copy(build.config)
+            # NOTE: a stats_cb of the broker's own config= takes precedence
+            config.config = {
+                "statistics.interval.ms": self.interval_ms,
+                "stats_cb": partial(self.update, group_id or ""),
+            } | config.config
+            return replace(build, config=config)(
+                *topics, group_id=group_id, **kwargs
+            )
+
+        broker_config.builder = builder
+
+    def update(self, group: str, payload: str) -> None:
+        """
+        :param group: the consumer's group, empty for none
+        :param payload: librdkafka's statistics JSON
+        """
+        try:
+            stats = json.loads(payload)
+            if stats.get("type") != "consumer":
+                return
+            partitions = [
+                _PartitionStats(
+                    topic,
+                    p["partition"],
+                    p.get("consumer_lag", -1),
+                    p.get("rxmsgs", 0),
+                )
+                for topic, t in stats.get("topics", {}).items()
+                for p in t.get("partitions", {}).values()
+                # -1 is librdkafka's internal unassigned partition
+                if p["partition"] >= 0 and p.get("fetch_state") != "none"
+            ]
+            self._clients[stats["name"]] = _ClientStats(
+                group,
+                time.monotonic(),
+                stats.get("cgrp", {}).get("rebalance_cnt", 0),
+                partitions,
+            )
+        except Exception:
+            logger.warning("unreadable kafka statistics", exc_info=True)
+
+    def _current(self) -> list[_ClientStats]:
+        oldest = time.monotonic() - (
+            self.interval_ms / 1000 * _STALE_INTERVALS
+        )
+        for name, client in list(self._clients.items()):
+            if client.received < oldest:
+                self._clients.pop(name, None)
+        return list(self._clients.values())
+
+    def _observe_lag(self, _options: CallbackOptions) -> list[Observation]:
+        return [
+            Observation(p.lag, _attributes(client.group, p))
+            for client in self._current()
+            for p in client.partitions
+            # no committed offset yet
+            if p.lag >= 0
+        ]
+
+    def _observe_records(self, _options: CallbackOptions) -> list[Observation]:
+        return [
+            Observation(p.records, _attributes(client.group, p))
+            for client in self._current()
+            for p in client.partitions
+        ]
+
+    def _observe_rebalances(
+        self, _options: CallbackOptions
+    ) -> list[Observation]:
+        rebalances: dict[str, int] = {}
+        for client in self._current():
+            rebalances[client.group] = (
+                rebalances.get(client.group, 0) + client.rebalances
+            )
+        return [
+            Observation(count, {"group": group})
+            for group, count in rebalances.items()
+        ]
+
+
+def _attributes(group: str, p: _PartitionStats) -> dict[str, Any]:
+    return {"group": group, "topic": p.topic, "partition": p.partition}
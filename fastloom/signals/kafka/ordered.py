@@ -0,0 +1,300 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Awaitable, Callable, Hashable
+from functools import partial, wraps
+from typing import TYPE_CHECKING, Any
+
+from fastloom.utils import exponential_backoff
+
+if TYPE_CHECKING:
+    from faststream.confluent.message import KafkaMessage
+
+logger = logging.getLogger(__name__)
+
+type OnExhausted = Callable[[KafkaMessage, Exception], Awaitable[None]]
+
+
+class OffsetTracker:
+    """In-flight offsets of one partition, in the order they were polled.
+
+    Offsets can complete in any order, but the committable offset only
+    moves past a prefix of polled offsets that all completed - Kafka
+    offsets have gaps (compaction, transaction markers), so "contiguous"
+    means contiguous in poll order, not `offset + 1`.
+    """
+
+    __slots__ = ("_done", "_polled", "last")
+
+    def __init__(self) -> None:
+        self._polled: deque[int] = deque()
+        self._done: set[int] = set()
+        self.last = -1
+
+    def add(self, offset: int) -> None:
+        self._polled.append(offset)
+        self.last = offset
+
+    def complete(self, offset: int) -> int | None:
+        """
+        :return: the offset to commit, if this completion moved it
+        """
+        self._done.add(offset)
+        committable = None
+        while self._polled and self._polled[0] in self._done:
+            self._done.discard(head := self._polled.popleft())
+            committable = head + 1
+        return committable
+
+
+class KeyOrderedDispatcher:
+    """Runs a subscriber's records concurrently, in order per record key.
+
+    The wrapped handler hands each record to its key's lane and returns
+    once a slot is free, so the poll loop moves on while up to
+    `concurrency` records are in flight. Records of one partition and key
+    run one after another in offset order; unkeyed records don't wait on
+    anything. A record failing with one of `exceptions` is retried in its
+    lane with exponential backoff, holding back its key and the partition's
+    commits but nothing else, up to `max_attempts` times; after that - or
+    straight away for any other exception - it's handed to `on_exhausted`
+    and counts as handled. Without `on_exhausted` there's nowhere to put
+    it, so it keeps retrying at up to `max_delay` apart instead of being
+    committed past. Commits only ever reach the lowest offset not yet
+    handled, coalesced once per loop pass.
+    """
+
+    def __init__(
+        self,
+        concurrency: int,
+        base_delay: float,
+        max_delay: float,
+        name: str,
+        exceptions: tuple[type[Exception], ...] = (Exception,),
+        max_attempts: int = 5,
+        on_exhausted: OnExhausted | None = None,
+    ):
+        """
+        :param concurrency: records in flight at once, across partitions
+        :param base_delay: seconds before the first in-lane retry
+        :param max_delay: cap on a single retry's delay
+        :param name: used in logs
+        :param exceptions: the exceptions worth retrying in the lane
+        :param max_attempts: handler calls before a record is given up on
+        :param on_exhausted: takes a record given up on, such as to forward
+        it to a retry topic; without one the record never is, and blocks
+        its key and partition until it succeeds. If it raises, the record
+        is retried in the lane again
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        if max_attempts < 1:
+            raise ValueError("max_attempts must be at least 1")
+        self.name = name
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._exceptions = exceptions
+        self._max_attempts = max_attempts
+        self._on_exhausted = on_exhausted
+        self._slots = asyncio.Semaphore(concurrency)
+        self._trackers: dict[tuple[str, int], OffsetTracker] = {}
+        self._lanes: dict[Hashable, asyncio.Task[None]] = {}
+        self._tasks: dict[asyncio.Task[None], tuple[str, int]] = {}
+        self._commits: dict[tuple[str, int], tuple[Any, int]] = {}
+        # (topic, partition) -> the last offset handed to _commit
+        self._committable: dict[tuple[str, int], int] = {}
+        self._flush_task: asyncio.Task[None] | None = None
+
+    def wrap[**P](
+        self,
+        handler: Callable[P, Awaitable[Any]],
+        get_message: Callable[[], KafkaMessage | None],
+    ) -> Callable[P, Awaitable[None]]:
+        """
+        :param get_message: the record being handled
+        """
+
+        @wraps(handler)
+        async def dispatched(*args: P.args, **kwargs: P.kwargs) -> None:
+            message = get_message()
+            record = None if message is None else message.raw_message
+            if record is None or record.offset() is None:
+                await handler(*args, **kwargs)
+                return
+            partition = record.topic(), record.partition()
+            offset = record.offset()
+            await self._slots.acquire()
+            tracker = self._trackers.get(partition)
+            if tracker is None or offset <= tracker.last:
+                # first record of an assignment, or the partition was
+                # rewound - the old tracker's tasks still commit their own
+                # (already handled) prefix
+                tracker = self._trackers[partition] = OffsetTracker()
+            tracker.add(offset)
+            lane = (*partition, record.key()) if record.key() else None
+            task = asyncio.create_task(
+                self._run(
+                    partial(handler, *args, **kwargs),
+                    self._lanes.get(lane) if lane else None,
+                    message,
+                    tracker,
+                    offset,
+                )
+            )
+            self._tasks[task] = partition
+            task.add_done_callback(lambda t: self._tasks.pop(t, None))
+            if lane:
+                self._lanes[lane] = task
+                task.add_done_callback(lambda t: self._close_lane(lane, t))
+
+        return dispatched
+
+    async def drain(self) -> None:
+        """
+        waits for the records in flight and commits their offsets; records
+        polled meanwhile aren't waited for
+        """
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._flush_task is not None:
+            await self._flush_task
+
+    async def revoke(
+        self, partitions: list[tuple[str, int]], timeout: float
+    ) -> list[Any]:
+        """
+        waits up to `timeout` for the partitions' records in flight
+        :return: the offsets to commit for them
+        """
+        from confluent_kafka import TopicPartition
+
+        revoked = set(partitions)
+        running = [task for task, p in self._tasks.items() if p in revoked]
+        if running:
+            await asyncio.wait(running, timeout=timeout)
+        offsets = [
+            TopicPartition(*partition, self._committable[partition])
+            for partition in partitions
+            if partition in self._committable
+        ]
+        self.lose(partitions)
+        return offsets
+
+    def lose(self, partitions: list[tuple[str, int]]) -> None:
+        for partition in partitions:
+            self._trackers.pop(partition, None)
+            self._commits.pop(partition, None)
+            self._committable.pop(partition, None)
+
+    def _close_lane(self, lane: Hashable, task: asyncio.Task[None]) -> None:
+        if self._lanes.get(lane) is task:
+            del self._lanes[lane]
+
+    async def _run(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        previous: asyncio.Task[None] | None,
+        message: KafkaMessage,
+        tracker: OffsetTracker,
+        offset: int,
+    ) -> None:
+        try:
+            if previous is not None:
+                await asyncio.wait([previous])
+            await self._handle(call, message, offset)
+        finally:
+            self._slots.release()
+        if (committable := tracker.complete(offset)) is not None:
+            self._commit(message, committable)
+
+    async def _handle(
+        self,
+        call: Callable[[], Awaitable[Any]],
+        message: KafkaMessage,
+        offset: int,
+    ) -> None:
+        attempt = 0
+        while True:
+            try:
+                await call()
+                return
+            except Exception as exc:
+                attempt += 1
+                if (
+                    attempt >= self._max_attempts
+                    or not isinstance(exc, self._exceptions)
+                ) and await self._give_up(message, offset, exc):
+                    return
+                # NOTE: clamped so a lane stuck for good doesn't overflow the
+                # float the doubling is computed in
+                delay = exponential_backoff(
+                    min(attempt, 64), self._base_delay, self._max_delay
+                )
+                logger.exception(
+                    "%s: offset %s failed, retrying in %.2fs (attempt %s)",
+                    self.name,
+                    offset,
+                    delay,
+                    attempt,
+                )
+            await asyncio.sleep(delay)
+
+    async def _give_up(
+        self, message: KafkaMessage, offset: int, exc: Exception
+    ) -> bool:
+        """
+        :return: whether the record is off the lane's hands - never without
+        `on_exhausted`, since committing past it would lose it
+        """
+        if self._on_exhausted is None:
+            return False
+        try:
+            await self._on_exhausted(message, exc)
+        except Exception:
+            logger.exception(
+                "%s: failed to hand off offset %s", self.name, offset
+            )
+            return False
+        return True
+
+    def _commit(self, message: KafkaMessage, offset: int) -> None:
+        consumer = getattr(message.consumer, "consumer", None)
+        if consumer is None:
+            # not a live confluent consumer - FastStream's test broker
+            return
+        record = message.raw_message
+        partition = record.topic(), record.partition()
+        if partition not in self._trackers:
+            # revoked while it ran - no longer ours to commit
+            return
+        self._commits[partition] = consumer, offset
+        self._committable[partition] = offset
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._flush())
+
+    async def _flush(self) -> None:
+        # NOTE: yield once so every record finishing in this loop pass
+        # lands in the same commit
+        await asyncio.sleep(0)
+        commits, self._commits, self._flush_task = self._commits, {}, None
+        from confluent_kafka import TopicPartition
+
+        by_consumer: dict[int, tuple[Any, list[TopicPartition]]] = {}
+        for (topic, partition), (consumer, offset) in commits.items():
+            _, offsets = by_consumer.setdefault(id(consumer), (consumer, []))
+            offsets.append(TopicPartition(topic, partition, offset))
+        for consumer, offsets in by_consumer.values():
+            try:
+                # NOTE: an async commit only queues the request, so unlike
+                # poll it doesn't need FastStream's consumer thread
+                consumer.commit(offsets=offsets, asynchronous=True)
+            except Exception:
+                # revoked meanwhile - the new owner redelivers from the
+                # last commit that made it
+                logger.warning(
+                    "%s: failed to commit %s",
+                    self.name,
+                    offsets,
+                    exc_info=True,
+                )
@@ -0,0 +1,131 @@
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Literal
+
+type KafkaProfile = Literal["low_latency", "balanced", "high_throughput"]
+type KafkaCompression = Literal["none", "gzip", "snappy", "lz4", "zstd"]
+
+# FastStream's default `max_request_size`, sent as `message.max.bytes` -
+# librdkafka refuses a `batch.size` above it
+MAX_REQUEST_SIZE = 1024 * 1024
+
+
+@dataclass(frozen=True, slots=True)
+class KafkaTuning:
+    """
+    librdkafka batching and fetch knobs; `None` keeps FastStream's default
+
+    :param linger_ms: how long the producer waits to fill a batch
+    :param batch_size: max bytes of one producer batch
+    :param compression: producer batch compression
+    :param queue_buffering_max_messages: records the producer buffers
+    before `publish` starts failing with a full queue
+    :param fetch_min_bytes: bytes a fetch waits for before returning
+    :param fetch_max_wait_ms: cap on that wait
+    :param max_partition_fetch_bytes: bytes fetched per partition at once
+    """
+
+    linger_ms: int | None = None
+    batch_size: int | None = None
+    compression: KafkaCompression | None = None
+    queue_buffering_max_messages: int | None = None
+    fetch_min_bytes: int | None = None
+    fetch_max_wait_ms: int | None = None
+    max_partition_fetch_bytes: int | None = None
+
+    def __post_init__(self):
+        if self.linger_ms is not None and not 0 <= self.linger_ms <= 900_000:
+            raise ValueError("linger_ms must be within 0..900000")
+        if self.fetch_max_wait_ms is not None and not (
+            0 <= self.fetch_max_wait_ms <= 300_000
+        ):
+            raise ValueError("fetch_max_wait_ms must be within 0..300000")
+        for name in (
+            "batch_size",
+            "queue_buffering_max_messages",
+            "fetch_min_bytes",
+            "max_partition_fetch_bytes",
+        ):
+            if (value := getattr(self, name)) is not None and value < 1:
+                raise ValueError(f"{name} must be positive")
+        if self.batch_size is not None and self.batch_size > MAX_REQUEST_SIZE:
+            raise ValueError(f"batch_size can't exceed {MAX_REQUEST_SIZE}")
+
+    def override(self, other: "KafkaTuning") -> "KafkaTuning":
+        """:return: this tuning with `other`'s non-`None` knobs on top"""
+        changes = {k: v for k, v in asdict(other).items() if v is not None}
+        return replace(self, **changes)
+
+    def router_kwargs(self) -> dict[str, Any]:
+        """
+        :return: `KafkaRouter` arguments; knobs FastStream has no argument
+        for go through its raw `config`, which it hands to the producer
+        and every consumer alike
+        """
+        kwargs: dict[str, Any] = {}
+        if self.linger_ms is not None:
+            kwargs["linger_ms"] = self.linger_ms
+        if self.compression not in (None, "none"):
+            kwargs["compression_type"] = self.compression
+        config = {
+            key: value
+            for key, value in (
+                ("batch.size", self.batch_size),
+                (
+                    "queue.buffering.max.messages",
+                    self.queue_buffering_max_messages,
+                ),
+                ("fetch.min.bytes", self.fetch_min_bytes),
+                ("fetch.wait.max.ms", self.fetch_max_wait_ms),
+                ("max.partition.fetch.bytes", self.max_partition_fetch_bytes),
+            )
+            if value is not None
+        }
+        if config:
+            kwargs["config"] = config
+        return kwargs
+
+
+PROFILES: dict[KafkaProfile, KafkaTuning] = {
+    # every record leaves at once, every fetch returns at once
+    "low_latency": KafkaTuning(
+        linger_ms=0,
+        compression="none",
+        fetch_min_bytes=1,
+        fetch_max_wait_ms=10,
+    ),
+    "balanced": KafkaTuning(
+        linger_ms=5,
+        batch_size=131_072,
+        compression="lz4",
+        fetch_min_bytes=1,
+        fetch_max_wait_ms=100,
+    ),
+    # few large compressed batches, fetches wait for a batch's worth
+    "high_throughput": KafkaTuning(
+        linger_ms=50,
+        batch_size=MAX_REQUEST_SIZE,
+        compression="zstd",
+        queue_buffering_max_messages=500_000,
+        fetch_min_bytes=65_536,
+        fetch_max_wait_ms=500,
+        max_partition_fetch_bytes=8 * 1024 * 1024,
+    ),
+}
+
+
+def resolve_tuning(
+    default: KafkaProfile | KafkaTuning | None,
+    profile: KafkaProfile | None,
+    overrides: KafkaTuning,
+) -> KafkaTuning:
+    """
+    :param default: the service's own choice, from code
+    :param profile: a profile picked by settings, replacing `default`
+    :param overrides: single knobs set by settings, on top of either
+    """
+    base = profile if profile is not None else default
+    if base is None:
+        base = KafkaTuning()
+    elif isinstance(base, str):
+        base = PROFILES[base]
+    return base.override(overrides)
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Callable, Sequence
+from typing import TYPE_CHECKING, Any, Literal, Protocol
+
+if TYPE_CHECKING:
+    from confluent_kafka import Consumer, TopicPartition
+
+logger = logging.getLogger(__name__)
+
+type KafkaAssignor = Literal["range", "roundrobin", "cooperative-sticky"]
+
+
+class RebalanceHook(Protocol):
+    async def revoke(
+        self, partitions: list[tuple[str, int]], timeout: float
+    ) -> list[TopicPartition]:
+        """
+        :param timeout: seconds it may wait for work in flight
+        :return: offsets to commit before the partitions move
+        """
+        ...
+
+    def lose(self, partitions: list[tuple[str, int]]) -> None:
+        """forgets partitions already owned by someone else"""
+        ...
+
+
+class RebalanceListener:
+    """One subscriber's `on_revoke` / `on_lost` callbacks.
+
+    Both run on the consumer's thread, inside its poll, while the event
+    loop is free. Revoked partitions go to each hook on the loop, and the
+    offsets they return are committed synchronously before the partitions
+    move - along with the consumer's position, for a subscriber whose
+    records are acked one after another, which is exactly how far it got.
+    Lost partitions already belong to someone else, so the hooks only
+    forget them.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float,
+        commit_positions: bool,
+        hooks: Sequence[RebalanceHook] = (),
+        on_revoke: Callable[..., Any] | None = None,
+        on_lost: Callable[..., Any] | None = None,
+    ):
+        """
+        :param name: used in logs
+        :param timeout: seconds the hooks get to finish a revocation
+        :param commit_positions: commit the consumer's position too
+        :param on_revoke: the subscriber's own callback, called after
+        :param on_lost: the subscriber's own callback, called after
+        """
+        self.name = name
+        self.timeout = timeout
+        self.commit_positions = commit_positions
+        self.hooks = list(hooks)
+        self.loop: asyncio.AbstractEventLoop | None = None
+        self._on_revoke = on_revoke
+        self._on_lost = on_lost
+
+    def on_revoke(
+        self, consumer: Consumer, partitions: list[TopicPartition]
+    ) -> None:
+        offsets: list[TopicPartition] = []
+        if self.commit_positions:
+            offsets += [
+                tp for tp in consumer.position(partitions) if tp.offset >= 0
+            ]
+        offsets += self._revoke(_keys(partitions))
+        if offsets:
+            try:
+                consumer.commit(offsets=offsets, asynchronous=False)
+            except Exception:
+                logger.warning(
+                    f"{self.name}: failed to commit revoked partitions",
+                    exc_info=True,
+                )
+        if self._on_revoke is not None:
+            self._on_revoke(consumer, partitions)
+
+    def on_lost(
+        self, consumer: Consumer, partitions: list[TopicPartition]
+    ) -> None:
+        if self.loop is not None:
+            for hook in self.hooks:
+                self.loop.call_soon_threadsafe(hook.lose, _keys(partitions))
+        if self._on_lost is not None:
+            self._on_lost(consumer, partitions)
+
+    def _revoke(self, partitions: list[tuple[str, int]]) -> list[Any]:
+        if not self.hooks or self.loop is None:
+            return []
+        future = asyncio.run_coroutine_threadsafe(
+            self._run_hooks(partitions), self.loop
+        )
+        try:
+            # NOTE: a margin over the hooks' own timeout for their commits
+            return future.result(self.timeout + 5)
+        except Exception:
+            future.cancel()
+            logger.warning(
+                f"{self.name}: in-flight work of revoked partitions "
+                "didn't finish, its offsets stay uncommitted",
+                exc_info=True,
+            )
+            return []
+
+    async def _run_hooks(
+        self, partitions: list[tuple[str, int]]
+    ) -> list[TopicPartition]:
+        offsets = []
+        for hook in self.hooks:
+            offsets += await hook.revoke(partitions, self.timeout)
+        return offsets
+
+
+def _keys(partitions: list[TopicPartition]) -> list[tuple[str, int]]:
+    return [(tp.topic, tp.partition) for tp in partitions]
@@ -1,11 +1,43 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 from fastloom.settings.base import MonitoringSettings
+from fastloom.signals.kafka.profiles import (
+    KafkaCompression,
+    KafkaProfile,
+    KafkaTuning,
+)
+from fastloom.signals.kafka.rebalance import KafkaAssignor
 from fastloom.signals.kafka.schemas import KafkaBootstrapServers
 
 
 class KafkaSettings(BaseModel):
     KAFKA_URI: KafkaBootstrapServers
+    KAFKA_PROFILE: KafkaProfile | None = None
+    KAFKA_LINGER_MS: int | None = Field(None, ge=0, le=900_000)
+    KAFKA_BATCH_SIZE: int | None = Field(None, ge=1)
+    KAFKA_COMPRESSION: KafkaCompression | None = None
+    KAFKA_QUEUE_BUFFERING_MAX_MESSAGES: int | None = Field(None, ge=1)
+    KAFKA_FETCH_MIN_BYTES: int | None = Field(None, ge=1)
+    KAFKA_FETCH_MAX_WAIT_MS: int | None = Field(None, ge=0, le=300_000)
+    KAFKA_MAX_PARTITION_FETCH_BYTES: int | None = Field(None, ge=1)
+    KAFKA_STATIC_MEMBERSHIP: bool = False
+    # the stable part of group.instance.id, the hostname by default
+    KAFKA_INSTANCE_ID: str | None = None
+    KAFKA_ASSIGNOR: KafkaAssignor | None = None
+    KAFKA_SESSION_TIMEOUT_MS: int | None = Field(None, ge=1)
+    # librdkafka statistics behind the consumer metrics, 0 turns them off
+    KAFKA_STATS_INTERVAL_MS: int = Field(15_000, ge=0)
+
+    def tuning_overrides(self) -> KafkaTuning:
+        return KafkaTuning(
+            linger_ms=self.KAFKA_LINGER_MS,
+            batch_size=self.KAFKA_BATCH_SIZE,
+            compression=self.KAFKA_COMPRESSION,
+            queue_buffering_max_messages=self.KAFKA_QUEUE_BUFFERING_MAX_MESSAGES,
+            fetch_min_bytes=self.KAFKA_FETCH_MIN_BYTES,
+            fetch_max_wait_ms=self.KAFKA_FETCH_MAX_WAIT_MS,
+            max_partition_fetch_bytes=self.KAFKA_MAX_PARTITION_FETCH_BYTES,
+        )
 
 
 class KafkaSubscriptable(MonitoringSettings, KafkaSettings): ...
@@ -0,0 +1,345 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+from typing import TYPE_CHECKING, Any, Protocol
+
+from pydantic import TypeAdapter, ValidationError
+
+if TYPE_CHECKING:
+    from confluent_kafka import Consumer, Message, TopicPartition
+
+logger = logging.getLogger(__name__)
+
+# (topic, partition) -> the next offset to read
+type Positions = dict[tuple[str, int], int]
+
+# records applied between store flushes while catching up
+_BOOTSTRAP_FLUSH_EVERY = 1000
+
+
+class TableStore[T](Protocol):
+    def open(self, model: type[T]) -> Positions:
+        """:return: where each partition left off, empty for a new store"""
+        ...
+
+    def get(self, key: bytes) -> T | None: ...
+
+    def put(self, key: bytes, value: T, raw: bytes) -> None: ...
+
+    def delete(self, key: bytes) -> None: ...
+
+    def advance(self, topic: str, partition: int, offset: int) -> None: ...
+
+    def flush(self) -> None: ...
+
+    def close(self) -> None: ...
+
+    def __len__(self) -> int: ...
+
+
+class MemoryTableStore[T]:
+    """keeps decoded values in a dict - rebuilt from the topic on start"""
+
+    def __init__(self):
+        self._values: dict[bytes, T] = {}
+
+    def open(self, model: type[T]) -> Positions:
+        return {}
+
+    def get(self, key: bytes) -> T | None:
+        return self._values.get(key)
+
+    def put(self, key: bytes, value: T, raw: bytes) -> None:
+        self._values[key] = value
+
+    def delete(self, key: bytes) -> None:
+        self._values.pop(key, None)
+
+    def advance(self, topic: str, partition: int, offset: int) -> None:
+        pass
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class SqliteTableStore[T]:
+    """keeps raw values and read positions in a SQLite file, so a restart
+    only reads what it missed; one file per table"""
+
+    def __init__(self, path: str):
+        """
+        :param path: the database file
+        """
+        self.path = path
+        self._db: sqlite3.Connection | None = None
+        self._adapter: TypeAdapter[T] | None = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            raise RuntimeError(f"table store {self.path} isn't open")
+        return self._db
+
+    def open(self, model: type[T]) -> Positions:
+        self._adapter = TypeAdapter(model)
+        self._db = sqlite3.connect(self.path)
+        self._db.executescript(
+            """
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS records (
+                key BLOB PRIMARY KEY, value BLOB NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS positions (
+                topic TEXT, partition INTEGER, offset INTEGER NOT NULL,
+                PRIMARY KEY (topic, partition)
+            );
+            """
+        )
+        rows = self._db.execute(
+            "SELECT topic, partition, offset FROM positions"
+        )
+        return {
+            (topic, partition): offset for topic, partition, offset in rows
+        }
+
+    def get(self, key: bytes) -> T | None:
+        row = self.db.execute(
+            "SELECT value FROM records WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or self._adapter is None:
+            return None
+        return self._adapter.validate_json(row[0])
+
+    def put(self, key: bytes, value: T, raw: bytes) -> None:
+        self.db.execute(
+            "INSERT OR REPLACE INTO records VALUES (?, ?)", (key, raw)
+        )
+
+    def delete(self, key: bytes) -> None:
+        self.db.execute("DELETE FROM records WHERE key = ?", (key,))
+
+    def advance(self, topic: str, partition: int, offset: int) -> None:
+        self.db.execute(
+            "INSERT OR REPLACE INTO positions VALUES (?, ?, ?)",
+            (topic, partition, offset),
+        )
+
+    def flush(self) -> None:
+        self.db.commit()
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.commit()
+            self._db.close()
+            self._db = None
+
+    def __len__(self) -> int:
+        return self.db.execute("SELECT count(*) FROM records").fetchone()[0]
+
+
+class KafkaTable[T]:
+    """A compacted topic materialized into a local store, by key.
+
+    On assignment every partition starts where the store left off - the
+    beginning for a new store - and the high watermark at that point is
+    its snapshot: the table is ready once every partition got past it,
+    and keeps applying new records from then on. A record replaces its
+    key's value, a tombstone deletes it.
+    """
+
+    def __init__(
+        self,
+        topic: str,
+        model: type[T],
+        store: TableStore[T],
+        cooperative: bool = False,
+        catch_up_interval: float = 1.0,
+    ):
+        """
+        :param cooperative: whether the consumer rebalances incrementally
+        :param catch_up_interval: seconds between position checks while
+        catching up - see `_watch`
+        """
+        self.topic = topic
+        self.model = model
+        self._store = store
+        self._adapter = TypeAdapter(model)
+        self._cooperative = cooperative
+        self._catch_up_interval = catch_up_interval
+        self._positions: Positions = {}
+        self._open = False
+        # (topic, partition) -> high watermark still to reach
+        self._pending: dict[tuple[str, int], int] = {}
+        self._assigned = False
+        self._ready = asyncio.Event()
+        self._applied = 0
+        self._consumer: Consumer | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._watcher: asyncio.Task[None] | None = None
+
+    def get(self, key: bytes | str) -> T | None:
+        """:return: the key's current value, None if it has none"""
+        key = key.encode() if isinstance(key, str) else key
+        return self._opened().get(key)
+
+    def __contains__(self, key: bytes | str) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return len(self._opened())
+
+    @property
+    def is_ready(self) -> bool:
+        return self._ready.is_set()
+
+    async def ready(self) -> None:
+        """waits until the table holds the snapshot"""
+        await self._ready.wait()
+
+    def open(self) -> None:
+        """loads the store - before the consumer starts"""
+        self._loop = asyncio.get_running_loop()
+        self._opened()
+        self._watcher = asyncio.create_task(self._watch())
+
+    async def close(self) -> None:
+        if self._watcher is not None:
+            self._watcher.cancel()
+        self._store.close()
+        self._open = False
+
+    def on_assign(
+        self, consumer: Consumer, partitions: list[TopicPartition]
+    ) -> None:
+        # NOTE: runs on the consumer's thread, inside its poll
+        from confluent_kafka import OFFSET_BEGINNING
+
+        highs = {}
+        for tp in partitions:
+            partition = tp.topic, tp.partition
+            tp.offset = self._positions.get(partition, OFFSET_BEGINNING)
+            try:
+                low, high = consumer.get_watermark_offsets(
+                    tp, timeout=10, cached=False
+                )
+            except Exception:
+                logger.exception(
+                    f"table {self.topic}: no watermarks for {partition}, "
+                    "not waiting for it"
+                )
+                continue
+            if high > max(tp.offset, low):
+                highs[partition] = high
+        if self._cooperative:
+            consumer.incremental_assign(partitions)
+        else:
+            consumer.assign(partitions)
+        self._call_soon(self._on_assigned, consumer, highs)
+
+    def on_revoke(
+        self, consumer: Consumer, partitions: list[TopicPartition]
+    ) -> None:
+        revoked = [(tp.topic, tp.partition) for tp in partitions]
+        self._call_soon(self._on_revoked, revoked)
+
+    def apply(self, record: Message) -> None:
+        """applies one record of the topic"""
+        store = self._opened()
+        key, raw = record.key(), record.value()
+        if key is None:
+            logger.warning(f"table {self.topic}: skipped a record with no key")
+        elif raw is None:
+            store.delete(key)
+        else:
+            try:
+                store.put(key, self._adapter.validate_json(raw), raw)
+            except ValidationError:
+                logger.exception(
+                    f"table {self.topic}: skipped an invalid value, "
+                    f"keeping the previous one for {key!r}"
+                )
+        topic, partition = record.topic(), record.partition()
+        offset = record.offset() + 1
+        self._positions[topic, partition] = offset
+        store.advance(topic, partition, offset)
+        self._applied += 1
+        if self._pending.get((topic, partition), offset) <= offset:
+            self._pending.pop((topic, partition), None)
+        if self.is_ready or self._applied % _BOOTSTRAP_FLUSH_EVERY == 0:
+            store.flush()
+        self._check_ready()
+
+    def _opened(self) -> TableStore[T]:
+        # NOTE: lazily too - a table is readable before its consumer
+        # starts, and the test broker never starts it
+        if not self._open:
+            self._positions = self._store.open(self.model)
+            self._open = True
+        return self._store
+
+    def _call_soon(self, callback: Any, *args: Any) -> None:
+        if self._loop is None:
+            callback(*args)
+        else:
+            self._loop.call_soon_threadsafe(callback, *args)
+
+    def _on_assigned(
+        self, consumer: Consumer, highs: dict[tuple[str, int], int]
+    ) -> None:
+        self._consumer = consumer
+        self._pending.update(highs)
+        self._assigned = True
+        self._check_ready()
+
+    def _on_revoked(self, revoked: list[tuple[str, int]]) -> None:
+        for partition in revoked:
+            self._pending.pop(partition, None)
+
+    def _check_ready(self) -> None:
+        if self.is_ready or not self._assigned or self._pending:
+            return
+        self._store.flush()
+        self._ready.set()
+        logger.info(f"table {self.topic}: caught up, {len(self)} keys")
+
+    async def _watch(self) -> None:
+        # NOTE: a partition whose log ends in transaction markers never
+        # hands its last offsets to the handler - once no record came in
+        # for a while, the consumer's position tells whether it's past them
+        from confluent_kafka import TopicPartition
+
+        while not self.is_ready:
+            applied = self._applied
+            await asyncio.sleep(self._catch_up_interval)
+            if self._consumer is None or self._applied != applied:
+                continue
+            try:
+                positions = await asyncio.to_thread(
+                    self._consumer.position,
+                    [
+                        TopicPartition(*partition)
+                        for partition in self._pending
+                    ],
+                )
+            except Exception:
+                logger.warning(
+                    f"table {self.topic}: failed to check positions",
+                    exc_info=True,
+                )
+                continue
+            if self._applied != applied:
+                continue
+            for tp in positions:
+                high = self._pending.get((tp.topic, tp.partition))
+                if high is not None and tp.offset >= high:
+                    del self._pending[tp.topic, tp.partition]
+            self._check_ready()
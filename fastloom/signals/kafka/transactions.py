@@ -0,0 +1,330 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import (
+    Awaitable,
+    Callable,
+    Collection,
+    Iterable,
+    Sequence,
+)
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial, wraps
+from typing import TYPE_CHECKING, Any
+
+from fastloom.signals.route import Tombstone
+
+if TYPE_CHECKING:
+    from faststream.confluent.message import KafkaMessage
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class TransactionPolicy:
+    """
+    :param max_records: input records per transaction; reaching it
+    commits right away
+    :param commit_interval: seconds a transaction stays open at most
+    :param timeout: seconds the broker gives an open transaction before
+    aborting it (`transaction.timeout.ms`)
+    """
+
+    max_records: int = 500
+    commit_interval: float = 0.1
+    timeout: float = 60.0
+
+    def __post_init__(self):
+        if self.max_records < 1:
+            raise ValueError("max_records must be at least 1")
+        if not 0 < self.commit_interval < self.timeout:
+            raise ValueError("expected 0 < commit_interval < timeout")
+
+
+@dataclass(frozen=True, slots=True)
+class KafkaOutput:
+    """
+    a record a transactional handler produces
+
+    :param value: encoded like `broker.publish` does; `None` or
+    `TOMBSTONE` produce a real null value
+    """
+
+    topic: str
+    value: Any
+    key: bytes | str | None = None
+    headers: dict[str, str] | None = None
+
+
+type Outputs = KafkaOutput | Iterable[KafkaOutput] | None
+
+
+class Transactor:
+    """Commits a subscriber's outputs and input offsets in one transaction.
+
+    Records join the open transaction one after another - the poll loop
+    hands them over in order - and it commits once it holds `max_records`
+    input records or has been open `commit_interval` seconds. A handler
+    error or a failed commit aborts it and seeks every partition in it
+    back to its first record, so the whole transaction is redone and
+    nothing of it is visible to `read_committed` consumers.
+    """
+
+    def __init__(
+        self,
+        policy: TransactionPolicy,
+        config: Callable[[], dict[str, Any]],
+        name: str,
+        producer_factory: Callable[[dict[str, Any]], Any] | None = None,
+    ):
+        """
+        :param config: the transactional producer's librdkafka config
+        :param name: used in logs
+        :param producer_factory: builds the producer, confluent's by default
+        """
+        self.policy = policy
+        self.name = name
+        self._config = config
+        self._producer_factory = producer_factory
+        self._producer: Any = None
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix=name)
+        self._lock = asyncio.Lock()
+        self._generation = 0
+        self._open = False
+        self._records = 0
+        # (topic, partition) -> (first offset, next offset)
+        self._offsets: dict[tuple[str, int], tuple[int, int]] = {}
+        self._rewound: dict[tuple[str, int], int] = {}
+        self._consumer: Any = None
+        self._timer: asyncio.Task[None] | None = None
+
+    def wrap[**P](
+        self,
+        handler: Callable[P, Awaitable[Outputs]],
+        get_message: Callable[[], KafkaMessage | None],
+    ) -> Callable[P, Awaitable[None]]:
+        """
+        :param get_message: the record (or batch) being handled
+        """
+
+        @wraps(handler)
+        async def transactional(*args: P.args, **kwargs: P.kwargs) -> None:
+            message = get_message()
+            if message is None:
+                raise RuntimeError(f"{self.name}: no message in context")
+            raw = message.raw_message
+            records = list(raw) if isinstance(raw, Sequence) else [raw]
+            async with self._lock:
+                if not (records := self._skip_rewound(records)):
+                    return
+                try:
+                    await self._begin(message)
+                    for output in _outputs(await handler(*args, **kwargs)):
+                        await self._produce(output)
+                except Exception:
+                    self._track(records)
+                    await self._abort()
+                    raise
+                self._track(records)
+                if self._records >= self.policy.max_records:
+                    await self._commit()
+
+        return transactional
+
+    async def close(self) -> None:
+        """commits the open transaction and releases the producer"""
+        if self._timer is not None:
+            self._timer.cancel()
+        async with self._lock:
+            if self._open:
+                await self._commit()
+        if self._producer is not None:
+            await self._call(self._producer.flush, self.policy.timeout)
+        self._executor.shutdown(wait=False)
+
+    async def revoke(
+        self, partitions: list[tuple[str, int]], timeout: float
+    ) -> list[Any]:
+        """
+        commits the open transaction if it holds revoked partitions - its
+        offsets commit with it, so there's nothing left to return
+        """
+        revoked = set(partitions)
+        async with asyncio.timeout(timeout):
+            # the record in flight, if any, finishes first
+            await self._lock.acquire()
+        try:
+            self.lose(partitions)
+            if self._open and revoked & self._offsets.keys():
+                await self._commit(unowned=revoked, revoking=True)
+        finally:
+            self._lock.release()
+        return []
+
+    def lose(self, partitions: list[tuple[str, int]]) -> None:
+        for partition in partitions:
+            self._rewound.pop(partition, None)
+
+    async def _call(self, fn: Callable[..., Any], *args: Any) -> Any:
+        # NOTE: transactional calls block on the coordinator - keep them
+        # off the event loop, on one thread so they stay in order
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, partial(fn, *args)
+        )
+
+    async def _begin(self, message: KafkaMessage) -> None:
+        if self._open:
+            return
+        self._consumer = message.consumer
+        if self._producer is None:
+            producer = self._create_producer()
+            await self._call(producer.init_transactions, self.policy.timeout)
+            self._producer = producer
+        await self._call(self._producer.begin_transaction)
+        self._open = True
+        self._generation += 1
+        self._timer = asyncio.create_task(self._commit_after(self._generation))
+
+    def _create_producer(self) -> Any:
+        if self._producer_factory is not None:
+            return self._producer_factory(self._config())
+        from confluent_kafka import Producer
+
+        return Producer(self._config())
+
+    async def _commit_after(self, generation: int) -> None:
+        await asyncio.sleep(self.policy.commit_interval)
+        async with self._lock:
+            if self._open and self._generation == generation:
+                await self._commit()
+
+    async def _produce(self, output: KafkaOutput) -> None:
+        from faststream.message.utils import encode_message
+
+        value: bytes | None = None
+        headers = {"content-type": ""}
+        if not isinstance(output.value, Tombstone | None):
+            value, content_type = encode_message(output.value, None)
+            headers["content-type"] = content_type or ""
+        headers |= output.headers or {}
+        key = (
+            output.key.encode() if isinstance(output.key, str) else output.key
+        )
+        produce = partial(
+            self._producer.produce,
+            output.topic,
+            value,
+            key,
+            headers=list(headers.items()),
+        )
+        while True:
+            try:
+                return produce()
+            except BufferError:
+                # local queue full - wait for deliveries to drain it
+                await self._call(self._producer.poll, 0.1)
+
+    def _track(self, records: list[Any]) -> None:
+        for record in records:
+            partition = record.topic(), record.partition()
+            first, _ = self._offsets.get(partition, (record.offset(), None))
+            self._offsets[partition] = first, record.offset() + 1
+        self._records += len(records)
+
+    def _skip_rewound(self, records: list[Any]) -> list[Any]:
+        # records polled before a rewind's seek took effect - they come
+        # again after the ones being redone
+        kept = []
+        for record in records:
+            partition = record.topic(), record.partition()
+            rewound = self._rewound.get(partition)
+            if rewound is not None and record.offset() > rewound:
+                continue
+            self._rewound.pop(partition, None)
+            kept.append(record)
+        return kept
+
+    async def _commit(
+        self,
+        unowned: Collection[tuple[str, int]] = frozenset(),
+        revoking: bool = False,
+    ) -> None:
+        from confluent_kafka import TopicPartition
+
+        offsets = [
+            TopicPartition(topic, partition, offset)
+            for (topic, partition), (_, offset) in self._offsets.items()
+        ]
+        try:
+            await self._call(
+                self._producer.send_offsets_to_transaction,
+                offsets,
+                self._consumer.consumer.consumer_group_metadata(),
+                self.policy.timeout,
+            )
+            await self._call(
+                self._producer.commit_transaction, self.policy.timeout
+            )
+        except Exception:
+            logger.exception(f"{self.name}: transaction commit failed")
+            await self._abort(unowned, revoking)
+            return
+        self._reset()
+
+    async def _abort(
+        self,
+        unowned: Collection[tuple[str, int]] = frozenset(),
+        revoking: bool = False,
+    ) -> None:
+        """
+        :param unowned: partitions being revoked - left for their new
+        owner, which starts from the last commit
+        :param revoking: called from `on_revoke`, which holds FastStream's
+        consumer thread
+        """
+        from confluent_kafka import TopicPartition
+
+        if self._open:
+            try:
+                await self._call(
+                    self._producer.abort_transaction, self.policy.timeout
+                )
+            except Exception:
+                # fenced or otherwise fatal - start over with a new
+                # producer, whose init_transactions() fences this one
+                logger.exception(f"{self.name}: transaction abort failed")
+                self._producer = None
+        for (topic, partition), (first, _) in self._offsets.items():
+            if (topic, partition) in unowned:
+                continue
+            self._rewound[topic, partition] = first
+            try:
+                if revoking:
+                    # NOTE: FastStream's seek queues on the consumer thread,
+                    # which waits on this revoke - seek directly instead,
+                    # safe since that thread isn't polling meanwhile
+                    self._consumer.consumer.seek(
+                        TopicPartition(topic, partition, first)
+                    )
+                else:
+                    await self._consumer.seek(topic, partition, first)
+            except Exception:
+                # revoked - its new owner starts from the last commit
+                logger.warning(
+                    f"{self.name}: failed to rewind {topic}[{partition}]",
+                    exc_info=True,
+                )
+        self._reset()
+
+    def _reset(self) -> None:
+        self._open, self._records, self._offsets = False, 0, {}
+
+
+def _outputs(result: Outputs) -> Iterable[KafkaOutput]:
+    if result is None:
+        return ()
+    if isinstance(result, KafkaOutput):
+        return (result,)
+    return result
@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import wraps
+from typing import TYPE_CHECKING
+
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
+
+if TYPE_CHECKING:
+    from aio_pika.abc import AbstractChannel
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class AdaptiveLimit:
+    """
+    :param min_limit: never go below this many in-flight messages
+    :param max_limit: never go above this many in-flight messages
+    :param initial: starting limit, `min_limit` when unset
+    :param target_latency: mean handler latency (seconds) a window may
+    reach before the limit is cut
+    :param max_error_rate: share of failed handler calls a window may
+    reach before the limit is cut
+    :param window: handler calls observed per adjustment
+    :param decrease: factor the limit is multiplied by on a cut
+    """
+
+    min_limit: int = 1
+    max_limit: int = 64
+    initial: int | None = None
+    target_latency: float = 1.0
+    max_error_rate: float = 0.05
+    window: int = 20
+    decrease: float = 0.5
+
+    def __post_init__(self):
+        if not 1 <= self.min_limit <= self.max_limit:
+            raise ValueError("expected 1 <= min_limit <= max_limit")
+        if not 0 < self.decrease < 1:
+            raise ValueError("decrease must be between 0 and 1")
+
+
+class AdaptiveConcurrency:
+    """AIMD limit on one subscriber's in-flight handler calls.
+
+    Every `window` calls, a window that stayed under both the latency and
+    the error-rate targets while actually using the whole limit grows it
+    by one; a window over either target multiplies it by `decrease`. The
+    limit is enforced twice: as the subscriber channel's `basic.qos`
+    prefetch, so the broker stops pushing more, and as a gate in front of
+    the handler, so a cut applies to already-delivered messages too.
+    """
+
+    limit: int
+    prefetch: int
+    in_flight: int
+
+    def __init__(self, config: AdaptiveLimit, name: str):
+        """
+        :param config: bounds and targets
+        :param name: `subscriber` attribute on the exported metrics
+        """
+        self.config = config
+        self.limit = config.initial or config.min_limit
+        self.limit = min(max(self.limit, config.min_limit), config.max_limit)
+        self.prefetch = self.limit
+        self.in_flight = 0
+        self._channels: list[Callable[[], AbstractChannel | None]] = []
+        self._slot_freed = asyncio.Condition()
+        self._calls = 0
+        self._failures = 0
+        self._latency = 0.0
+        self._saturated = False
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._attributes = {"subscriber": name}
+        for metric, attribute, description in (
+            (
+                "rabbit.subscriber.concurrency",
+                "limit",
+                "Current in-flight handler limit of an adaptive subscriber",
+            ),
+            (
+                "rabbit.subscriber.prefetch",
+                "prefetch",
+                "Current basic.qos prefetch of an adaptive subscriber",
+            ),
+        ):
+            meter.create_observable_gauge(
+                metric,
+                callbacks=[self._observer(attribute)],
+                description=description,
+            )
+
+    def _observer(
+        self, attribute: str
+    ) -> Callable[[CallbackOptions], list[Observation]]:
+        def observe(_options: CallbackOptions) -> list[Observation]:
+            return [Observation(getattr(self, attribute), self._attributes)]
+
+        return observe
+
+    def watch_channel(self, get: Callable[[], AbstractChannel | None]):
+        """
+        :param get: returns the subscriber's channel, `None` while it
+        isn't consuming
+        """
+        self._channels.append(get)
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        async with self._slot_freed:
+            await self._slot_freed.wait_for(
+                lambda: self.in_flight < self.limit
+            )
+            self.in_flight += 1
+            self._saturated |= self.in_flight >= self.limit
+        started = time.monotonic()
+        failed = True
+        try:
+            yield
+            failed = False
+        finally:
+            async with self._slot_freed:
+                self.in_flight -= 1
+                self._record(time.monotonic() - started, failed)
+                self._slot_freed.notify_all()
+
+    def wrap[**P](
+        self, handler: Callable[P, Awaitable[None]]
+    ) -> Callable[P, Awaitable[None]]:
+        @wraps(handler)
+        async def limited(*args: P.args, **kwargs: P.kwargs) -> None:
+            async with self.slot():
+                await handler(*args, **kwargs)
+
+        return limited
+
+    def _record(self, latency: float, failed: bool) -> None:
+        self._calls += 1
+        self._failures += failed
+        self._latency += latency
+        if self._calls < self.config.window:
+            return
+
+        mean_latency = self._latency / self._calls
+        error_rate = self._failures / self._calls
+        if (
+            mean_latency > self.config.target_latency
+            or error_rate > self.config.max_error_rate
+        ):
+            limit = int(self.limit * self.config.decrease)
+        elif self._saturated:
+            limit = self.limit + 1
+        else:
+            # a limit that was never reached says nothing about the next one
+            limit = self.limit
+        self._calls = self._failures = 0
+        self._latency = 0.0
+        self._saturated = False
+        self._set_limit(limit)
+
+    def _set_limit(self, limit: int) -> None:
+        limit = min(max(limit, self.config.min_limit), self.config.max_limit)
+        if limit == self.limit:
+            return
+        self.limit = limit
+        task = asyncio.create_task(self._apply_prefetch(limit))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _apply_prefetch(self, prefetch: int) -> None:
+        # NOTE: the channel is dedicated to this subscriber and its qos is
+        # global, so a new prefetch applies to its running consumers too -
+        # a per-consumer qos would only affect consumers started after it.
+        channels = {
+            id(channel): channel
+            for get in self._channels
+            if (channel := get()) is not None and not channel.is_closed
+        }
+        try:
+            for channel in channels.values():
+                await channel.set_qos(prefetch_count=prefetch, global_=True)
+        except Exception:
+            logger.exception("failed to apply an adaptive prefetch")
+            return
+        if prefetch == self.limit:
+            self.prefetch = prefetch
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Mapping, Sequence
+from contextvars import Context, copy_context
+from dataclasses import dataclass
+from types import TracebackType
+from typing import Any, Self
+
+
+class UnroutableMessage(Exception): ...
+
+
+@dataclass(frozen=True, slots=True)
+class PublishFailure:
+    index: int
+    routing_key: str
+    error: BaseException
+
+
+type BatchItem = tuple[str, Any]
+type BatchFlush = Callable[
+    [Sequence[BatchItem], Sequence[Context]], Awaitable[list[PublishFailure]]
+]
+
+
+class PublishBatch:
+    """
+    collects messages and publishes them together on `__aexit__`:
+    ```
+    async with RabbitSubscriber.batch() as batch:
+        for order in orders:
+            batch.publish("my_service.order.create", order)
+    if batch.failures:
+        ...
+    ```
+    each message is published in the context `publish` was called in, so
+    it's traced there as `broker.publish` would be
+    """
+
+    items: list[BatchItem]
+    contexts: list[Context]
+    failures: list[PublishFailure]
+
+    def __init__(self, flush: BatchFlush):
+        self._flush = flush
+        self.items = []
+        self.contexts = []
+        self.failures = []
+
+    def publish(self, routing_key: str, message: Any) -> None:
+        self.items.append((routing_key, message))
+        self.contexts.append(copy_context())
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        if exc_type is None and self.items:
+            self.failures = await self._flush(self.items, self.contexts)
+
+
+class PartialBatchFailure(Exception):
+    """
+    raised by a batch handler to fail only some of its items:
+    ```
+    raise PartialBatchFailure({3: exc, 7: exc})
+    ```
+    the items at those indices go down the retry path with their own
+    exception, every other item in the batch is acked
+    """
+
+    def __init__(self, errors: Mapping[int, Exception]):
+        super().__init__(f"{len(errors)} batch item(s) failed")
+        self.errors = dict(errors)
+
+
+class MessageBatcher[T]:
+    """
+    collects items submitted by concurrent deliveries and hands them to
+    `handler` as one list once `size` items are pending or `timeout`
+    seconds passed since the first one; each `submit` resolves with its
+    own item's outcome
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[list[T]], Awaitable[Any]],
+        size: int,
+        timeout: float,
+    ):
+        self._handler = handler
+        self._size = size
+        self._timeout = timeout
+        self._pending: list[tuple[T, asyncio.Future[None]]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._flushes: set[asyncio.Task[None]] = set()
+
+    async def submit(self, item: T) -> None:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self._size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._timeout, self._flush)
+        await future
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        task = asyncio.create_task(self._run(pending))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _run(self, pending: list[tuple[T, asyncio.Future[None]]]):
+        errors: dict[int, BaseException] = {}
+        try:
+            await self._handler([item for item, _ in pending])
+        except PartialBatchFailure as exc:
+            errors = dict(exc.errors)
+        except Exception as exc:
+            errors = dict.fromkeys(range(len(pending)), exc)
+        for index, (_, future) in enumerate(pending):
+            if future.done():  # the delivery was cancelled meanwhile
+                continue
+            if (error := errors.get(index)) is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(None)
@@ -0,0 +1,204 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from enum import IntEnum
+from functools import wraps
+from typing import TYPE_CHECKING, Any
+
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
+
+if TYPE_CHECKING:
+    from aio_pika.abc import AbstractChannel
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+_transitions = meter.create_counter(
+    "rabbit.subscriber.circuit_transitions",
+    description="Circuit breaker state changes of a Rabbit subscriber",
+)
+
+
+class CircuitState(IntEnum):
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+@dataclass(frozen=True, slots=True)
+class BreakerPolicy:
+    """
+    :param failure_rate: share of failed handler calls in the window that
+    opens the circuit
+    :param window: most recent handler calls the failure rate is taken over
+    :param min_calls: calls the window needs before it can open the circuit
+    :param open_for: seconds the circuit stays open before probing
+    :param half_open_calls: trial calls let through while half-open; all of
+    them succeeding closes the circuit, any of them failing reopens it
+    :param prefetch: the subscriber channel's prefetch while closed
+    """
+
+    failure_rate: float = 0.5
+    window: int = 20
+    min_calls: int = 10
+    open_for: float = 30.0
+    half_open_calls: int = 1
+    prefetch: int = 10
+
+    def __post_init__(self):
+        if not 0 < self.failure_rate <= 1:
+            raise ValueError("failure_rate must be between 0 and 1")
+        if not 1 <= self.min_calls <= self.window:
+            raise ValueError("expected 1 <= min_calls <= window")
+        if self.half_open_calls < 1 or self.prefetch < 1:
+            raise ValueError("half_open_calls and prefetch must be >= 1")
+
+
+class CircuitBreaker:
+    """Stops feeding one subscriber's handler while its dependency is down.
+
+    Closed, it lets every call through and watches the failure rate of the
+    last `window` calls. Past `failure_rate` it opens: new deliveries wait
+    in front of the handler instead of failing into the retry path, and the
+    channel's prefetch drops to 1, so the broker stops pushing more. After
+    `open_for` seconds it half-opens and lets `half_open_calls` trial calls
+    through, which decide between closing and opening again.
+    """
+
+    state: CircuitState
+
+    def __init__(self, policy: BreakerPolicy, name: str):
+        """
+        :param policy: thresholds and timings
+        :param name: `subscriber` attribute on the exported metrics
+        """
+        self.policy = policy
+        self.state = CircuitState.CLOSED
+        self._outcomes: deque[bool] = deque(maxlen=policy.window)
+        self._trials = 0
+        self._trial_successes = 0
+        self._changed = asyncio.Condition()
+        self._channels: list[Callable[[], AbstractChannel | None]] = []
+        self._tasks: set[asyncio.Task[None]] = set()
+        self._attributes = {"subscriber": name}
+        meter.create_observable_gauge(
+            "rabbit.subscriber.circuit_state",
+            callbacks=[self._observe_state],
+            description="0 closed, 1 half-open, 2 open",
+        )
+
+    def _observe_state(self, _options: CallbackOptions) -> list[Observation]:
+        return [Observation(int(self.state), self._attributes)]
+
+    def watch_channel(self, get: Callable[[], AbstractChannel | None]):
+        """
+        :param get: returns the subscriber's channel, `None` while it
+        isn't consuming
+        """
+        self._channels.append(get)
+
+    def wrap[**P](
+        self, handler: Callable[P, Awaitable[Any]]
+    ) -> Callable[P, Awaitable[Any]]:
+        @wraps(handler)
+        async def guarded(*args: P.args, **kwargs: P.kwargs) -> Any:
+            trial = await self._admit()
+            failed = True
+            try:
+                result = await handler(*args, **kwargs)
+                failed = False
+                return result
+            finally:
+                await self._release(trial, failed)
+
+        return guarded
+
+    def _can_pass(self) -> bool:
+        if self.state is CircuitState.HALF_OPEN:
+            return self._trials < self.policy.half_open_calls
+        return self.state is CircuitState.CLOSED
+
+    async def _admit(self) -> bool:
+        """
+        :return: whether the call is a half-open trial
+        """
+        async with self._changed:
+            await self._changed.wait_for(self._can_pass)
+            trial = self.state is CircuitState.HALF_OPEN
+            self._trials += trial
+            return trial
+
+    async def _release(self, trial: bool, failed: bool) -> None:
+        async with self._changed:
+            if trial:
+                self._trials -= 1
+                if failed:
+                    self._transition(CircuitState.OPEN)
+                elif self.state is CircuitState.HALF_OPEN:
+                    self._trial_successes += 1
+                    if self._trial_successes >= self.policy.half_open_calls:
+                        self._transition(CircuitState.CLOSED)
+            elif self.state is CircuitState.CLOSED:
+                # NOTE: calls admitted before the circuit opened say nothing
+                # about the dependency since, so only closed ones count
+                self._outcomes.append(failed)
+                if (
+                    len(self._outcomes) >= self.policy.min_calls
+                    and sum(self._outcomes) / len(self._outcomes)
+                    >= self.policy.failure_rate
+                ):
+                    self._transition(CircuitState.OPEN)
+            self._changed.notify_all()
+
+    def _transition(self, state: CircuitState) -> None:
+        if state is self.state:
+            return
+        logger.warning(
+            f"circuit {self._attributes['subscriber']}: "
+            f"{self.state.name} -> {state.name}"
+        )
+        _transitions.add(
+            1,
+            self._attributes | {"from": self.state.name, "to": state.name},
+        )
+        self.state = state
+        self._outcomes.clear()
+        self._trial_successes = 0
+        if state is CircuitState.OPEN:
+            asyncio.get_running_loop().call_later(
+                self.policy.open_for, lambda: self._spawn(self._half_open())
+            )
+        if state is not CircuitState.HALF_OPEN:
+            self._spawn(self._apply_prefetch(state))
+
+    def _spawn(self, coro: Any) -> None:
+        task = asyncio.create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _half_open(self) -> None:
+        async with self._changed:
+            if self.state is CircuitState.OPEN:
+                self._transition(CircuitState.HALF_OPEN)
+                self._changed.notify_all()
+
+    async def _apply_prefetch(self, state: CircuitState) -> None:
+        # NOTE: a prefetch of 0 means unlimited in AMQP, so 1 is as low as
+        # it goes - the deliveries already waiting in front of the handler
+        # keep the broker from pushing even that one until they're acked
+        prefetch = 1 if state is CircuitState.OPEN else self.policy.prefetch
+        channels = {
+            id(channel): channel
+            for get in self._channels
+            if (channel := get()) is not None and not channel.is_closed
+        }
+        try:
+            for channel in channels.values():
+                await channel.set_qos(prefetch_count=prefetch, global_=True)
+        except Exception:
+            logger.exception("failed to apply a circuit breaker prefetch")
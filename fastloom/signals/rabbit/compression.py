@@ -0,0 +1,44 @@
+import gzip
+from collections.abc import Awaitable, Callable
+from typing import TYPE_CHECKING, Any, Literal, TypeGuard, get_args
+
+if TYPE_CHECKING:
+    from aio_pika import IncomingMessage
+    from faststream.message import StreamMessage
+
+type Compression = Literal["zstd", "gzip"]
+
+COMPRESSIONS: tuple[str, ...] = get_args(Compression.__value__)
+
+
+def is_compression(content_encoding: Any) -> TypeGuard[Compression]:
+    return content_encoding in COMPRESSIONS
+
+
+def compress(body: bytes, compression: Compression) -> bytes:
+    if compression == "gzip":
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    # deferred: zstandard only ships with the `zstd` extra
+    import zstandard
+
+    return zstandard.ZstdCompressor().compress(body)
+
+
+def decompress(body: bytes, content_encoding: Compression) -> bytes:
+    if content_encoding == "gzip":
+        return gzip.decompress(body)
+    import zstandard
+
+    return zstandard.ZstdDecompressor().decompress(body)
+
+
+async def decompressing_parser(
+    msg: "IncomingMessage",
+    original: Callable[["IncomingMessage"], Awaitable["StreamMessage[Any]"]],
+) -> "StreamMessage[Any]":
+    # NOTE: aio-pika locks incoming messages, so the body is swapped on the
+    # parsed message - before any middleware or the handler reads it.
+    message = await original(msg)
+    if is_compression(encoding := msg.content_encoding):
+        message.body = decompress(message.body, encoding)
+    return message
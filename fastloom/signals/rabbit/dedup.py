@@ -0,0 +1,164 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from functools import wraps
+from typing import TYPE_CHECKING, Any
+
+from opentelemetry import metrics
+
+if TYPE_CHECKING:
+    from faststream.rabbit import RabbitMessage
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+_duplicates = meter.create_counter(
+    "rabbit.subscriber.duplicates",
+    description="Deliveries skipped as already handled",
+)
+
+
+def message_id(message: RabbitMessage) -> str | None:
+    return message.message_id or None
+
+
+@dataclass(frozen=True, slots=True)
+class DedupWindow:
+    """
+    :param key: what identifies a message, `message_id` by default; a
+    message without a key is always handled
+    :param window: seconds a handled key is remembered
+    :param local_size: handled keys also remembered in-process, so a
+    duplicate landing on the same replica skips Redis
+    :param check_first_delivery: look first deliveries up in Redis too -
+    catches a publisher sending one message twice, at a round trip each
+    """
+
+    key: Callable[[RabbitMessage], str | None] = message_id
+    window: float = 3600.0
+    local_size: int = 10_000
+    check_first_delivery: bool = False
+
+    def __post_init__(self):
+        if self.window <= 0 or self.local_size < 1:
+            raise ValueError("window and local_size must be positive")
+
+
+class Deduplicator:
+    """Skips deliveries whose key was already handled within the window.
+
+    Handled keys go to Redis, shared by every replica, and to an LRU of
+    this process. A delivery the broker never handed out before - not
+    `redelivered`, not a retry republished by the exception middleware -
+    can only be a duplicate when its publisher sent it twice, so unless
+    `check_first_delivery` it's only checked against the LRU. Keys are
+    recorded once the handler returned, so a failed delivery still goes
+    down the retry path; two copies handled at the same time both run.
+    """
+
+    def __init__(self, policy: DedupWindow, prefix: str, name: str):
+        """
+        :param policy: key and window
+        :param prefix: prefix of the Redis keys
+        :param name: `subscriber` attribute on the exported metric
+        """
+        self.policy = policy
+        self.prefix = prefix
+        self._seen: OrderedDict[str, float] = OrderedDict()
+        self._marks: list[str] = []
+        self._flush_task: asyncio.Task[None] | None = None
+        self._attributes = {"subscriber": name}
+
+    def wrap[**P](
+        self,
+        handler: Callable[P, Awaitable[Any]],
+        get_message: Callable[[], RabbitMessage | None],
+    ) -> Callable[P, Awaitable[Any]]:
+        """
+        :param get_message: the delivery being handled
+        """
+
+        @wraps(handler)
+        async def deduplicated(*args: P.args, **kwargs: P.kwargs) -> Any:
+            message = get_message()
+            key = None if message is None else self.policy.key(message)
+            if key is None:
+                return await handler(*args, **kwargs)
+            if await self._is_duplicate(key, message):
+                return None
+            result = await handler(*args, **kwargs)
+            self._remember(key)
+            self._mark(key)
+            return result
+
+        return deduplicated
+
+    async def _is_duplicate(self, key: str, message: RabbitMessage) -> bool:
+        if (expires_at := self._seen.get(key)) is not None:
+            if expires_at > time.monotonic():
+                _duplicates.add(1, self._attributes | {"source": "local"})
+                return True
+            del self._seen[key]
+        if not self.policy.check_first_delivery and _first_delivery(message):
+            return False
+        from fastloom.cache.lifehooks import RedisHandler
+
+        try:
+            seen = await RedisHandler.redis.exists(self._redis_key(key))
+        except Exception:
+            # NOTE: fail open - a duplicate is cheaper than a lost message
+            logger.exception(f"dedup lookup of {key} failed")
+            return False
+        if seen:
+            _duplicates.add(1, self._attributes | {"source": "redis"})
+            self._remember(key)
+        return bool(seen)
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.prefix}:{key}"
+
+    def _remember(self, key: str) -> None:
+        self._seen[key] = time.monotonic() + self.policy.window
+        self._seen.move_to_end(key)
+        while len(self._seen) > self.policy.local_size:
+            self._seen.popitem(last=False)
+
+    def _mark(self, key: str) -> None:
+        self._marks.append(key)
+        if self._flush_task is None:
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self) -> None:
+        """writes the keys handled since the last flush in one pipeline"""
+        # NOTE: yield once so every handler finishing in this loop pass
+        # lands in the same pipeline
+        await asyncio.sleep(0)
+        marks, self._marks, self._flush_task = self._marks, [], None
+        if not marks:
+            return
+        from fastloom.cache.lifehooks import RedisHandler
+
+        try:
+            async with RedisHandler.redis.pipeline(transaction=False) as pipe:
+                for key in marks:
+                    pipe.set(
+                        self._redis_key(key),
+                        1,
+                        ex=math.ceil(self.policy.window),
+                    )
+                await pipe.execute()
+        except Exception:
+            logger.exception(f"failed to record {len(marks)} handled keys")
+
+
+def _first_delivery(message: RabbitMessage) -> bool:
+    return (
+        not message.raw_message.redelivered
+        and "x-delivery-count" not in message.headers
+    )
@@ -1,22 +1,58 @@
 from __future__ import annotations
 
 import asyncio
+import inspect
 import logging
-from typing import TYPE_CHECKING, Any
+import socket
+import time
+from collections.abc import Iterable, Sequence
+from functools import partial
+from typing import TYPE_CHECKING, Any, NamedTuple, get_args, get_type_hints
 
 from opentelemetry import trace
 
 from fastloom.meta import SelfSustaining
 from fastloom.settings.base import MonitoringSettings
+from fastloom.signals.rabbit.adaptive import (
+    AdaptiveConcurrency,
+    AdaptiveLimit,
+)
+from fastloom.signals.rabbit.batch import (
+    BatchItem,
+    MessageBatcher,
+    PublishBatch,
+    PublishFailure,
+    UnroutableMessage,
+)
+from fastloom.signals.rabbit.breaker import BreakerPolicy, CircuitBreaker
+from fastloom.signals.rabbit.compression import (
+    Compression,
+    decompressing_parser,
+)
+from fastloom.signals.rabbit.dedup import Deduplicator, DedupWindow
 from fastloom.signals.rabbit.middlewares import (
+    RabbitCompressionMiddleware,
     RabbitPayloadTelemetryMiddleware,
 )
+from fastloom.signals.rabbit.pool import ChannelPool
+from fastloom.signals.rabbit.retry import FastRetry
+from fastloom.signals.rabbit.rpc import REPLY_QUEUE, RpcClient, rpc_handler
 from fastloom.signals.rabbit.settings import RabbitmqSettings
-from fastloom.utils import exponential_backoff
+from fastloom.signals.rabbit.stream import (
+    RedisOffsetStore,
+    StreamOffset,
+    StreamOffsetStore,
+    StreamOffsetTracker,
+)
+from fastloom.signals.route import patch_fastapi_body_wrapping
+from fastloom.signals.slots import claim_worker_slot
+from fastloom.utils import backoff_ladder, exponential_backoff
 
 if TYPE_CHECKING:
-    from aio_pika.robust_channel import RobustChannel
-    from aio_pika.robust_connection import RobustConnection
+    from collections.abc import Awaitable, Callable
+    from contextvars import Context
+
+    from aio_pika.abc import AbstractChannel, AbstractMessage
     from faststream import ExceptionMiddleware
     from faststream.rabbit import (
         RabbitExchange,
@@ -30,20 +66,49 @@ if TYPE_CHECKING:
         QuorumQueueArgs,
         StreamQueueArgs,
     )
+    from faststream.rabbit.subscriber.usecase import (
+        RabbitSubscriber as RabbitSubscriberUsecase,
+    )
 
 logger = logging.getLogger(__name__)
 
+# routes a retry to its tier queue - without an `x-` prefix, which a headers
+# exchange would ignore
+_DELAY_TIER_HEADER = "delay-tier"
+
+
+def _without_delay_tier(parser: Any) -> Any:
+    """
+    :param parser: the subscriber's own parser, composed like FastStream
+    composes any custom parser
+    :return: a parser that drops the tier header a retry picked up on its
+    way through the delay queues, so handlers never see it
+    """
+    from faststream._internal.endpoint.utils import ParserComposition
+
+    async def parse(msg: Any, original: Any) -> Any:
+        message = await ParserComposition(parser, original)(msg)
+        message.headers.pop(_DELAY_TIER_HEADER, None)
+        return message
+
+    return parse
+
 
 def get_rabbit_router(settings: RabbitmqSettings) -> RabbitRouter:
     # deferred: see docs/signals.md#ordering
     from faststream.rabbit.fastapi import RabbitRouter
 
+    # the FastAPI body parsing patch is process-wide - it's applied here too
+    # so Rabbit handlers get its fast path without a Kafka router around
+    patch_fastapi_body_wrapping()
+
     return RabbitRouter(
         settings.RABBIT_URI,
         schema_url="/rabbitapi",
         middlewares=(
             RabbitPayloadTelemetryMiddleware(
-                tracer_provider=trace.get_tracer_provider()
+                tracer_provider=trace.get_tracer_provider(),
+                settings=settings,
             ),
         ),
     )
@@ -52,6 +117,11 @@ def get_rabbit_router(settings: RabbitmqSettings) -> RabbitRouter:
 class RabbitSubscriptable(MonitoringSettings, RabbitmqSettings): ...
 
 
+class _DeclaredQueue(NamedTuple):
+    queue: RabbitQueue
+    expires_at: float
+
+
 class RabbitSubscriber(SelfSustaining):
     """A class to encapsulate the common logic for RabbitMQ subscribers"""
 
@@ -62,10 +132,12 @@ class RabbitSubscriber(SelfSustaining):
     _base_delay: int
     _max_delay: int
     _queue_prefix: str
-
-    _topology_connection: RobustConnection | None = None
-    _topology_channel: RobustChannel | None = None
-    _topology_lock = asyncio.Lock()
+    _dlx_registry: dict[tuple[str, int, bool], _DeclaredQueue]
+    _declared_tiers: set[int]
+    _backoff_routing_keys: set[str]
+    _ladder_task: asyncio.Task[None] | None
+    _topology_pool: ChannelPool
+    _rpc: RpcClient | None
 
     def __init__(
         self,
@@ -106,11 +178,68 @@ class RabbitSubscriber(SelfSustaining):
             handlers={exc: self._exc_handler for exc in exceptions}
         )
         self.router.broker.add_middleware(self.exc_middleware)
+        self.router.broker.add_middleware(
+            partial(
+                RabbitCompressionMiddleware,
+                min_bytes=self._settings.RABBIT_COMPRESSION_MIN_BYTES,
+                encode=self._encode_body,
+            )
+        )
         self._base_delay = base_delay
         self._max_delay = max_delay
         self._queue_prefix = (
             f"{self._settings.ENVIRONMENT}_{self._settings.PROJECT_NAME}"
         )
+        self._topology_pool = ChannelPool(
+            self._settings.RABBIT_URI,
+            size=self._settings.RABBIT_TOPOLOGY_POOL_SIZE,
+        )
+        self.router.on_broker_shutdown(self._close_topology_pool)
+        self._dlx_registry = {}
+        self._declared_tiers = set()
+        self._backoff_routing_keys = set()
+        self._ladder_task = None
+        if self._settings.RABBIT_PREDECLARE_BACKOFF:
+            self.router.after_startup(self._start_backoff_ladder)
+            self.router.on_broker_shutdown(self._stop_backoff_ladder)
+        self._rpc = None
+        if self._settings.RABBIT_RPC:
+            self._setup_rpc()
+
+    @classmethod
+    def _setup_rpc(cls) -> None:
+        from faststream import AckPolicy
+        from faststream.rabbit import RabbitQueue
+
+        cls._rpc = rpc = RpcClient(
+            partial(cls.router.broker.publish, exchange=cls.exchange),
+            max_in_flight=cls._settings.RABBIT_RPC_MAX_IN_FLIGHT,
+        )
+
+        # NOTE: registered on the broker itself - the default channel is the
+        # one `broker.publish` sends requests on, which direct reply-to needs
+        @cls.router.broker.subscriber(
+            RabbitQueue(REPLY_QUEUE, declare=False),
+            ack_policy=AckPolicy.ACK_FIRST,
+            parser=decompressing_parser,
+            include_in_schema=False,
+        )
+        async def on_rpc_reply(_body: Any) -> None:
+            rpc.resolve(cls.router.broker.context.get_local("message"))
+
+    @classmethod
+    def _instance_id(cls) -> str:
+        """
+        :return: this process's stable id - the host (`RABBIT_INSTANCE_ID`
+        or the hostname) and a worker slot on it, which a restarted worker
+        takes over from its predecessor
+        """
+        slot = claim_worker_slot(
+            f"fastloom-rabbit-{cls._settings.PROJECT_NAME}"
+            f"-{cls._settings.ENVIRONMENT}"
+        )
+        host = cls._settings.RABBIT_INSTANCE_ID or socket.gethostname()
+        return f"{host}-{slot}"
 
     @classmethod
     def _get_queue_name(cls, name: str) -> str:
@@ -134,38 +263,21 @@ class RabbitSubscriber(SelfSustaining):
         return routing_key.replace("*", "__all__")
 
     @classmethod
-    async def _get_topology_channel(cls) -> RobustChannel:
-        import aio_pika
+    def _is_wildcard(cls, routing_key: str) -> bool:
+        return any(word in ("*", "#") for word in routing_key.split("."))
 
-        async with cls._topology_lock:
-            if (
-                cls._topology_connection is None
-                or cls._topology_connection.is_closed
-            ):
-                cls._topology_connection = await aio_pika.connect_robust(
-                    cls._settings.RABBIT_URI, loop=asyncio.get_event_loop()
-                )
-                cls._topology_channel = None
-                logging.warning("new topology connection established")
-
-            if (
-                cls._topology_channel is None
-                or cls._topology_channel.is_closed
-            ):
-                cls._topology_channel = (
-                    await cls._topology_connection.channel()
-                )
-                logging.warning("new topology channel established")
+    @classmethod
+    async def _encode_body(cls, body: Any) -> tuple[bytes, str | None]:
+        from faststream._internal.parser import DefaultCodec
 
-            return cls._topology_channel
+        config = cls.router.broker.config
+        return await (config.broker_codec or DefaultCodec()).encode(
+            body, config.fd_config._serializer
+        )
 
     @classmethod
-    async def _reset_topology_channel(cls) -> None:
-        async with cls._topology_lock:
-            if cls._topology_channel and not cls._topology_channel.is_closed:
-                await cls._topology_channel.close()
-
-            cls._topology_channel = None
+    async def _close_topology_pool(cls, _app: Any) -> None:
+        await cls._topology_pool.close()
 
     @classmethod
     def _get_queue(
@@ -235,26 +347,193 @@ class RabbitSubscriber(SelfSustaining):
             ),
         )
 
-        channel = await cls._get_topology_channel()
-        robust_queue = await channel.declare_queue(
-            queue.name,
-            durable=queue.durable,
-            arguments=queue.arguments,
-            auto_delete=False,
-        )
-        dlx_exchange = await cls.router.broker.declare_exchange(cls.exchange)
-        await robust_queue.bind(
-            dlx_exchange,
-            routing_key=dlx_routing_key,
-        )
+        async with cls._topology_pool.acquire() as channel:
+            robust_queue = await channel.declare_queue(
+                queue.name,
+                durable=queue.durable,
+                arguments=queue.arguments,
+                auto_delete=False,
+            )
+            await robust_queue.bind(
+                cls.exchange.name,
+                routing_key=dlx_routing_key,
+            )
 
         return queue
 
     @classmethod
     async def _get_ensured_dlx_queue(
-        cls, routing_key: str, delay: int
+        cls,
+        routing_key: str,
+        delay: int,
+        fallback: bool = False,
+        *,
+        horizon: float = 0,
     ) -> RabbitQueue:
-        return await cls._get_dlx_queue(routing_key, delay)
+        """
+        :param routing_key: routing key for the queue
+        :param delay: delay in seconds
+        :param fallback: whether this is a fallback queue
+        :param horizon: also redeclare entries expiring within this many
+        seconds
+        :return: RabbitQueue
+
+        serves already-declared delay queues from the in-process registry,
+        declaring only on a miss or once the entry is past its safe window
+        """
+        key = (routing_key, delay, fallback)
+        now = time.monotonic()
+        if (
+            declared := cls._dlx_registry.get(key)
+        ) is not None and declared.expires_at > now + horizon:
+            return declared.queue
+
+        queue = await cls._get_dlx_queue(routing_key, delay, fallback)
+        cls._dlx_registry[key] = _DeclaredQueue(
+            queue, now + cls._registry_ttl(queue)
+        )
+        return queue
+
+    @classmethod
+    def _registry_ttl(cls, queue: RabbitQueue) -> float:
+        # NOTE: a queue's x-expires clock only restarts on (re)declaration -
+        # publishing into it doesn't count as "use". A message published at
+        # t must still find its queue at t + x-message-ttl to dead-letter
+        # back, so an entry is only trusted for x-expires - x-message-ttl
+        # past its declaration.
+        arguments = queue.arguments or {}
+        return (arguments["x-expires"] - arguments["x-message-ttl"]) / 1000
+
+    @classmethod
+    def _forget_dlx_queue(
+        cls, routing_key: str, delay: int, fallback: bool = False
+    ) -> None:
+        cls._dlx_registry.pop((routing_key, delay, fallback), None)
+
+    @classmethod
+    def _delay_tiers(cls) -> list[int]:
+        return sorted(
+            cls._settings.RABBIT_DELAY_TIERS or cls._backoff_ladder()
+        )
+
+    @classmethod
+    def _nearest_tier(cls, delay: int) -> int:
+        return min(
+            cls._delay_tiers(), key=lambda tier: (abs(tier - delay), tier)
+        )
+
+    @classmethod
+    def _get_delay_exchange_name(cls) -> str:
+        return f"{cls._queue_prefix}.delay"
+
+    @classmethod
+    async def _declare_tier_queue(cls, tier: int) -> None:
+        """
+        :param tier: delay in seconds
+
+        creates the shared delay queue of one tier, bound to the service's
+        delay exchange by a `delay-tier` header; an expired message is
+        dead-lettered back to the topic exchange under its own routing key
+        """
+        from aio_pika import ExchangeType
+
+        async with cls._topology_pool.acquire() as channel:
+            exchange = await channel.declare_exchange(
+                cls._get_delay_exchange_name(),
+                type=ExchangeType.HEADERS,
+                durable=True,
+            )
+            robust_queue = await channel.declare_queue(
+                f"{cls._get_delay_exchange_name()}.{tier}",
+                durable=True,
+                arguments={
+                    "x-dead-letter-exchange": cls.exchange.name,
+                    "x-message-ttl": tier * 1000,
+                },
+            )
+            await robust_queue.bind(
+                exchange,
+                arguments={"x-match": "all", _DELAY_TIER_HEADER: tier},
+            )
+        cls._declared_tiers.add(tier)
+
+    @classmethod
+    async def _publish_to_tier(
+        cls, message: AbstractMessage, routing_key: str, tier: int
+    ) -> bool:
+        """
+        :return: False when the broker hands the message back as unroutable
+        """
+        from aiormq.abc import DeliveredMessage
+
+        if tier not in cls._declared_tiers:
+            await cls._declare_tier_queue(tier)
+        message.headers[_DELAY_TIER_HEADER] = tier
+        async with cls._topology_pool.acquire() as channel:
+            exchange = await channel.get_exchange(
+                cls._get_delay_exchange_name(), ensure=False
+            )
+            confirmation = await exchange.publish(
+                message, routing_key=routing_key, mandatory=True
+            )
+        return not isinstance(confirmation, DeliveredMessage)
+
+    @classmethod
+    def _backoff_ladder(cls) -> list[int]:
+        return backoff_ladder(cls._base_delay, cls._max_delay)
+
+    @classmethod
+    async def declare_backoff_ladder(cls, horizon: float = 0) -> None:
+        """
+        :param horizon: also redeclare queues expiring within this many
+        seconds
+
+        declares every delay queue (and its `.fallback` twin) a failure on
+        any wildcard-free `retry_backoff` routing key could land on, in one
+        concurrent batch instead of lazily on each key's first failure per
+        step - or, with bucketed delays, just the shared tier queues
+        """
+        if cls._settings.RABBIT_BUCKETED_DELAYS:
+            await asyncio.gather(
+                *(cls._declare_tier_queue(t) for t in cls._delay_tiers())
+            )
+            return
+        await asyncio.gather(
+            *(
+                cls._get_ensured_dlx_queue(
+                    routing_key, delay, fallback, horizon=horizon
+                )
+                for routing_key in cls._backoff_routing_keys
+                for delay in cls._backoff_ladder()
+                for fallback in (False, True)
+            )
+        )
+
+    @classmethod
+    async def _refresh_backoff_ladder(cls) -> None:
+        # NOTE: the shortest rung's safe window is exactly base_delay, so a
+        # tick of base_delay with a horizon of one tick keeps every rung
+        # declared while only ever touching the ones about to lapse.
+        while True:
+            await asyncio.sleep(cls._base_delay)
+            try:
+                await cls.declare_backoff_ladder(horizon=cls._base_delay)
+            except Exception:
+                logger.exception("failed to refresh the backoff ladder")
+
+    @classmethod
+    async def _start_backoff_ladder(cls, _app: Any) -> None:
+        await cls.declare_backoff_ladder(horizon=cls._base_delay)
+        if cls._settings.RABBIT_BUCKETED_DELAYS:
+            return  # tier queues don't expire
+        cls._ladder_task = asyncio.create_task(cls._refresh_backoff_ladder())
+
+    @classmethod
+    async def _stop_backoff_ladder(cls, _app: Any) -> None:
+        if cls._ladder_task is None:
+            return
+        cls._ladder_task.cancel()
+        cls._ladder_task = None
 
     @classmethod
     async def _exc_handler(
@@ -262,7 +541,7 @@ class RabbitSubscriber(SelfSustaining):
         exc: Exception,
         message: RabbitMessage,
     ):
-        from aio_pika import Message
+        from aio_pika import DeliveryMode, Message
 
         attempt = message.headers.get("x-delivery-count", 0) + 1
         message.headers["x-delivery-count"] = attempt
@@ -278,27 +557,71 @@ class RabbitSubscriber(SelfSustaining):
                 attempt, cls._base_delay, cls._max_delay, jitter=False
             )
         )
-        queue = await cls._get_ensured_dlx_queue(routing_key, delay)
-
         # per-message expiration only takes effect when <= the queue's own
         # x-message-ttl (RabbitMQ applies whichever is lower) - a positive
         # jitter draw is silently clamped back down to `delay` by the queue
         # itself, so only the negative half of the range actually shows up.
-        await cls.router.broker.publish(
-            Message(
-                body=message.body,
-                headers=message.headers,
-                expiration=exponential_backoff(
-                    attempt, cls._base_delay, cls._max_delay
-                ),
-            ),
-            queue=queue,
-            exchange=cls.exchange,
-            persist=True,
+        # a shared tier queue gets none: messages only expire off its head,
+        # so a shorter one would just wait behind a longer one anyway.
+        retry_message = Message(
+            body=message.body,
+            headers=message.headers,
+            message_id=message.message_id,
+            correlation_id=message.correlation_id,
+            content_type=message.content_type,
+            delivery_mode=DeliveryMode.PERSISTENT,
+            expiration=None
+            if cls._settings.RABBIT_BUCKETED_DELAYS
+            else exponential_backoff(attempt, cls._base_delay, cls._max_delay),
         )
+        if cls._settings.RABBIT_BUCKETED_DELAYS:
+            await cls._retry_via_tier(retry_message, routing_key, delay)
+        else:
+            await cls._retry_via_dlx_queue(retry_message, routing_key, delay)
         # re-raise for observability in sentry/otel
         raise exc
 
+    @classmethod
+    async def _retry_via_dlx_queue(
+        cls, message: AbstractMessage, routing_key: str, delay: int
+    ) -> None:
+        queue = await cls._get_ensured_dlx_queue(routing_key, delay)
+        if not await cls._publish_retry(message, queue):
+            # the broker returned it unroutable - the queue expired or was
+            # deleted behind the registry's back, so re-declare just once
+            cls._forget_dlx_queue(routing_key, delay)
+            queue = await cls._get_ensured_dlx_queue(routing_key, delay)
+            await cls._publish_retry(message, queue)
+
+    @classmethod
+    async def _retry_via_tier(
+        cls, message: AbstractMessage, routing_key: str, delay: int
+    ) -> None:
+        tier = cls._nearest_tier(delay)
+        dlx_routing_key = f"{routing_key}{cls._dlx_suffix()}"
+        if not await cls._publish_to_tier(message, dlx_routing_key, tier):
+            # same as above: the tier queue is gone, declare it again once
+            cls._declared_tiers.discard(tier)
+            await cls._publish_to_tier(message, dlx_routing_key, tier)
+
+    @classmethod
+    async def _publish_retry(
+        cls, message: AbstractMessage, queue: RabbitQueue
+    ) -> bool:
+        """
+        :return: False when the broker hands the message back as unroutable
+        """
+        from aiormq.abc import DeliveredMessage
+
+        async with cls._topology_pool.acquire() as channel:
+            exchange = await channel.get_exchange(
+                cls.exchange.name, ensure=False
+            )
+            confirmation = await exchange.publish(
+                message, routing_key=queue.routing(), mandatory=True
+            )
+        return not isinstance(confirmation, DeliveredMessage)
+
     @classmethod
     def _get_subscriber(
         cls,
@@ -311,6 +634,7 @@ class RabbitSubscriber(SelfSustaining):
         | None = None,
         **kwargs,
     ):
+        kwargs.setdefault("parser", decompressing_parser)
         return cls.router.subscriber(
             queue=cls._get_queue(
                 routing_key,
@@ -333,56 +657,332 @@ class RabbitSubscriber(SelfSustaining):
         | ClassicQueueArgs
         | StreamQueueArgs
         | None = None,
+        batch_size: int | None = None,
+        batch_timeout_ms: int = 100,
+        adaptive: AdaptiveLimit | None = None,
+        fast_retry: FastRetry | None = None,
+        circuit_breaker: BreakerPolicy | None = None,
+        dedup: DedupWindow | None = None,
         **kwargs,
     ):
         """
         :param routing_key: routing key for the queue
         :param retry_backoff: whether to retry with backoff
+        :param batch_size: call the handler once with a `list[...]` of up to
+        this many messages
+        :param batch_timeout_ms: flush a partial batch after this long
+        :param adaptive: tune prefetch and handler concurrency between
+        these bounds from observed latency and error rate
+        :param fast_retry: retry these exceptions in-process before the
+        message goes down the retry / DLX path
+        :param circuit_breaker: hold deliveries back and cut prefetch while
+        the handler keeps failing
+        :param dedup: skip deliveries whose key was already handled within
+        this window
         :param kwargs: additional faststream subscriber arguments
         :return: custom decorator for the subscriber
         """
-        if retry_backoff and (auto_delete or not durable):
-            raise ValueError(
-                "retry_backoff requires durable queues and auto_delete=False"
-            )
+        cls._check_subscriber_options(
+            retry_backoff=retry_backoff,
+            durable=durable,
+            auto_delete=auto_delete,
+            batch_size=batch_size,
+            adaptive=adaptive,
+            circuit_breaker=circuit_breaker,
+            kwargs=kwargs,
+        )
 
         def _inner(func):
+            handler = func
+            func, subscriber_kwargs, controllers = cls._wrap_handler(
+                func,
+                routing_key,
+                batch_size=batch_size,
+                batch_timeout_ms=batch_timeout_ms,
+                adaptive=adaptive,
+                fast_retry=fast_retry,
+                circuit_breaker=circuit_breaker,
+                dedup=dedup,
+                kwargs=kwargs,
+            )
             decorators = [
                 cls._get_subscriber(
                     routing_key,
                     durable=durable,
                     auto_delete=auto_delete,
                     queue_arguments=queue_arguments,
-                    **kwargs,
+                    **subscriber_kwargs,
                 )
             ]
             if retry_backoff:
+                # NOTE: a wildcard key's failures are retried under each
+                # message's concrete routing key, so the ladder it would
+                # predeclare is never used - and `#` isn't sanitized into
+                # a valid queue name
+                if not cls._is_wildcard(routing_key):
+                    cls._backoff_routing_keys.add(routing_key)
                 decorators.append(
                     cls._get_subscriber(
                         f"{routing_key}{cls._dlx_suffix()}",
                         durable=durable,
                         auto_delete=auto_delete,
-                        **kwargs,
+                        **subscriber_kwargs
+                        | {
+                            "parser": _without_delay_tier(
+                                subscriber_kwargs.get(
+                                    "parser", decompressing_parser
+                                )
+                            )
+                        },
                     )
                 )
+            wrapped = func is not handler
             for decorator in decorators:
+                for controller in controllers:
+                    controller.watch_channel(
+                        partial(cls._consuming_channel, decorator)
+                    )
                 func = decorator(func)
 
-            return func
+            # NOTE: hand back the user's own handler so `multi_subscriber`
+            # gives each routing key a batcher/limit/retry/breaker of its own
+            return handler if wrapped else func
+
+        return _inner
+
+    @classmethod
+    def _wrap_handler(
+        cls,
+        func: Callable[..., Awaitable[Any]],
+        routing_key: str,
+        batch_size: int | None,
+        batch_timeout_ms: int,
+        adaptive: AdaptiveLimit | None,
+        fast_retry: FastRetry | None,
+        circuit_breaker: BreakerPolicy | None,
+        dedup: DedupWindow | None,
+        kwargs: dict[str, Any],
+    ) -> tuple[
+        Callable[..., Awaitable[Any]],
+        dict[str, Any],
+        list[AdaptiveConcurrency | CircuitBreaker],
+    ]:
+        """
+        :return: the handler to register, the subscriber kwargs, and the
+        controllers that need to watch the consuming channel
+        """
+        from faststream.rabbit import Channel
+
+        if fast_retry is not None:
+            func = fast_retry.wrap(func, routing_key)
+        if batch_size is not None:
+            func = cls._batch_consumer(
+                func, batch_size, batch_timeout_ms / 1000
+            )
+        controllers: list[AdaptiveConcurrency | CircuitBreaker] = []
+        prefetch: int | None = None
+        if adaptive is not None:
+            controller = AdaptiveConcurrency(adaptive, routing_key)
+            controllers.append(controller)
+            prefetch = controller.limit
+            func = controller.wrap(func)
+        if circuit_breaker is not None:
+            breaker = CircuitBreaker(circuit_breaker, routing_key)
+            controllers.append(breaker)
+            prefetch = circuit_breaker.prefetch
+            func = breaker.wrap(func)
+        if dedup is not None:
+            # outermost, so a duplicate takes no slot, trial or batch item
+            func = Deduplicator(
+                dedup,
+                prefix=f"{cls._settings.PROJECT_NAME}:dedup:{routing_key}",
+                name=routing_key,
+            ).wrap(func, cls._current_message)
+        if prefetch is None:
+            return func, kwargs, controllers
+        channel = Channel(prefetch_count=prefetch, global_qos=True)
+        return func, kwargs | {"channel": channel}, controllers
+
+    @staticmethod
+    def _check_subscriber_options(
+        retry_backoff: bool,
+        durable: bool,
+        auto_delete: bool,
+        batch_size: int | None,
+        adaptive: AdaptiveLimit | None,
+        circuit_breaker: BreakerPolicy | None,
+        kwargs: dict[str, Any],
+    ) -> None:
+        if retry_backoff and (auto_delete or not durable):
+            raise ValueError(
+                "retry_backoff requires durable queues and auto_delete=False"
+            )
+        if batch_size is not None and batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        if adaptive is not None and (
+            batch_size is not None or "channel" in kwargs
+        ):
+            raise ValueError(
+                "adaptive manages its own channel and can't batch"
+            )
+        if circuit_breaker is not None and (
+            adaptive is not None or "channel" in kwargs
+        ):
+            raise ValueError(
+                "circuit_breaker manages its own channel's prefetch"
+            )
+
+    @staticmethod
+    def _consuming_channel(
+        subscriber: RabbitSubscriberUsecase,
+    ) -> AbstractChannel | None:
+        if (queue := subscriber._queue_obj) is None:
+            return None
+        return queue.channel
+
+    @classmethod
+    def _batch_consumer(
+        cls,
+        handler: Callable[[list[Any]], Awaitable[Any]],
+        size: int,
+        timeout: float,
+    ) -> Callable[[Any], Awaitable[None]]:
+        """
+        :param handler: batch handler taking a single `list[T]` argument
+        :return: per-message handler decoding one `T` into the batch
+
+        each delivery stays its own FastStream message - it's acked once
+        its item went through the handler, or raises that item's error
+        into the exception middleware (and so the retry path) on its own
+        """
+        parameters = list(inspect.signature(handler).parameters.values())
+        if len(parameters) != 1:
+            raise TypeError(
+                "batch handlers take exactly one `list[...]` argument"
+            )
+        hint = get_type_hints(handler).get(parameters[0].name, list[Any])
+        item_type = next(iter(get_args(hint)), Any)
+        batcher = MessageBatcher(handler, size, timeout)
+
+        # the body arrives under the handler's own parameter name
+        async def consume(*args: Any, **kwargs: Any) -> None:
+            (body,) = (*args, *kwargs.values())
+            await batcher.submit(body)
+
+        consume.__name__ = consume.__qualname__ = handler.__name__
+        consume.__signature__ = inspect.Signature(  # type: ignore[attr-defined]
+            [
+                parameters[0].replace(
+                    annotation=item_type, default=inspect.Parameter.empty
+                )
+            ],
+            return_annotation=None,
+        )
+        return consume
+
+    @classmethod
+    def stream_subscriber(
+        cls,
+        routing_key: str,
+        offset: StreamOffset = "next",
+        prefetch: int = 1000,
+        commit_interval: float = 5.0,
+        offset_store: StreamOffsetStore | None = None,
+        consumer_name: str | None = None,
+        queue_arguments: StreamQueueArgs | None = None,
+        **kwargs,
+    ):
+        """
+        :param routing_key: routing key bound to the stream
+        :param offset: where a consumer without a stored offset starts -
+        `"first"`, `"last"`, `"next"`, an absolute offset, a `datetime` or
+        an interval such as `"1h"`
+        :param prefetch: unacked deliveries in flight at once
+        :param commit_interval: seconds between offset stores
+        :param offset_store: where offsets are kept, Redis by default
+        :param consumer_name: offset key, shared by every process that
+        passes it - by default the stream's queue name and this process's
+        instance, so each replica keeps its own offset
+        :param queue_arguments: stream args (`x-max-age`, ...)
+        :param kwargs: additional faststream subscriber arguments
+        :return: decorator consuming a RabbitMQ stream from the last stored
+        offset
+        """
+        from faststream.rabbit import Channel
+
+        if "channel" in kwargs or "consume_args" in kwargs:
+            raise ValueError(
+                "stream_subscriber manages its own channel and consume_args"
+            )
+        queue_name = cls._get_queue_name(
+            cls._sanitize_routing_key(routing_key)
+        )
+        tracker = StreamOffsetTracker(
+            offset_store or RedisOffsetStore(),
+            key=(
+                f"{cls._settings.PROJECT_NAME}:stream_offset:"
+                f"{consumer_name or f'{queue_name}:{cls._instance_id()}'}"
+            ),
+            interval=commit_interval,
+        )
+
+        def _inner(func):
+            subscriber = cls._get_subscriber(
+                routing_key,
+                durable=True,
+                auto_delete=False,
+                queue_arguments={
+                    "x-queue-type": "stream",
+                    **(queue_arguments or {}),
+                },  # type: ignore[arg-type]
+                channel=Channel(prefetch_count=prefetch),
+                **kwargs,
+            )
+            start = subscriber.start
+
+            # NOTE: FastStream reads `consume_args` only once the consumer
+            # starts, which is the first point the stored offset can be
+            # loaded asynchronously
+            async def start_from_stored_offset() -> None:
+                offset_arg = await tracker.resume_offset(offset)
+                subscriber.consume_args["x-stream-offset"] = offset_arg
+                tracker.start()
+                await start()
+
+            async def stop_tracker(_app: Any) -> None:
+                await tracker.stop()
+
+            subscriber.start = start_from_stored_offset  # type: ignore[method-assign]
+            cls.router.on_broker_shutdown(stop_tracker)
+            return subscriber(tracker.wrap(func, cls._stream_offset))
 
         return _inner
 
+    @classmethod
+    def _current_message(cls) -> RabbitMessage | None:
+        return cls.router.broker.context.get_local("message")
+
+    @classmethod
+    def _stream_offset(cls) -> int | None:
+        message = cls._current_message()
+        if message is None:
+            return None
+        return message.headers.get("x-stream-offset")
+
     @classmethod
     def publisher(
         cls,
         routing_key: str,
         persist: bool = True,
         schema: Any | None = None,
+        compression: Compression | None = None,
         **kwargs,
     ):
         """
         :param routing_key: routing key
         :param schema : pydantic schema
+        :param compression: compress bodies of at least
+        `RABBIT_COMPRESSION_MIN_BYTES` with this `content-encoding`
         :param kwargs: additional faststream subscriber arguments
         :return: persistent publisher
         """
@@ -391,6 +991,7 @@ class RabbitSubscriber(SelfSustaining):
             exchange=cls.exchange,
             schema=schema,
             persist=persist,
+            content_encoding=compression,
             **kwargs,
         )
 
@@ -428,11 +1029,13 @@ class RabbitSubscriber(SelfSustaining):
         routing_keys: dict[str, str],
         persist: bool = True,
         schema: type | None = None,
+        compression: Compression | None = None,
         **kwargs,
     ) -> dict[str, RabbitPublisher]:
         """
         :param routing_keys: list of routing keys for the publishers
         :param schema: publish schema for the publishers
+        :param compression: see `publisher`
         :param kwargs: additional arguments for the faststream publishers
         """
         return {
@@ -441,7 +1044,187 @@ class RabbitSubscriber(SelfSustaining):
                 routing_key=routing_key,
                 persist=persist,
                 schema=schema,
+                content_encoding=compression,
                 **kwargs,
             )
             for key, routing_key in routing_keys.items()
         }
+
+    @classmethod
+    async def rpc(
+        cls, routing_key: str, payload: Any, timeout: float = 5.0
+    ) -> Any:
+        """
+        :param routing_key: routing key of an `rpc_subscriber`
+        :param payload: request body, encoded the way `publisher()` does
+        :param timeout: seconds to wait for a reply, slot wait included
+        :return: the decoded reply body
+        :raise RpcError: the remote handler raised
+        :raise TimeoutError: no reply in time
+
+        needs `RABBIT_RPC`; waits for a slot once
+        `RABBIT_RPC_MAX_IN_FLIGHT` calls are awaiting replies
+        """
+        if cls._rpc is None:
+            raise RuntimeError("RabbitSubscriber.rpc needs RABBIT_RPC=true")
+        return await cls._rpc.call(routing_key, payload, timeout)
+
+    @classmethod
+    def rpc_subscriber(cls, routing_key: str, **kwargs):
+        """
+        :param routing_key: routing key for the queue
+        :param kwargs: additional faststream subscriber arguments
+        :return: decorator replying to `rpc` calls with the handler's
+        return value
+
+        a handler error is sent back to the caller as an `RpcError`
+        rather than going down the retry path - a late reply has nobody
+        left to read it
+        """
+        subscriber = cls._get_subscriber(
+            routing_key, durable=True, auto_delete=False, **kwargs
+        )
+
+        def _inner(func):
+            subscriber(rpc_handler(func))
+            return func
+
+        return _inner
+
+    @classmethod
+    async def publish_many(
+        cls,
+        routing_key: str,
+        messages: Iterable[Any],
+        persist: bool = True,
+        timeout: float | None = None,
+        compression: Compression | None = None,
+    ) -> list[PublishFailure]:
+        """
+        :param routing_key: routing key
+        :param messages: message bodies, encoded the same way a
+        `publisher()` encodes them
+        :param persist: whether the messages survive a broker restart
+        :param timeout: per-message confirm timeout in seconds
+        :param compression: see `publisher`
+        :return: one failure per nacked, returned or timed-out message
+
+        sends every message on one channel before awaiting any confirm;
+        each goes through the broker's publish middlewares on the way
+        """
+        return await cls._publish_pipelined(
+            [(routing_key, message) for message in messages],
+            persist=persist,
+            timeout=timeout,
+            compression=compression,
+        )
+
+    @classmethod
+    def batch(
+        cls,
+        persist: bool = True,
+        timeout: float | None = None,
+        compression: Compression | None = None,
+    ) -> PublishBatch:
+        """
+        :param persist: whether the messages survive a broker restart
+        :param timeout: per-message confirm timeout in seconds
+        :param compression: see `publisher`
+        :return: async context manager that `publish_many`s on exit
+        """
+        return PublishBatch(
+            partial(
+                cls._publish_pipelined,
+                persist=persist,
+                timeout=timeout,
+                compression=compression,
+            )
+        )
+
+    @classmethod
+    async def _publish_pipelined(
+        cls,
+        items: Sequence[BatchItem],
+        contexts: Sequence[Context] | None = None,
+        *,
+        persist: bool,
+        timeout: float | None,
+        compression: Compression | None = None,
+    ) -> list[PublishFailure]:
+        from aiormq.abc import DeliveredMessage
+        from faststream.rabbit.parser import AioPikaParser
+        from faststream.rabbit.response import RabbitPublishCommand
+        from faststream.response.publish_type import PublishType
+
+        broker = cls.router.broker
+        config = broker.config
+        context = broker.context
+
+        async with cls._topology_pool.acquire() as channel:
+            exchange = await channel.get_exchange(
+                cls.exchange.name, ensure=False
+            )
+
+            async def send(cmd: RabbitPublishCommand) -> Any:
+                # what the broker's producer does, on the pooled channel
+                message = await AioPikaParser.encode_message(
+                    cmd.body,
+                    reply_to=cmd.reply_to,
+                    headers=cmd.headers,
+                    correlation_id=cmd.correlation_id,
+                    serializer=config.fd_config._serializer,
+                    codec=config.broker_codec,
+                    **cmd.message_options,
+                )
+                return await exchange.publish(
+                    message,
+                    routing_key=cmd.destination,
+                    mandatory=True,
+                    timeout=cmd.timeout,
+                )
+
+            def publish(routing_key: str, message: Any) -> Awaitable[Any]:
+                # NOTE: the same middleware chain `broker.publish` runs -
+                # telemetry, trace context, compression - ending in `send`
+                call: Callable[[RabbitPublishCommand], Awaitable[Any]] = send
+                for m in broker.middlewares[::-1]:
+                    call = partial(
+                        m(None, context=context).publish_scope, call
+                    )
+                return call(
+                    RabbitPublishCommand(
+                        message,
+                        routing_key=routing_key,
+                        exchange=cls.exchange,
+                        correlation_id=config.id_generator(),
+                        app_id=config.app_id,
+                        persist=persist,
+                        content_encoding=compression,
+                        timeout=timeout,
+                        _publish_type=PublishType.PUBLISH,
+                    )
+                )
+
+            confirmations = await asyncio.gather(
+                *(
+                    publish(key, message)
+                    if contexts is None
+                    else asyncio.create_task(
+                        publish(key, message), context=contexts[index]
+                    )
+                    for index, (key, message) in enumerate(items)
+                ),
+                return_exceptions=True,
+            )
+
+        failures = []
+        for index, ((routing_key, _), confirmation) in enumerate(
+            zip(items, confirmations, strict=True)
+        ):
+            if isinstance(confirmation, DeliveredMessage):
+                confirmation = UnroutableMessage(routing_key)
+            if isinstance(confirmation, BaseException):
+                failures.append(
+                    PublishFailure(index, routing_key, confirmation)
+                )
+        return failures
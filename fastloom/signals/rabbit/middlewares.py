@@ -1,13 +1,28 @@
+import json
+import random
+import re
+from collections.abc import Awaitable, Callable, Iterable
+from functools import cache
 from typing import TYPE_CHECKING, Any
 
+from opentelemetry import trace
 from opentelemetry.metrics import Meter, MeterProvider
 from opentelemetry.trace import TracerProvider
+from opentelemetry.trace.propagation.tracecontext import (
+    TraceContextTextMapPropagator,
+)
 from pydantic import BaseModel
 
 from fastloom.extras import AIO_PIKA_INSTALLED, FASTSTREAM_INSTALLED
+from fastloom.signals.rabbit.compression import (
+    compress,
+    is_compression,
+)
+from fastloom.signals.rabbit.settings import RabbitmqSettings
 
 if TYPE_CHECKING:
     from aio_pika import IncomingMessage
+    from faststream import BaseMiddleware, ContextRepo
     from faststream.message import StreamMessage
     from faststream.opentelemetry.middleware import TelemetryMiddleware
     from faststream.rabbit.opentelemetry.provider import (
@@ -15,39 +30,140 @@ if TYPE_CHECKING:
     )
     from faststream.rabbit.response import RabbitPublishCommand
 elif FASTSTREAM_INSTALLED and AIO_PIKA_INSTALLED:
+    from faststream import BaseMiddleware
     from faststream.opentelemetry.middleware import TelemetryMiddleware
     from faststream.rabbit.opentelemetry.provider import (
         RabbitTelemetrySettingsProvider,
     )
 else:
+    BaseMiddleware = object
     TelemetryMiddleware = object
     RabbitTelemetrySettingsProvider = object
 
 
-def message_body_to_str(message_body) -> str:
-    if isinstance(message_body, BaseModel):
+_PROPAGATOR = TraceContextTextMapPropagator()
+_COMPACT_JSON = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+def message_body_to_str(message_body, limit: int | None = None) -> str:
+    """
+    :param limit: stop encoding a model once the JSON runs past this many
+    characters - enough to tell it's over a byte cap of the same size
+    """
+    if not isinstance(message_body, BaseModel):
+        return str(message_body)
+    if limit is None:
         return message_body.model_dump_json()
-    return str(message_body)
+    # NOTE: `model_dump` still walks the whole model, but the pure-Python
+    # `iterencode` is lazy, so the JSON string itself - the bulk of the
+    # cost for large bodies - is only built up to the cap
+    chunks, size = [], 0
+    for chunk in _COMPACT_JSON.iterencode(
+        message_body.model_dump(mode="json")
+    ):
+        chunks.append(chunk)
+        if (size := size + len(chunk)) > limit:
+            break
+    return "".join(chunks)
+
+
+@cache
+def _topic_pattern(pattern: str) -> re.Pattern[str]:
+    # AMQP topic semantics: `*` is exactly one word, `#` zero or more
+    regex = r"\.".join(
+        {"*": r"[^.]+", "#": "#"}.get(word, re.escape(word))
+        for word in pattern.split(".")
+    )
+    regex = regex.replace(r"\.#", r"(?:\.[^.]+)*")
+    if regex.startswith(r"#\."):
+        regex = r"(?:[^.]+\.)*" + regex[3:]
+    elif regex.startswith("#"):
+        regex = ".*" + regex[1:]
+    return re.compile(regex)
+
+
+def _matches_any(routing_key: str, patterns: Iterable[str]) -> bool:
+    return any(_topic_pattern(p).fullmatch(routing_key) for p in patterns)
 
 
 class RabbitPayloadTelemetrySettingsProvider(RabbitTelemetrySettingsProvider):
+    def __init__(self, settings: RabbitmqSettings | None = None):
+        super().__init__()
+        self._settings = settings
+
+    def _payload_attrs(
+        self,
+        routing_key: str | None,
+        parent: trace.SpanContext,
+        render: Callable[[int | None], str],
+    ) -> dict[str, Any]:
+        """
+        :param render: turns the body into a string of (about) the given
+        max length, only called once the payload is actually captured
+        """
+        if (settings := self._settings) is None:
+            return {"messaging.message.body": render(None)}
+        # NOTE: spans follow their parent's sampling decision under the
+        # default parent-based sampler, so an unsampled parent means the
+        # span won't record and the payload would be dropped anyway.
+        if parent.is_valid and not parent.trace_flags.sampled:
+            return {}
+        if settings.RABBIT_PAYLOAD_CAPTURE_ALLOW and not _matches_any(
+            routing_key or "", settings.RABBIT_PAYLOAD_CAPTURE_ALLOW
+        ):
+            return {}
+        if _matches_any(
+            routing_key or "", settings.RABBIT_PAYLOAD_CAPTURE_DENY
+        ):
+            return {}
+        if random.random() >= settings.RABBIT_PAYLOAD_CAPTURE_SAMPLE_RATE:
+            return {}
+
+        limit = settings.RABBIT_PAYLOAD_CAPTURE_MAX_BYTES
+        body = render(limit)
+        if limit is None or len(encoded := body.encode()) <= limit:
+            return {"messaging.message.body": body}
+        return {
+            "messaging.message.body": encoded[:limit].decode(errors="ignore"),
+            "messaging.message.body.truncated": True,
+        }
+
     def get_publish_attrs_from_cmd(
         self,
         kwargs: "RabbitPublishCommand",
     ) -> dict[str, Any]:
         ret = super().get_publish_attrs_from_cmd(kwargs)
+
+        def render(limit: int | None) -> str:
+            body = kwargs.body
+            if limit is not None and isinstance(body, bytes | str):
+                body = body[: limit + 1]  # +1 so it still reads truncated
+            if isinstance(body, bytes):
+                return body.decode(errors="ignore")
+            return message_body_to_str(body, limit)
+
         try:
-            message_body_str = message_body_to_str(kwargs.body)
+            return ret | self._payload_attrs(
+                kwargs.destination,
+                trace.get_current_span().get_span_context(),
+                render,
+            )
         except ValueError:
             return ret
-        return ret | {"messaging.message.body": message_body_str}
 
     def get_consume_attrs_from_message(
         self, msg: "StreamMessage[IncomingMessage]"
     ) -> dict[str, Any]:
-        return super().get_consume_attrs_from_message(msg) | {
-            "messaging.message.body": msg.body.decode()
-        }
+        def render(limit: int | None) -> str:
+            body = msg.body if limit is None else msg.body[: limit + 1]
+            return body.decode(errors="ignore")
+
+        parent = trace.get_current_span(
+            _PROPAGATOR.extract(msg.headers)
+        ).get_span_context()
+        return super().get_consume_attrs_from_message(
+            msg
+        ) | self._payload_attrs(msg.raw_message.routing_key, parent, render)
 
 
 class RabbitPayloadTelemetryMiddleware(TelemetryMiddleware):
@@ -58,13 +174,63 @@ class RabbitPayloadTelemetryMiddleware(TelemetryMiddleware):
         meter_provider: MeterProvider | None = None,
         meter: Meter | None = None,
         include_messages_counters: bool = False,
+        settings: RabbitmqSettings | None = None,
     ) -> None:
+        """
+        :param settings: `RABBIT_PAYLOAD_CAPTURE_*` limits on the captured
+        `messaging.message.body`, every body is captured in full without
+        """
         super().__init__(
             settings_provider_factory=(
-                lambda _: RabbitPayloadTelemetrySettingsProvider()  # type: ignore
+                lambda _: RabbitPayloadTelemetrySettingsProvider(settings)  # type: ignore
             ),
             tracer_provider=tracer_provider,
             meter_provider=meter_provider,
             meter=meter,
             include_messages_counters=include_messages_counters,
         )
+
+
+class RabbitCompressionMiddleware(BaseMiddleware):
+    """
+    compresses bodies published with a `content_encoding` of `zstd`/`gzip`,
+    see `decompressing_parser` for the consuming side
+    """
+
+    def __init__(
+        self,
+        msg: "IncomingMessage | None",
+        /,
+        *,
+        context: "ContextRepo",
+        min_bytes: int,
+        encode: Callable[[Any], Awaitable[tuple[bytes, str | None]]],
+    ) -> None:
+        """
+        :param min_bytes: encoded bodies smaller than this are sent raw
+        :param encode: the broker's body encoder, (body, content type)
+        """
+        super().__init__(msg, context=context)
+        self._min_bytes = min_bytes
+        self._encode = encode
+
+    async def publish_scope(  # type: ignore[override]
+        self,
+        call_next: Callable[["RabbitPublishCommand"], Awaitable[Any]],
+        cmd: "RabbitPublishCommand",
+    ) -> Any:
+        from aio_pika import Message
+
+        compression = cmd.message_options.get("content_encoding")
+        if not is_compression(compression) or isinstance(cmd.body, Message):
+            return await call_next(cmd)
+
+        body, content_type = await self._encode(cmd.body)
+        if not cmd.message_options.get("content_type"):
+            cmd.message_options["content_type"] = content_type
+        if len(body) < self._min_bytes:
+            del cmd.message_options["content_encoding"]
+            cmd.body = body
+        else:
+            cmd.body = compress(body, compression)
+        return await call_next(cmd)
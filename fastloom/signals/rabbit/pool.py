@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING
+
+from opentelemetry import metrics
+from opentelemetry.metrics import CallbackOptions, Observation
+
+if TYPE_CHECKING:
+    from aio_pika.abc import AbstractRobustChannel, AbstractRobustConnection
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+
+class ChannelPool:
+    """A bounded pool of side channels on a dedicated connection.
+
+    A channel-level error only retires the channel it happened on - every
+    other in-flight borrower keeps its own channel.
+    """
+
+    uri: str
+    size: int
+    _connection: AbstractRobustConnection | None
+    _idle: list[AbstractRobustChannel]
+    _in_use: int
+    _slots: asyncio.Semaphore
+    _connection_lock: asyncio.Lock
+
+    def __init__(self, uri: str, size: int, name: str = "topology"):
+        """
+        :param uri: AMQP URI for the pool's own connection
+        :param size: max channels open at once
+        :param name: `pool` attribute on the exported metrics
+        """
+        self.uri = uri
+        self.size = size
+        self._connection = None
+        self._idle = []
+        self._in_use = 0
+        self._slots = asyncio.Semaphore(size)
+        self._connection_lock = asyncio.Lock()
+        self._attributes = {"pool": name}
+        self._wait_time = meter.create_histogram(
+            "rabbit.channel_pool.wait_time",
+            unit="s",
+            description="Time spent waiting for a free pooled channel",
+        )
+        meter.create_observable_gauge(
+            "rabbit.channel_pool.utilization",
+            callbacks=[self._observe_utilization],
+            description="Fraction of pooled channels currently borrowed",
+        )
+
+    def _observe_utilization(
+        self, _options: CallbackOptions
+    ) -> list[Observation]:
+        return [Observation(self._in_use / self.size, self._attributes)]
+
+    async def _get_connection(self) -> AbstractRobustConnection:
+        import aio_pika
+
+        async with self._connection_lock:
+            if self._connection is None or self._connection.is_closed:
+                self._connection = await aio_pika.connect_robust(self.uri)
+                self._idle.clear()
+                logger.warning("new channel pool connection established")
+            return self._connection
+
+    async def _checkout(self) -> AbstractRobustChannel:
+        while self._idle:
+            if not (channel := self._idle.pop()).is_closed:
+                return channel
+        connection = await self._get_connection()
+        return await connection.channel()
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[AbstractRobustChannel]:
+        started = time.monotonic()
+        async with self._slots:
+            self._wait_time.record(
+                time.monotonic() - started, self._attributes
+            )
+            channel = await self._checkout()
+            self._in_use += 1
+            try:
+                yield channel
+            except BaseException:
+                # the error may have left the channel closed or mid-frame -
+                # retire it rather than hand it to the next borrower
+                if not channel.is_closed:
+                    await channel.close()
+                raise
+            else:
+                self._idle.append(channel)
+            finally:
+                self._in_use -= 1
+
+    async def close(self) -> None:
+        if self._connection is not None and not self._connection.is_closed:
+            await self._connection.close()
+        self._connection = None
+        self._idle.clear()
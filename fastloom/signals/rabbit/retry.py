@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from functools import wraps
+from typing import Any
+
+from opentelemetry import metrics
+
+from fastloom.utils import exponential_backoff
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+_retries = meter.create_counter(
+    "rabbit.subscriber.fast_retries",
+    description="Handler calls retried in-process before the DLX path",
+)
+
+
+@dataclass(frozen=True, slots=True)
+class FastRetry:
+    """
+    :param exceptions: exception types retried in-process, anything else
+    goes straight to the exception middleware
+    :param attempts: in-process retries before the broker-level path
+    :param base_delay: seconds slept before the first retry, doubling
+    (with jitter) on every next one
+    :param max_delay: cap on a single retry's sleep
+    """
+
+    exceptions: tuple[type[Exception], ...]
+    attempts: int = 3
+    base_delay: float = 0.05
+    max_delay: float = 1.0
+
+    def __post_init__(self):
+        if self.attempts < 1:
+            raise ValueError("attempts must be at least 1")
+        if not 0 <= self.base_delay <= self.max_delay:
+            raise ValueError("expected 0 <= base_delay <= max_delay")
+
+    def wrap[**P](
+        self, handler: Callable[P, Awaitable[Any]], name: str
+    ) -> Callable[P, Awaitable[Any]]:
+        """
+        :param name: `subscriber` attribute on the exported metric
+        """
+        attributes = {"subscriber": name}
+
+        @wraps(handler)
+        async def retried(*args: P.args, **kwargs: P.kwargs) -> Any:
+            for attempt in range(1, self.attempts + 1):
+                try:
+                    return await handler(*args, **kwargs)
+                except self.exceptions as exc:
+                    logger.debug(
+                        f"{name}: in-process retry {attempt} after {exc!r}"
+                    )
+                    _retries.add(1, attributes)
+                await asyncio.sleep(
+                    exponential_backoff(
+                        attempt, self.base_delay, self.max_delay
+                    )
+                )
+            return await handler(*args, **kwargs)
+
+        return retried
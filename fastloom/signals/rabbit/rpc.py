@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from functools import wraps
+from typing import TYPE_CHECKING, Any
+from uuid import uuid4
+
+from opentelemetry import metrics
+
+if TYPE_CHECKING:
+    from faststream.rabbit import RabbitMessage
+
+logger = logging.getLogger(__name__)
+meter = metrics.get_meter(__name__)
+
+RPC_ERROR_HEADER = "x-rpc-error"
+# NOTE: the pseudo-queue behind direct reply-to - never declared, and only
+# consumable with no_ack from the channel the requests go out on
+REPLY_QUEUE = "amq.rabbitmq.reply-to"
+
+_durations = meter.create_histogram(
+    "rabbit.rpc.client.duration",
+    unit="s",
+    description="Round trip of a Rabbit RPC call, slot wait included",
+)
+
+
+class RpcError(Exception):
+    """the remote handler raised; carries its exception type and message"""
+
+    def __init__(self, routing_key: str, error: str, detail: str):
+        super().__init__(f"{routing_key}: {error}: {detail}")
+        self.routing_key = routing_key
+        self.error = error
+        self.detail = detail
+
+
+class RpcClient:
+    """Multiplexes concurrent calls over one direct reply-to consumer.
+
+    Every call gets a correlation id and a future in `pending`; the reply
+    consumer resolves the future its reply's correlation id points at. At
+    most `max_in_flight` calls wait for a reply at once, the rest wait for
+    a slot.
+    """
+
+    pending: dict[str, asyncio.Future[RabbitMessage]]
+
+    def __init__(
+        self,
+        publish: Callable[..., Awaitable[Any]],
+        max_in_flight: int,
+    ):
+        """
+        :param publish: sends a request, called with the payload and
+        `routing_key`, `correlation_id`, `reply_to`, `expiration` kwargs
+        :param max_in_flight: calls awaiting a reply at once
+        """
+        self.publish = publish
+        self.pending = {}
+        self._slots = asyncio.Semaphore(max_in_flight)
+
+    async def call(
+        self, routing_key: str, payload: Any, timeout: float
+    ) -> Any:
+        """
+        :return: the decoded reply body
+        :raise RpcError: the remote handler raised
+        :raise TimeoutError: no reply within `timeout` seconds
+        """
+        started = time.perf_counter()
+        outcome = "ok"
+        try:
+            async with asyncio.timeout(timeout), self._slots:
+                reply = await self._round_trip(routing_key, payload, timeout)
+            if (error := reply.headers.get(RPC_ERROR_HEADER)) is not None:
+                outcome = "error"
+                raise RpcError(routing_key, error, await reply.decode())
+            return await reply.decode()
+        except TimeoutError:
+            outcome = "timeout"
+            raise
+        finally:
+            _durations.record(
+                time.perf_counter() - started,
+                {"routing_key": routing_key, "outcome": outcome},
+            )
+
+    async def _round_trip(
+        self, routing_key: str, payload: Any, timeout: float
+    ) -> RabbitMessage:
+        correlation_id = uuid4().hex
+        reply = self.pending[correlation_id] = (
+            asyncio.get_running_loop().create_future()
+        )
+        try:
+            # NOTE: the reply may resolve `reply` before `publish` returns
+            await self.publish(
+                payload,
+                routing_key=routing_key,
+                correlation_id=correlation_id,
+                reply_to=REPLY_QUEUE,
+                # a request nobody picked up in time has no caller left
+                expiration=timeout,
+            )
+            return await reply
+        finally:
+            self.pending.pop(correlation_id, None)
+
+    def resolve(self, message: RabbitMessage) -> None:
+        reply = self.pending.get(message.correlation_id)
+        if reply is None or reply.done():
+            logger.debug(f"dropped late rpc reply {message.correlation_id}")
+            return
+        reply.set_result(message)
+
+
+def rpc_handler[**P](
+    handler: Callable[P, Awaitable[Any]],
+) -> Callable[P, Awaitable[Any]]:
+    """
+    :return: handler replying with the error instead of raising it, so a
+    failed call neither goes down the retry path nor leaves the caller
+    waiting for its timeout
+    """
+    from faststream.rabbit import RabbitResponse
+
+    @wraps(handler)
+    async def replying(*args: P.args, **kwargs: P.kwargs) -> Any:
+        try:
+            return await handler(*args, **kwargs)
+        except Exception as exc:
+            logger.exception(f"rpc handler {handler.__name__} failed")
+            return RabbitResponse(
+                str(exc), headers={RPC_ERROR_HEADER: type(exc).__name__}
+            )
+
+    return replying
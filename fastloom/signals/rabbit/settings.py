@@ -1,7 +1,21 @@
-from pydantic import AmqpDsn, BaseModel
+from pydantic import AmqpDsn, BaseModel, Field, PositiveInt
 
 from fastloom.types import Str
 
 
 class RabbitmqSettings(BaseModel):
     RABBIT_URI: Str[AmqpDsn]
+    RABBIT_PREDECLARE_BACKOFF: bool = False
+    RABBIT_BUCKETED_DELAYS: bool = False
+    RABBIT_DELAY_TIERS: list[PositiveInt] = Field(default_factory=list)
+    RABBIT_RPC: bool = False
+    RABBIT_RPC_MAX_IN_FLIGHT: int = Field(256, ge=1)
+    RABBIT_TOPOLOGY_POOL_SIZE: int = Field(4, ge=1)
+    RABBIT_COMPRESSION_MIN_BYTES: int = Field(1024, ge=0)
+    RABBIT_PAYLOAD_CAPTURE_MAX_BYTES: int | None = Field(None, ge=0)
+    RABBIT_PAYLOAD_CAPTURE_SAMPLE_RATE: float = Field(1.0, ge=0, le=1)
+    RABBIT_PAYLOAD_CAPTURE_ALLOW: list[str] = Field(default_factory=list)
+    RABBIT_PAYLOAD_CAPTURE_DENY: list[str] = Field(default_factory=list)
+    # the stable part of a stream consumer's offset key, the hostname by
+    # default
+    RABBIT_INSTANCE_ID: str | None = None
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from datetime import datetime
+from functools import wraps
+from typing import Protocol
+
+logger = logging.getLogger(__name__)
+
+# `x-stream-offset`: "first" / "last" / "next", an absolute offset, a
+# `datetime` to replay from, or an interval such as "1h"
+type StreamOffset = int | datetime | str
+
+
+class StreamOffsetStore(Protocol):
+    async def load(self, key: str) -> int | None: ...
+
+    async def save(self, key: str, offset: int) -> None: ...
+
+
+class RedisOffsetStore:
+    """keeps stream offsets in `RedisHandler.redis`"""
+
+    async def load(self, key: str) -> int | None:
+        from fastloom.cache.lifehooks import RedisHandler
+
+        value = await RedisHandler.redis.get(key)
+        return None if value is None else int(value)
+
+    async def save(self, key: str, offset: int) -> None:
+        from fastloom.cache.lifehooks import RedisHandler
+
+        await RedisHandler.redis.set(key, offset)
+
+
+class StreamOffsetTracker:
+    """Tracks how far one stream consumer got, and stores it periodically.
+
+    Deliveries are handled concurrently, so the stored offset is the last
+    one below every delivery still in flight - a restart may replay a few
+    handled messages, but never skips an unhandled one.
+    """
+
+    store: StreamOffsetStore
+    key: str
+    interval: float
+    _in_flight: set[int]
+    _handled: int | None
+    _stored: int | None
+
+    def __init__(self, store: StreamOffsetStore, key: str, interval: float):
+        """
+        :param store: where offsets are kept across restarts
+        :param key: this consumer's key in `store`
+        :param interval: seconds between stores
+        """
+        self.store = store
+        self.key = key
+        self.interval = interval
+        self._in_flight = set()
+        self._handled = None
+        self._stored = None
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def committable(self) -> int | None:
+        if self._in_flight:
+            return min(self._in_flight) - 1
+        return self._handled
+
+    async def resume_offset(self, default: StreamOffset) -> StreamOffset:
+        """
+        :return: the offset after the stored one, `default` without one
+        """
+        if (stored := await self.store.load(self.key)) is None:
+            return default
+        self._stored = self._handled = stored
+        return stored + 1
+
+    def wrap[**P](
+        self,
+        handler: Callable[P, Awaitable[None]],
+        get_offset: Callable[[], int | None],
+    ) -> Callable[P, Awaitable[None]]:
+        """
+        :param get_offset: the current delivery's `x-stream-offset`
+        """
+
+        @wraps(handler)
+        async def tracked(*args: P.args, **kwargs: P.kwargs) -> None:
+            if (offset := get_offset()) is None:
+                return await handler(*args, **kwargs)
+            self._in_flight.add(offset)
+            try:
+                await handler(*args, **kwargs)
+            finally:
+                # NOTE: a stream can't requeue, so a failed delivery is just
+                # as done as a handled one
+                self._in_flight.discard(offset)
+                self._handled = max(offset, self._handled or -1)
+
+        return tracked
+
+    async def flush(self) -> None:
+        offset = self.committable
+        if offset is None or (
+            self._stored is not None and offset <= self._stored
+        ):
+            return
+        await self.store.save(self.key, offset)
+        self._stored = offset
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception(f"failed to store stream offset {self.key}")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        self._task = None
+        await self.flush()
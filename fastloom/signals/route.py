@@ -0,0 +1,255 @@
+import inspect
+import json
+from collections.abc import Awaitable, Callable
+from functools import cache
+from types import UnionType
+from typing import Any, Union, get_args, get_origin
+
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+
+class Tombstone:
+    """Sentinel marking a message body as a genuine null value - not a byte
+    pattern (`b"null"`, `b""`), so it can never collide with real content."""
+
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "TOMBSTONE"
+
+    def __bool__(self) -> bool:
+        return False
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source_type: Any, handler: Any):
+        from pydantic_core import core_schema
+
+        return core_schema.is_instance_schema(cls)
+
+    @classmethod
+    def __get_pydantic_json_schema__(cls, schema: Any, handler: Any):
+        return {"const": "TOMBSTONE"}
+
+
+TOMBSTONE = Tombstone()
+
+
+def _accepts_tombstone(annotation: Any) -> bool:
+    """Whether a handler's declared body type opts into the raw sentinel."""
+    if annotation is Tombstone:
+        return True
+
+    if get_origin(annotation) in (Union, UnionType):
+        return any(_accepts_tombstone(arg) for arg in get_args(annotation))
+
+    return False
+
+
+_fastapi_route_patched = False
+
+
+def patch_fastapi_body_wrapping() -> None:
+    """
+    swaps FastStream's handler call for FastAPI routers - process-wide, so
+    both brokers apply it - for one that lets a `Tombstone` through to the
+    handlers typed for it and takes the body fast path where it can
+    """
+    global _fastapi_route_patched
+    if _fastapi_route_patched:
+        return
+    _fastapi_route_patched = True
+
+    from itertools import dropwhile
+
+    import faststream._internal.fastapi.route as route
+
+    def build_faststream_to_fastapi_parser(
+        *,
+        dependent: Any,
+        fastapi_config: Any,
+        context: Any,
+        response_field: Any,
+        response_model_include: Any,
+        response_model_exclude: Any,
+        response_model_by_alias: Any,
+        response_model_exclude_unset: Any,
+        response_model_exclude_defaults: Any,
+        response_model_exclude_none: Any,
+    ) -> Any:
+        assert dependent.call
+
+        consume = route.make_fastapi_execution(
+            dependent=dependent,
+            fastapi_config=fastapi_config,
+            response_field=response_field,
+            response_model_include=response_model_include,
+            response_model_exclude=response_model_exclude,
+            response_model_by_alias=response_model_by_alias,
+            response_model_exclude_unset=response_model_exclude_unset,
+            response_model_exclude_defaults=response_model_exclude_defaults,
+            response_model_exclude_none=response_model_exclude_none,
+        )
+
+        dependencies_names = tuple(i.name for i in dependent.dependencies)
+        call_params = inspect.signature(dependent.call).parameters
+        first_arg = next(
+            dropwhile(lambda i: i in dependencies_names, call_params),
+            None,
+        )
+        first_arg_accepts_tombstone = (
+            first_arg is not None
+            and _accepts_tombstone(call_params[first_arg].annotation)
+        )
+
+        async def parsed_consumer(message: Any) -> Any:
+            if first_arg_accepts_tombstone and message.body is TOMBSTONE:
+                body: Any = TOMBSTONE
+            else:
+                body = await message.decode()
+
+            fastapi_body: dict[str, Any] | list[Any] | None | Tombstone
+            if first_arg is not None:
+                if isinstance(body, dict):
+                    path = fastapi_body = body or {}
+                elif (
+                    isinstance(body, list) or body is None or body is TOMBSTONE
+                ):
+                    fastapi_body, path = body, {}
+                else:
+                    path = fastapi_body = {first_arg: body}
+
+                stream_message = route.StreamMessage(
+                    body=fastapi_body,
+                    headers={"context__": context, **message.headers},
+                    path={**path, **message.path},
+                )
+            else:
+                stream_message = route.StreamMessage(
+                    body={},
+                    headers={"context__": context},
+                    path={},
+                )
+
+            return await consume(stream_message, message)
+
+        return (
+            _body_fast_path(
+                dependent,
+                parsed_consumer,
+                field=response_field,
+                include=response_model_include,
+                exclude=response_model_exclude,
+                by_alias=response_model_by_alias,
+                exclude_unset=response_model_exclude_unset,
+                exclude_defaults=response_model_exclude_defaults,
+                exclude_none=response_model_exclude_none,
+            )
+            or parsed_consumer
+        )
+
+    route.build_faststream_to_fastapi_parser = (
+        build_faststream_to_fastapi_parser
+    )
+
+
+@cache
+def _body_adapter(model: type[BaseModel]) -> TypeAdapter[BaseModel]:
+    return TypeAdapter(model)
+
+
+def _fast_path_model(dependent: Any) -> tuple[str, type[BaseModel]] | None:
+    """
+    :return: name and type of a handler's one and only param, when that's
+    a pydantic model taken as the whole body with nothing to inject
+    """
+    if dependent.dependencies or len(dependent.body_params) != 1:
+        return None
+    (param,) = dependent.body_params
+    if len(inspect.signature(dependent.call).parameters) != 1:
+        return None
+    model = param.field_info.annotation
+    if not (isinstance(model, type) and issubclass(model, BaseModel)):
+        return None
+    if getattr(param.field_info, "embed", False):
+        return None
+    return param.name, model
+
+
+def _is_json(content_type: str | None) -> bool:
+    return not content_type or content_type.startswith("application/json")
+
+
+def _is_plain_json(message: Any) -> bool:
+    """
+    :return: whether the body is the JSON off the wire, as the broker's own
+    decoder reads it - no custom decoder or codec, no parser that swapped
+    the body (a decompressing one included) and no content encoding
+    """
+    body = message.body
+    if not isinstance(body, bytes) or not _is_json(message.content_type):
+        return False
+    if message.headers.get("content-encoding"):
+        return False
+    # NOTE: FastStream keeps the message's decoder private - its own are
+    # the parser's bound `decode_message`, where a custom decoder is a
+    # `ParserComposition` and a codec's is its `decode`
+    decoder = getattr(message, "_StreamMessage__decoder", None)
+    if getattr(decoder, "__name__", None) != "decode_message" or not hasattr(
+        decoder, "__self__"
+    ):
+        return False
+    raw = message.raw_message
+    return body is (raw.body if hasattr(raw, "body") else raw.value())
+
+
+def _body_fast_path(
+    dependent: Any,
+    fallback: Callable[[Any], Awaitable[Any]],
+    **serialize_options: Any,
+) -> Callable[[Any], Awaitable[Any]] | None:
+    """
+    :param serialize_options: FastAPI's `serialize_response` arguments
+
+    validates the raw body straight into the handler's model and calls it
+    - no decode, no FastAPI request, no dependency solving; anything the
+    fast path can't take (a tombstone, a batch, a non-JSON, compressed or
+    custom-decoded body) goes through `fallback`
+    """
+    if (found := _fast_path_model(dependent)) is None:
+        return None
+    name, model = found
+    adapter = _body_adapter(model)
+    is_coroutine = inspect.iscoroutinefunction(dependent.call)
+
+    import faststream._internal.fastapi.route as route
+
+    async def fast_consumer(message: Any) -> Any:
+        if not _is_plain_json(message):
+            return await fallback(message)
+        try:
+            value = adapter.validate_json(message.body)
+        except ValidationError as exc:
+            try:
+                # the decoded body, as the full path reports it
+                body = json.loads(message.body)
+            except ValueError:
+                body = None
+            route.raise_fastapi_validation_error(
+                [{**e, "loc": ("body", *e["loc"])} for e in exc.errors()],
+                body,
+            )
+        response = route.ensure_response(
+            await route.run_endpoint_function(
+                dependant=dependent,
+                values={name: value},
+                is_coroutine=is_coroutine,
+            )
+        )
+        response.body = await route.serialize_response(
+            response_content=response.body,
+            is_coroutine=is_coroutine,
+            **serialize_options,
+        )
+        return response
+
+    return fast_consumer
@@ -0,0 +1,32 @@
+import os
+import tempfile
+from functools import cache
+
+# slot lock files, held open - and so locked - for the process's lifetime
+_slot_locks: list[int] = []
+
+
+@cache
+def claim_worker_slot(name: str, directory: str | None = None) -> int:
+    """
+    :param name: the slots' namespace - one per service, environment and
+    broker
+    :param directory: where the lock files live, the temp dir by default
+    :return: the lowest slot no other live process on this host holds -
+    a restarted worker gets the one its predecessor held
+    """
+    import fcntl
+
+    directory = directory or tempfile.gettempdir()
+    slot = 0
+    while True:
+        path = os.path.join(directory, f"{name}.{slot}.lock")
+        fd = os.open(path, os.O_CREAT | os.O_RDWR, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            slot += 1
+            continue
+        _slot_locks.append(fd)
+        return slot
@@ -104,6 +104,9 @@ class Configs[T: BaseModel, V: BaseModel](SelfSustaining):
         if isinstance(self.general, MonitoringSettings):
             BaseDocumentSignal._PROJECT_NAME = self.general.PROJECT_NAME
 
+        BaseDocumentSignal._OUTBOX = self.general.MONGO_OUTBOX
+        BaseDocumentSignal._OUTBOX_SHARDS = self.general.MONGO_OUTBOX_SHARDS
+
     def _setup_redis(self):
         if not issubclass(self.service_cls, RedisSettings):
             return
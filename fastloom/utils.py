@@ -3,11 +3,28 @@ import random
 
 def exponential_backoff(
     attempt: int,
-    base_delay: int,
-    max_delay: int,
+    base_delay: float,
+    max_delay: float,
     jitter: bool = True,
 ) -> float:
     delay = min(base_delay * 2 ** (attempt - 1), max_delay)
     if jitter:
         delay += random.uniform(-0.1 * delay, 0.1 * delay)
     return delay
+
+
+def backoff_ladder(base_delay: int, max_delay: int) -> list[int]:
+    """
+    :return: every distinct unjittered `exponential_backoff` delay, from
+    `base_delay` doubling up to `max_delay`
+    """
+    delays = [base_delay]
+    while delays[-1] < max_delay:
+        delays.append(
+            int(
+                exponential_backoff(
+                    len(delays) + 1, base_delay, max_delay, jitter=False
+                )
+            )
+        )
+    return delays
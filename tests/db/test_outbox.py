@@ -0,0 +1,143 @@
+from types import SimpleNamespace
+
+import pytest
+from opentelemetry import trace
+from opentelemetry.trace import NonRecordingSpan, SpanContext, TraceFlags
+
+from fastloom.db import Session
+from fastloom.db.outbox import OutboxRelay, enqueue, get_outbox_shard
+from fastloom.signals.rabbit.batch import PublishBatch, PublishFailure
+
+
+class _Cursor:
+    def __init__(self, documents):
+        self._documents = documents
+
+    def sort(self, key, direction):
+        self._documents.sort(key=lambda d: d[key], reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        self._documents = self._documents[:count]
+        return self
+
+    async def to_list(self):
+        return self._documents
+
+
+class _FakeCollection:
+    def __init__(self):
+        self.documents: list[dict] = []
+        self.sessions: list[object] = []
+
+    async def insert_one(self, document, session=None):
+        document["_id"] = len(self.documents)
+        self.documents.append(document)
+        self.sessions.append(session)
+
+    def find(self, query):
+        return _Cursor(
+            [
+                d
+                for d in self.documents
+                if all(d[k] == v for k, v in query.items())
+            ]
+        )
+
+    async def delete_many(self, query):
+        ids = set(query["_id"]["$in"])
+        self.documents = [d for d in self.documents if d["_id"] not in ids]
+
+
+@pytest.fixture
+def published(monkeypatch):
+    published: list[tuple[str, object]] = []
+    traces: list[int] = []
+    failing: set[int] = set()
+
+    def trace_id():
+        return trace.get_current_span().get_span_context().trace_id
+
+    async def flush(items, contexts):
+        published.extend(items)
+        traces.extend(context.run(trace_id) for context in contexts)
+        return [
+            PublishFailure(index, key, RuntimeError())
+            for index, (key, _) in enumerate(items)
+            if index in failing
+        ]
+
+    monkeypatch.setattr(
+        "fastloom.db.outbox.RabbitSubscriber",
+        SimpleNamespace(batch=lambda timeout: PublishBatch(flush)),
+    )
+    return SimpleNamespace(items=published, traces=traces, failing=failing)
+
+
+def test_shard_is_stable_per_document():
+    assert get_outbox_shard("abc", 8) == get_outbox_shard("abc", 8)
+    assert {get_outbox_shard(i, 4) for i in range(100)} == {0, 1, 2, 3}
+
+
+async def test_enqueue_joins_the_current_session():
+    collection = _FakeCollection()
+    session = object()
+
+    await enqueue(collection, "p.orders.create", {"a": 1}, shard=0)
+    token = Session.set(session)
+    try:
+        await enqueue(collection, "p.orders.create", {"a": 2}, shard=0)
+    finally:
+        Session.reset(token)
+
+    assert collection.sessions == [None, session]
+
+
+async def test_drain_publishes_in_order_and_removes_confirmed(published):
+    collection = _FakeCollection()
+    for i in range(3):
+        await enqueue(collection, f"p.orders.{i}", {"i": i}, shard=0)
+    await enqueue(collection, "p.users.create", {"i": 9}, shard=1)
+    published.failing.add(1)
+
+    drained = await OutboxRelay(collection, shard=0).drain()
+
+    assert drained == 2
+    assert published.items == [
+        ("p.orders.0", {"i": 0}),
+        ("p.orders.1", {"i": 1}),
+        ("p.orders.2", {"i": 2}),
+    ]
+    assert [d["routing_key"] for d in collection.documents] == [
+        "p.orders.1",
+        "p.users.create",
+    ]
+
+
+async def test_drain_respects_batch_size(published):
+    collection = _FakeCollection()
+    for i in range(5):
+        await enqueue(collection, "p.orders.create", {"i": i}, shard=0)
+
+    assert await OutboxRelay(collection, batch_size=2).drain() == 2
+    assert [body for _, body in published.items] == [{"i": 0}, {"i": 1}]
+    assert len(collection.documents) == 3
+
+
+async def test_drain_publishes_under_the_writers_trace(published):
+    collection = _FakeCollection()
+    span = NonRecordingSpan(
+        SpanContext(
+            trace_id=42,
+            span_id=7,
+            is_remote=False,
+            trace_flags=TraceFlags(TraceFlags.SAMPLED),
+        )
+    )
+    with trace.use_span(span):
+        await enqueue(collection, "p.orders.create", {"i": 0}, shard=0)
+    await enqueue(collection, "p.orders.create", {"i": 1}, shard=0)
+
+    await OutboxRelay(collection).drain()
+
+    assert published.traces == [42, 0]
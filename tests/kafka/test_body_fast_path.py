@@ -0,0 +1,149 @@
+import pytest
+from fastapi import Depends
+from fastapi.exceptions import RequestValidationError
+from faststream.confluent import TestKafkaBroker
+from faststream.confluent.fastapi import KafkaMessage
+from pydantic import BaseModel
+
+from fastloom.signals.kafka.depends import get_kafka_router
+from fastloom.signals.kafka.settings import KafkaSubscriptable
+from fastloom.signals.route import _is_plain_json
+
+
+class Order(BaseModel):
+    id: int
+    sku: str
+
+
+@pytest.fixture
+def router():
+    return get_kafka_router(
+        KafkaSubscriptable(
+            ENVIRONMENT="test", PROJECT_NAME="p", KAFKA_URI="localhost:1"
+        ),
+        allow_auto_create_topics=True,
+        acks=1,
+        enable_idempotence=False,
+    )
+
+
+@pytest.fixture
+def solved(monkeypatch):
+    """FastAPI dependency solving calls - the slow path"""
+    import faststream._internal.fastapi.route as route
+
+    calls: list[object] = []
+    original = route.solve_faststream_dependency
+
+    async def counting(**kwargs):
+        calls.append(kwargs["dependant"].call)
+        return await original(**kwargs)
+
+    monkeypatch.setattr(route, "solve_faststream_dependency", counting)
+    return calls
+
+
+async def test_a_lone_model_body_skips_dependency_solving(router, solved):
+    seen: list[Order] = []
+
+    @router.subscriber("orders", group_id="g")
+    async def handler(order: Order):
+        seen.append(order)
+
+    async with TestKafkaBroker(router.broker) as broker:
+        await broker.publish({"id": 1, "sku": "a"}, "orders")
+
+    assert seen == [Order(id=1, sku="a")]
+    assert solved == []
+
+
+async def test_an_invalid_body_fails_like_fastapi_would(router, solved):
+    @router.subscriber("orders", group_id="g")
+    async def handler(order: Order): ...
+
+    async with TestKafkaBroker(router.broker) as broker:
+        with pytest.raises(RequestValidationError) as raised:
+            await broker.publish({"id": "x"}, "orders")
+
+    locations = {error["loc"] for error in raised.value.errors()}
+    assert locations == {("body", "id"), ("body", "sku")}
+    assert raised.value.body == {"id": "x"}
+
+
+async def test_handlers_with_dependencies_keep_the_full_path(router, solved):
+    seen: list[tuple[Order, int]] = []
+
+    def tenant() -> int:
+        return 7
+
+    @router.subscriber("orders", group_id="g")
+    async def handler(order: Order, tenant_id: int = Depends(tenant)):
+        seen.append((order, tenant_id))
+
+    async with TestKafkaBroker(router.broker) as broker:
+        await broker.publish({"id": 1, "sku": "a"}, "orders")
+
+    assert seen == [(Order(id=1, sku="a"), 7)]
+    assert len(solved) == 1
+
+
+async def test_non_json_bodies_fall_back(router, solved):
+    @router.subscriber("orders", group_id="g")
+    async def handler(order: Order): ...
+
+    async with TestKafkaBroker(router.broker) as broker:
+        with pytest.raises(RequestValidationError):
+            await broker.publish("not json", "orders")
+
+    assert len(solved) == 1
+
+
+async def test_a_custom_decoder_keeps_the_full_path(router, solved):
+    seen: list[Order] = []
+
+    async def decoder(message, original):
+        return {**await original(message), "sku": "decoded"}
+
+    @router.subscriber("orders", group_id="g", decoder=decoder)
+    async def handler(order: Order):
+        seen.append(order)
+
+    async with TestKafkaBroker(router.broker) as broker:
+        await broker.publish({"id": 1, "sku": "a"}, "orders")
+
+    assert seen == [Order(id=1, sku="decoded")]
+    assert len(solved) == 1
+
+
+async def test_encoded_bodies_keep_the_full_path(router, solved):
+    @router.subscriber("orders", group_id="g")
+    async def handler(order: Order): ...
+
+    async with TestKafkaBroker(router.broker) as broker:
+        await broker.publish(
+            {"id": 1, "sku": "a"},
+            "orders",
+            headers={"content-encoding": "identity"},
+        )
+
+    assert len(solved) == 1
+
+
+async def test_faststream_keeps_the_decoder_where_the_fast_path_reads_it(
+    router,
+):
+    # NOTE: `_is_plain_json` reads FastStream's private decoder attribute -
+    # renamed, every body would quietly take the full path
+    seen: list[bool] = []
+
+    @router.subscriber("orders", group_id="g")
+    async def handler(order: Order, message: KafkaMessage):
+        seen.append(
+            hasattr(message, "_StreamMessage__decoder")
+            and _is_plain_json(message)
+        )
+
+    async with TestKafkaBroker(router.broker) as broker:
+        await broker.publish({"id": 1, "sku": "a"}, "orders")
+
+    assert seen == [True]
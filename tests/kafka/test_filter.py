@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from faststream.confluent import TestKafkaBroker
+from pydantic import BaseModel
+
+from fastloom.signals.kafka.depends import KafkaSubscriber
+from fastloom.signals.kafka.settings import KafkaSubscriptable
+
+
+class Change(BaseModel):
+    id: int
+
+
+@pytest.fixture
+def subscriber():
+    yield KafkaSubscriber(
+        KafkaSubscriptable(
+            ENVIRONMENT="test", PROJECT_NAME="p", KAFKA_URI="localhost:1"
+        )
+    )
+    KafkaSubscriber.unbind()
+
+
+def _ours(headers, key):
+    return headers.get("tenant") == "ours"
+
+
+async def test_dropped_records_never_get_decoded(subscriber):
+    seen: list[Change] = []
+
+    @KafkaSubscriber.subscriber("cdc", group_id="g", filter=_ours)
+    async def handler(change: Change):
+        seen.append(change)
+
+    async with TestKafkaBroker(KafkaSubscriber.router.broker) as broker:
+        # would fail validation, if it got that far
+        await broker.publish("not json", "cdc", headers={"tenant": "theirs"})
+        await broker.publish({"id": 1}, "cdc", headers={"tenant": "ours"})
+
+    assert seen == [Change(id=1)]
+
+
+async def test_ordered_subscribers_filter_by_key(subscriber):
+    seen: list[Change] = []
+
+    def keep(headers, key):
+        return key != b"skip"
+
+    @KafkaSubscriber.ordered_subscriber("cdc", group_id="g", filter=keep)
+    async def handler(change: Change):
+        seen.append(change)
+
+    async with TestKafkaBroker(KafkaSubscriber.router.broker) as broker:
+        await broker.publish({"id": 1}, "cdc", key=b"skip")
+        await broker.publish({"id": 2}, "cdc", key=b"keep")
+        await asyncio.sleep(0.01)
+
+    assert seen == [Change(id=2)]
+
+
+async def test_a_table_leaves_dropped_keys_alone(subscriber):
+    table = KafkaSubscriber.table("customers", Change, filter=_ours)
+
+    async with TestKafkaBroker(KafkaSubscriber.router.broker) as broker:
+        await broker.publish(
+            {"id": 1}, "customers", key=b"1", headers={"tenant": "ours"}
+        )
+        await broker.publish(None, "customers", key=b"1")
+
+    assert table.get("1") == Change(id=1)
+
+
+def test_filters_take_single_records(subscriber):
+    with pytest.raises(ValueError):
+        KafkaSubscriber.subscriber("cdc", batch=True, filter=_ours)
+
+
+async def test_a_filter_only_applies_to_its_own_subscription(subscriber):
+    seen: list[Change] = []
+
+    @KafkaSubscriber.subscriber("cdc", group_id="g", filter=_ours)
+    @KafkaSubscriber.subscriber("other", group_id="g")
+    async def handler(change: Change):
+        seen.append(change)
+
+    async with TestKafkaBroker(KafkaSubscriber.router.broker) as broker:
+        await broker.publish({"id": 1}, "cdc", headers={"tenant": "theirs"})
+        await broker.publish({"id": 2}, "other", headers={"tenant": "theirs"})
+        await broker.publish({"id": 3}, "cdc", headers={"tenant": "ours"})
+
+    assert seen == [Change(id=2), Change(id=3)]
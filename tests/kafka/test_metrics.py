@@ -0,0 +1,87 @@
+import json
+import time
+
+from fastloom.signals.kafka.depends import KafkaSubscriber
+from fastloom.signals.kafka.metrics import ConsumerStats
+from fastloom.signals.kafka.settings import KafkaSubscriptable
+
+
+def _stats(name="rdkafka#consumer-1", kind="consumer", **partitions):
+    return json.dumps(
+        {
+            "name": name,
+            "type": kind,
+            "cgrp": {"rebalance_cnt": 2},
+            "topics": {
+                "orders": {
+                    "partitions": {
+                        str(p): {"partition": p, **fields}
+                        for p, fields in [
+                            (-1, {"consumer_lag": -1}),
+                            *partitions.values(),
+                        ]
+                    }
+                }
+            },
+        }
+    )
+
+
+def _observed(observations):
+    return {
+        (o.attributes["group"], o.attributes["partition"]): o.value
+        for o in observations
+    }
+
+
+def test_lag_and_records_come_from_the_latest_statistics():
+    stats = ConsumerStats(60_000)
+    stats.update(
+        "g",
+        _stats(
+            p0=(0, {"consumer_lag": 5, "rxmsgs": 10, "fetch_state": "active"}),
+            p1=(1, {"consumer_lag": -1, "rxmsgs": 3, "fetch_state": "active"}),
+            p2=(2, {"consumer_lag": 9, "rxmsgs": 1, "fetch_state": "none"}),
+        ),
+    )
+    stats.update("g", _stats(kind="producer"))
+
+    # no committed offset for partition 1, partition 2 isn't assigned
+    assert _observed(stats._observe_lag(None)) == {("g", 0): 5}
+    assert _observed(stats._observe_records(None)) == {
+        ("g", 0): 10,
+        ("g", 1): 3,
+    }
+    (rebalances,) = stats._observe_rebalances(None)
+    assert (rebalances.value, rebalances.attributes) == (2, {"group": "g"})
+
+
+def test_a_consumer_that_stopped_reporting_is_forgotten():
+    stats = ConsumerStats(1)
+    stats.update("g", _stats(p0=(0, {"consumer_lag": 5})))
+    time.sleep(0.01)
+
+    assert stats._observe_lag(None) == []
+
+
+def test_every_consumer_reports_its_group():
+    KafkaSubscriber(
+        KafkaSubscriptable(
+            ENVIRONMENT="test",
+            PROJECT_NAME="p",
+            KAFKA_URI="localhost:1",
+            KAFKA_STATS_INTERVAL_MS=5000,
+        )
+    )
+    try:
+        broker_config = KafkaSubscriber.router.broker.config.broker_config
+        consumer = broker_config.builder(
+            partitions=[], group_id="g", client_id="c"
+        )
+    finally:
+        KafkaSubscriber.unbind()
+
+    assert consumer.config["statistics.interval.ms"] == 5000
+    assert consumer.config["stats_cb"].args == ("g",)
+    # the broker's shared config - and so its producer - stays as it was
+    assert "stats_cb" not in broker_config.connection_config.producer_config
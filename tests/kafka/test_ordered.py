@@ -0,0 +1,301 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from faststream.confluent import TestKafkaBroker
+
+from fastloom.signals.kafka.depends import KafkaSubscriber
+from fastloom.signals.kafka.ordered import KeyOrderedDispatcher, OffsetTracker
+from fastloom.signals.kafka.settings import KafkaSubscriptable
+
+
+class _Consumer:
+    def __init__(self):
+        self.commits: list[tuple[str, int, int]] = []
+
+    def commit(self, offsets, asynchronous):
+        assert asynchronous
+        self.commits += [(o.topic, o.partition, o.offset) for o in offsets]
+
+
+def _message(consumer, offset, key=b"", partition=0):
+    record = SimpleNamespace(
+        topic=lambda: "t",
+        partition=lambda: partition,
+        offset=lambda: offset,
+        key=lambda: key,
+    )
+    return SimpleNamespace(
+        raw_message=record, consumer=SimpleNamespace(consumer=consumer)
+    )
+
+
+class _Gates:
+    """a handler whose calls, by label, block until released"""
+
+    def __init__(self):
+        self.started: list[str] = []
+        self.done: list[str] = []
+        self._gates: dict[str, asyncio.Event] = {}
+
+    async def handler(self, label):
+        self.started.append(label)
+        await self._gates.setdefault(label, asyncio.Event()).wait()
+        self.done.append(label)
+
+    def release(self, label):
+        self._gates.setdefault(label, asyncio.Event()).set()
+
+
+async def _dispatch(dispatcher, gates, messages):
+    current = {}
+    handled = dispatcher.wrap(gates.handler, lambda: current["message"])
+    for label, message in messages:
+        current["message"] = message
+        await handled(label)
+    await asyncio.sleep(0)
+
+
+def test_tracker_commits_past_a_completed_prefix_only():
+    tracker = OffsetTracker()
+    for offset in (3, 4, 7, 8):  # gaps, e.g. compacted away
+        tracker.add(offset)
+
+    assert tracker.complete(7) is None
+    assert tracker.complete(3) == 4
+    assert tracker.complete(4) == 8
+    assert tracker.complete(8) == 9
+
+
+async def test_same_key_runs_in_order_other_keys_concurrently():
+    consumer, gates = _Consumer(), _Gates()
+    dispatcher = KeyOrderedDispatcher(8, 0, 0, name="t")
+    await _dispatch(
+        dispatcher,
+        gates,
+        [
+            ("a0", _message(consumer, 0, b"a")),
+            ("b1", _message(consumer, 1, b"b")),
+            ("a2", _message(consumer, 2, b"a")),
+        ],
+    )
+    assert gates.started == ["a0", "b1"]
+
+    gates.release("a2")
+    gates.release("b1")
+    await asyncio.sleep(0.01)
+    assert gates.done == ["b1"]  # a2 still waits behind a0
+    assert consumer.commits == []  # offset 0 is still in flight
+
+    gates.release("a0")
+    await dispatcher.drain()
+    assert gates.done == ["b1", "a0", "a2"]
+    assert consumer.commits[-1] == ("t", 0, 3)
+
+
+async def test_concurrency_bounds_records_in_flight():
+    consumer, gates = _Consumer(), _Gates()
+    dispatcher = KeyOrderedDispatcher(2, 0, 0, name="t")
+    dispatching = asyncio.create_task(
+        _dispatch(
+            dispatcher,
+            gates,
+            [(str(o), _message(consumer, o)) for o in range(3)],
+        )
+    )
+    await asyncio.sleep(0.01)
+    assert gates.started == ["0", "1"]
+    assert not dispatching.done()  # the poll loop waits for a slot
+
+    for label in "012":
+        gates.release(label)
+    await dispatching
+    await dispatcher.drain()
+    assert gates.done == ["0", "1", "2"]
+
+
+async def test_a_failing_record_retries_and_holds_back_commits():
+    consumer = _Consumer()
+    dispatcher = KeyOrderedDispatcher(4, 0, 0, name="t", max_attempts=10**6)
+    calls: list[int] = []
+    release = asyncio.Event()
+
+    async def handler(offset):
+        calls.append(offset)
+        if offset == 0 and not release.is_set():
+            raise ValueError("boom")
+
+    current = {}
+    handled = dispatcher.wrap(handler, lambda: current["message"])
+    for offset in (0, 1):
+        current["message"] = _message(consumer, offset)
+        await handled(offset)
+    await asyncio.sleep(0.01)
+
+    assert calls.count(0) > 1
+    assert consumer.commits == []
+
+    release.set()
+    await dispatcher.drain()
+    assert consumer.commits[-1] == ("t", 0, 2)
+
+
+async def _always_failing(dispatcher, consumer, exc):
+    calls: list[int] = []
+
+    async def handler(offset):
+        calls.append(offset)
+        raise exc
+
+    current = {}
+    handled = dispatcher.wrap(handler, lambda: current["message"])
+    for offset in (0, 1):
+        current["message"] = _message(consumer, offset)
+        await handled(offset)
+    await dispatcher.drain()
+    return calls
+
+
+async def test_a_record_that_keeps_failing_is_given_up_on():
+    consumer = _Consumer()
+    exhausted: list[tuple[int, Exception]] = []
+
+    async def on_exhausted(message, exc):
+        exhausted.append((message.raw_message.offset(), exc))
+
+    dispatcher = KeyOrderedDispatcher(
+        4, 0, 0, name="t", max_attempts=3, on_exhausted=on_exhausted
+    )
+    error = ValueError("boom")
+
+    calls = await _always_failing(dispatcher, consumer, error)
+
+    assert calls.count(0) == calls.count(1) == 3
+    assert exhausted == [(0, error), (1, error)]
+    assert consumer.commits[-1] == ("t", 0, 2)
+
+
+async def test_only_the_retryable_exceptions_are_retried():
+    consumer = _Consumer()
+    exhausted: list[int] = []
+
+    async def on_exhausted(message, exc):
+        exhausted.append(message.raw_message.offset())
+
+    dispatcher = KeyOrderedDispatcher(
+        4,
+        0,
+        0,
+        name="t",
+        exceptions=(ConnectionError,),
+        on_exhausted=on_exhausted,
+    )
+
+    calls = await _always_failing(dispatcher, consumer, ValueError("boom"))
+
+    assert calls == [0, 1]
+    assert exhausted == [0, 1]
+    assert consumer.commits[-1] == ("t", 0, 2)
+
+
+@pytest.mark.parametrize("exc", [ValueError, KeyError])
+async def test_without_on_exhausted_a_failed_record_is_never_committed_past(
+    exc,
+):
+    consumer = _Consumer()
+    dispatcher = KeyOrderedDispatcher(
+        4, 0, 0, name="t", exceptions=(ValueError,), max_attempts=2
+    )
+    calls: list[int] = []
+
+    async def handler(offset):
+        calls.append(offset)
+        if offset == 0:
+            raise exc
+
+    current = {}
+    handled = dispatcher.wrap(handler, lambda: current["message"])
+    for offset in (0, 1):
+        current["message"] = _message(consumer, offset)
+        await handled(offset)
+    await asyncio.sleep(0.01)
+
+    assert calls.count(0) > 2  # still retrying past max_attempts
+    assert 1 in calls
+    assert consumer.commits == []
+    for task in list(dispatcher._tasks):
+        task.cancel()
+
+
+async def test_a_failed_hand_off_goes_back_to_retrying():
+    consumer = _Consumer()
+    hand_offs: list[int] = []
+
+    async def on_exhausted(message, exc):
+        hand_offs.append(message.raw_message.offset())
+        if len(hand_offs) == 1:
+            raise ConnectionError
+
+    dispatcher = KeyOrderedDispatcher(
+        4, 0, 0, name="t", max_attempts=2, on_exhausted=on_exhausted
+    )
+    calls = []
+
+    async def handler():
+        calls.append(1)
+        raise ValueError("boom")
+
+    await dispatcher.wrap(handler, lambda: _message(consumer, 0))()
+    await dispatcher.drain()
+
+    assert len(calls) == 3
+    assert hand_offs == [0, 0]
+    assert consumer.commits[-1] == ("t", 0, 1)
+
+
+async def test_a_rewound_partition_starts_a_new_tracker():
+    consumer, gates = _Consumer(), _Gates()
+    dispatcher = KeyOrderedDispatcher(4, 0, 0, name="t")
+    for label in ("x", "y"):
+        gates.release(label)
+    await _dispatch(dispatcher, gates, [("x", _message(consumer, 5))])
+    await _dispatch(dispatcher, gates, [("y", _message(consumer, 2))])
+    await dispatcher.drain()
+
+    assert ("t", 0, 3) in consumer.commits
+
+
+@pytest.fixture
+def subscriber():
+    settings = KafkaSubscriptable(
+        ENVIRONMENT="test", PROJECT_NAME="p", KAFKA_URI="localhost:1"
+    )
+    yield KafkaSubscriber(settings)
+    KafkaSubscriber.unbind()
+
+
+async def test_ordered_subscriber_keeps_per_key_order(subscriber):
+    seen: list[tuple[str, int]] = []
+
+    @KafkaSubscriber.ordered_subscriber("orders", group_id="g")
+    async def handler(body: dict):
+        await asyncio.sleep(0.001 * (3 - body["seq"]))
+        seen.append((body["key"], body["seq"]))
+
+    async with TestKafkaBroker(KafkaSubscriber.router.broker) as broker:
+        for seq in range(3):
+            for key in "ab":
+                await broker.publish(
+                    {"key": key, "seq": seq}, "orders", key=key.encode()
+                )
+        await asyncio.sleep(0.05)
+
+    for key in "ab":
+        assert [seq for k, seq in seen if k == key] == [0, 1, 2]
+
+
+def test_ordered_subscriber_rejects_its_own_ack_policy(subscriber):
+    with pytest.raises(ValueError):
+        KafkaSubscriber.ordered_subscriber("orders", batch=True)
+    with pytest.raises(ValueError):
+        KafkaSubscriber.ordered_subscriber("orders", ack_policy=None)
@@ -0,0 +1,139 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from fastloom.signals.kafka.depends import KafkaSubscriber
+from fastloom.signals.kafka.settings import KafkaSubscriptable
+
+
+class _Consumer:
+    def __init__(self, revoked: bool = False):
+        self.calls: list[tuple[str, list[tuple[str, int]]]] = []
+        self.revoked = revoked
+
+    def pause(self, partitions):
+        self.calls.append(("pause", _names(partitions)))
+
+    def resume(self, partitions):
+        if self.revoked:
+            raise RuntimeError("not assigned")
+        self.calls.append(("resume", _names(partitions)))
+
+
+def _names(partitions):
+    return [(tp.topic, tp.partition) for tp in partitions]
+
+
+def _message(consumer, partition: int = 0, offset: int = 0):
+    raw = SimpleNamespace(
+        topic=lambda: "t",
+        partition=lambda: partition,
+        offset=lambda: offset,
+    )
+    return SimpleNamespace(
+        raw_message=raw,
+        is_manual=True,
+        consumer=SimpleNamespace(consumer=consumer),
+    )
+
+
+class _Clock:
+    """sleeps block until `elapse()`"""
+
+    def __init__(self):
+        self.delays: list[float] = []
+        self._elapsed = asyncio.Event()
+
+    async def sleep(self, delay):
+        self.delays.append(delay)
+        await self._elapsed.wait()
+
+    def elapse(self):
+        self._elapsed.set()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr("asyncio.sleep", clock.sleep)
+    monkeypatch.setattr("random.uniform", lambda _lo, _hi: 0)
+    return clock
+
+
+@pytest.fixture
+def subscriber(clock):
+    settings = KafkaSubscriptable(
+        ENVIRONMENT="test", PROJECT_NAME="p", KAFKA_URI="localhost:1"
+    )
+    sub = KafkaSubscriber(settings, base_delay=1, max_delay=8, retry="pause")
+    yield sub
+    KafkaSubscriber.unbind()
+
+
+def _middleware(subscriber):
+    (factory,) = [
+        m
+        for m in subscriber.router.broker.middlewares
+        if m.__name__ == "_RetryMiddleware"
+    ]
+    return factory(None, context=None)
+
+
+async def _consume(subscriber, message, fail: bool):
+    async def handler(_):
+        if fail:
+            raise ValueError("boom")
+        return "ok"
+
+    return await _middleware(subscriber).consume_scope(handler, message)
+
+
+async def test_only_the_failed_partition_waits_out_the_delay(
+    subscriber, clock
+):
+    consumer = _Consumer()
+
+    with pytest.raises(ValueError):
+        await _consume(subscriber, _message(consumer, partition=0), True)
+    # the middleware returned without waiting - partition 1 still flows
+    assert await _consume(subscriber, _message(consumer, 1), False) == "ok"
+    assert consumer.calls == [("pause", [("t", 0)])]
+
+    clock.elapse()
+    await asyncio.gather(*subscriber._resumes)
+    assert consumer.calls[-1] == ("resume", [("t", 0)])
+    assert clock.delays == [1]
+
+
+async def test_redelivered_offset_backs_off_longer(subscriber, clock):
+    consumer = _Consumer()
+    for _ in range(3):
+        with pytest.raises(ValueError):
+            await _consume(subscriber, _message(consumer, offset=7), True)
+    clock.elapse()
+    await asyncio.gather(*subscriber._resumes)
+
+    assert clock.delays == [1, 2, 4]
+
+
+async def test_a_revoked_partition_is_not_resumed(subscriber, clock):
+    consumer = _Consumer(revoked=True)
+    with pytest.raises(ValueError):
+        await _consume(subscriber, _message(consumer), True)
+
+    clock.elapse()
+    await asyncio.gather(*subscriber._resumes)
+    assert consumer.calls == [("pause", [("t", 0)])]
+    assert not subscriber._resumes
+
+
+async def test_without_a_confluent_consumer_it_sleeps(subscriber, clock):
+    message = _message(None)
+    message.consumer = SimpleNamespace()
+    clock.elapse()
+
+    with pytest.raises(ValueError):
+        await _consume(subscriber, message, True)
+    assert clock.delays == [1]
+    assert not subscriber._resumes
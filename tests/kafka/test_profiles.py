@@ -0,0 +1,79 @@
+import pytest
+from pydantic import ValidationError
+
+from fastloom.signals.kafka.depends import KafkaSubscriber
+from fastloom.signals.kafka.profiles import (
+    MAX_REQUEST_SIZE,
+    PROFILES,
+    KafkaTuning,
+    resolve_tuning,
+)
+from fastloom.signals.kafka.settings import KafkaSettings, KafkaSubscriptable
+
+
+def test_settings_pick_the_profile_and_override_single_knobs():
+    tuning = resolve_tuning(
+        "low_latency", "high_throughput", KafkaTuning(linger_ms=7)
+    )
+
+    assert tuning.linger_ms == 7
+    assert tuning.compression == PROFILES["high_throughput"].compression
+
+
+def test_no_profile_keeps_faststream_defaults():
+    assert resolve_tuning(None, None, KafkaTuning()).router_kwargs() == {}
+
+
+def test_router_kwargs_split_faststream_args_from_raw_config():
+    kwargs = PROFILES["balanced"].router_kwargs()
+
+    assert kwargs["linger_ms"] == 5
+    assert kwargs["compression_type"] == "lz4"
+    assert kwargs["config"] == {
+        "batch.size": 131_072,
+        "fetch.min.bytes": 1,
+        "fetch.wait.max.ms": 100,
+    }
+    assert "compression_type" not in PROFILES["low_latency"].router_kwargs()
+
+
+@pytest.mark.parametrize(
+    "knobs",
+    [
+        {"linger_ms": -1},
+        {"batch_size": 0},
+        {"batch_size": MAX_REQUEST_SIZE + 1},
+        {"fetch_max_wait_ms": 300_001},
+    ],
+)
+def test_tuning_rejects_values_librdkafka_would(knobs):
+    with pytest.raises(ValueError):
+        KafkaTuning(**knobs)
+
+
+def test_settings_validate_the_knobs():
+    with pytest.raises(ValidationError):
+        KafkaSettings(KAFKA_URI="broker:9092", KAFKA_PROFILE="fastest")
+    with pytest.raises(ValidationError):
+        KafkaSettings(KAFKA_URI="broker:9092", KAFKA_COMPRESSION="brotli")
+
+
+def test_subscriber_hands_the_tuning_to_confluent():
+    settings = KafkaSubscriptable(
+        ENVIRONMENT="test",
+        PROJECT_NAME="p",
+        KAFKA_URI="localhost:1",
+        KAFKA_FETCH_MIN_BYTES=1024,
+    )
+    try:
+        KafkaSubscriber(settings, tuning="high_throughput")
+        config = KafkaSubscriber.router.broker.config.broker_config
+        producer = config.connection_config.producer_config
+        consumer = config.connection_config.consumer_config
+    finally:
+        KafkaSubscriber.unbind()
+
+    assert producer["linger.ms"] == 50
+    assert producer["compression.type"] == "zstd"
+    assert producer["batch.size"] == MAX_REQUEST_SIZE
+    assert consumer["fetch.min.bytes"] == 1024
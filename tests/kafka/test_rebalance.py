@@ -0,0 +1,179 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from confluent_kafka import TopicPartition
+
+from fastloom.signals.kafka.depends import KafkaSubscriber
+from fastloom.signals.kafka.ordered import KeyOrderedDispatcher
+from fastloom.signals.kafka.rebalance import RebalanceListener
+from fastloom.signals.kafka.settings import KafkaSubscriptable
+
+
+class _Consumer:
+    def __init__(self, positions=None):
+        self.positions = positions or {}
+        self.commits: list[tuple[str, int, int]] = []
+
+    def position(self, partitions):
+        return [
+            TopicPartition(
+                tp.topic, tp.partition, self.positions.get(tp.partition, -1001)
+            )
+            for tp in partitions
+        ]
+
+    def commit(self, offsets, asynchronous):
+        self.commits += [(o.topic, o.partition, o.offset) for o in offsets]
+
+
+class _Hook:
+    def __init__(self, offsets):
+        self.offsets = offsets
+        self.lost: list[tuple[str, int]] = []
+
+    async def revoke(self, partitions, timeout):
+        await asyncio.sleep(0)
+        return [
+            TopicPartition(*p, self.offsets[p])
+            for p in partitions
+            if p in self.offsets
+        ]
+
+    def lose(self, partitions):
+        self.lost += partitions
+
+
+def _message(consumer, offset, partition=0):
+    record = SimpleNamespace(
+        topic=lambda: "t",
+        partition=lambda: partition,
+        offset=lambda: offset,
+        key=lambda: b"",
+    )
+    return SimpleNamespace(
+        raw_message=record, consumer=SimpleNamespace(consumer=consumer)
+    )
+
+
+async def test_revoking_commits_positions_and_the_hooks_offsets():
+    hook = _Hook({("t", 1): 7})
+    revoked = []
+    listener = RebalanceListener(
+        "t",
+        timeout=1,
+        commit_positions=True,
+        hooks=[hook],
+        on_revoke=lambda consumer, partitions: revoked.extend(partitions),
+    )
+    listener.loop = asyncio.get_running_loop()
+    consumer = _Consumer({0: 42})
+    partitions = [TopicPartition("t", 0), TopicPartition("t", 1)]
+
+    # on the consumer's thread, as inside its poll
+    await asyncio.to_thread(listener.on_revoke, consumer, partitions)
+
+    # a partition with no position yet commits only the hook's offset
+    assert consumer.commits == [("t", 0, 42), ("t", 1, 7)]
+    assert revoked == partitions
+
+
+async def test_lost_partitions_are_only_forgotten():
+    hook = _Hook({})
+    listener = RebalanceListener("t", 1, commit_positions=True, hooks=[hook])
+    listener.loop = asyncio.get_running_loop()
+    consumer = _Consumer({0: 42})
+
+    await asyncio.to_thread(
+        listener.on_lost, consumer, [TopicPartition("t", 0)]
+    )
+    await asyncio.sleep(0)
+
+    assert consumer.commits == []
+    assert hook.lost == [("t", 0)]
+
+
+async def test_an_ordered_revoke_waits_for_the_records_in_flight():
+    consumer, release = _Consumer(), asyncio.Event()
+    dispatcher = KeyOrderedDispatcher(8, 0, 0, name="t")
+    current = {}
+
+    async def handler():
+        await release.wait()
+
+    handled = dispatcher.wrap(handler, lambda: current["message"])
+    for offset in (0, 1):
+        current["message"] = _message(consumer, offset)
+        await handled()
+
+    revoking = asyncio.create_task(dispatcher.revoke([("t", 0)], 1))
+    await asyncio.sleep(0)
+    assert not revoking.done()
+    release.set()
+    offsets = await revoking
+
+    assert [(o.topic, o.partition, o.offset) for o in offsets] == [("t", 0, 2)]
+    # nothing left to commit for a partition that's gone
+    assert await dispatcher.revoke([("t", 0)], 1) == []
+
+
+@pytest.fixture
+def static_subscriber(monkeypatch):
+    KafkaSubscriber(
+        KafkaSubscriptable(
+            ENVIRONMENT="test",
+            PROJECT_NAME="p",
+            KAFKA_URI="localhost:1",
+            KAFKA_STATIC_MEMBERSHIP=True,
+            KAFKA_INSTANCE_ID="pod",
+            KAFKA_ASSIGNOR="cooperative-sticky",
+        )
+    )
+    calls: list[dict] = []
+    subscribe = KafkaSubscriber._router_subscriber
+
+    def spy(*topics, **kwargs):
+        calls.append(kwargs)
+        return subscribe(*topics, **kwargs)
+
+    monkeypatch.setattr(KafkaSubscriber.self, "_router_subscriber", spy)
+    yield calls
+    KafkaSubscriber.unbind()
+
+
+def test_subscriptions_join_their_group_as_static_members(static_subscriber):
+    KafkaSubscriber.router.subscriber("a", group_id="g")
+    KafkaSubscriber.router.subscriber("b", group_id="g")
+    KafkaSubscriber.subscriber("c", group_id="h")
+
+    first, second, other = static_subscriber
+    assert first["group_instance_id"].startswith("pod-")
+    assert second["group_instance_id"] == f"{first['group_instance_id']}-1"
+    assert other["group_instance_id"] == first["group_instance_id"]
+    assert first["partition_assignment_strategy"] == "cooperative-sticky"
+    assert first["session_timeout_ms"] == 45_000
+
+
+def test_a_table_stays_a_dynamic_member(static_subscriber):
+    KafkaSubscriber.table("customers", dict)
+
+    (table,) = static_subscriber
+    assert table["group_instance_id"] is None
+
+
+def test_concurrent_workers_dont_commit_the_position(
+    static_subscriber, monkeypatch
+):
+    listeners = []
+
+    def listener(*args, **kwargs):
+        listeners.append(kwargs)
+        return RebalanceListener(*args, **kwargs)
+
+    monkeypatch.setattr(
+        "fastloom.signals.kafka.rebalance.RebalanceListener", listener
+    )
+    KafkaSubscriber.router.subscriber("a", group_id="g")
+    KafkaSubscriber.router.subscriber("b", group_id="g", max_workers=4)
+
+    assert [kw["commit_positions"] for kw in listeners] == [True, False]
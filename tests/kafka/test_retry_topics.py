@@ -0,0 +1,196 @@
+import time
+from types import SimpleNamespace
+
+import pytest
+from faststream.confluent import TestKafkaBroker
+
+from fastloom.signals.kafka.depends import (
+    RETRY_ATTEMPT_HEADER,
+    RETRY_DUE_HEADER,
+    RETRY_ORIGIN_HEADER,
+    KafkaSubscriber,
+)
+from fastloom.signals.kafka.settings import KafkaSubscriptable
+
+
+@pytest.fixture
+def slept(monkeypatch):
+    slept: list[float] = []
+
+    async def fake_sleep(delay):
+        slept.append(delay)
+
+    monkeypatch.setattr("asyncio.sleep", fake_sleep)
+    return slept
+
+
+@pytest.fixture
+def subscriber(slept):
+    settings = KafkaSubscriptable(
+        ENVIRONMENT="test", PROJECT_NAME="p", KAFKA_URI="localhost:1"
+    )
+    sub = KafkaSubscriber(settings, base_delay=1, max_delay=2, retry="topics")
+    yield sub
+    KafkaSubscriber.unbind()
+
+
+def _register(failures: int):
+    seen: list[tuple[str, dict]] = []
+    router = KafkaSubscriber.router
+
+    @KafkaSubscriber.retry_subscriber("orders", group_id="g")
+    @router.subscriber("orders", group_id="g")
+    async def handler(body: dict):
+        message = router.broker.context.get_local("message")
+        seen.append((message.raw_message.topic(), message.headers))
+        if len(seen) <= failures:
+            raise ValueError("boom")
+
+    dead: list[dict] = []
+
+    @router.subscriber("orders.dlq", group_id="ops")
+    async def dead_letters(body: dict):
+        dead.append(router.broker.context.get_local("message").headers)
+
+    return seen, dead
+
+
+async def test_a_failed_record_is_retried_through_the_tier_topics(
+    subscriber, slept
+):
+    seen, dead = _register(failures=2)
+
+    async with TestKafkaBroker(KafkaSubscriber.router.broker) as broker:
+        await broker.publish({"id": 1}, "orders", key=b"k")
+
+    assert [topic for topic, _ in seen] == [
+        "orders",
+        "orders.retry.1",
+        "orders.retry.2",
+    ]
+    retried = seen[-1][1]
+    assert retried[RETRY_ATTEMPT_HEADER] == "2"
+    assert retried[RETRY_ORIGIN_HEADER] == "orders"
+    assert len(slept) == 2 and all(0 < delay <= 2 for delay in slept)
+    assert dead == []
+
+
+async def test_exhausted_tiers_end_in_the_dead_letter_topic(subscriber):
+    seen, dead = _register(failures=10)
+
+    async with TestKafkaBroker(KafkaSubscriber.router.broker) as broker:
+        await broker.publish({"id": 1}, "orders")
+
+    assert len(seen) == 3
+    (headers,) = dead
+    assert headers[RETRY_ATTEMPT_HEADER] == "3"
+    assert RETRY_DUE_HEADER not in headers
+
+
+async def test_a_failed_forward_falls_back_to_backing_off(
+    subscriber, slept, monkeypatch
+):
+    async def unavailable(message, exc):
+        raise ConnectionError
+
+    monkeypatch.setattr(subscriber, "_forward", unavailable)
+    seen, _ = _register(failures=1)
+
+    async with TestKafkaBroker(KafkaSubscriber.router.broker) as broker:
+        with pytest.raises(ValueError):
+            await broker.publish({"id": 1}, "orders")
+
+    assert len(seen) == 1
+    assert len(slept) == 1
+
+
+def test_retry_subscriber_needs_retry_topics():
+    settings = KafkaSubscriptable(
+        ENVIRONMENT="test", PROJECT_NAME="p", KAFKA_URI="localhost:1"
+    )
+    try:
+        KafkaSubscriber(settings)
+        with pytest.raises(ValueError):
+            KafkaSubscriber.retry_subscriber("orders", group_id="g")
+    finally:
+        KafkaSubscriber.unbind()
+
+
+class _Consumer:
+    def __init__(self):
+        self.calls: list[tuple[str, object]] = []
+
+    def pause(self, partitions):
+        self.calls.append(("pause", [tp.partition for tp in partitions]))
+
+
+def _record(headers, topic="orders.retry.2", offset=5):
+    return SimpleNamespace(
+        topic=lambda: topic,
+        partition=lambda: 0,
+        offset=lambda: offset,
+        key=lambda: b"k",
+        value=lambda: b"{}",
+        headers=lambda: headers,
+    )
+
+
+async def test_a_record_not_yet_due_is_handed_back(subscriber, slept):
+    consumer = _Consumer()
+
+    async def nack():
+        consumer.calls.append(("nack", 5))
+
+    message = SimpleNamespace(
+        raw_message=_record([]),
+        headers={RETRY_DUE_HEADER: str(int((time.time() + 60) * 1000))},
+        is_manual=True,
+        consumer=SimpleNamespace(consumer=consumer),
+        nack=nack,
+    )
+    (factory,) = [
+        m
+        for m in subscriber.router.broker.middlewares
+        if m.__name__ == "_RetryMiddleware"
+    ]
+    handled = []
+
+    async def handler(msg):
+        handled.append(msg)
+
+    await factory(None, context=None).consume_scope(handler, message)
+
+    assert handled == []
+    assert consumer.calls == [("pause", [0]), ("nack", 5)]
+    # the partition is resumed once the record is due, not slept on
+    assert not slept
+    (resume,) = subscriber._resumes
+    resume.cancel()
+
+
+async def test_forwarded_headers_keep_their_bytes(subscriber, monkeypatch):
+    published = []
+
+    async def publish(value, topic, key, headers):
+        published.append((topic, headers))
+
+    monkeypatch.setattr(subscriber.router.broker, "publish", publish)
+    record = _record(
+        [
+            ("trace", b"\xff\x00"),
+            ("tenant", b"acme"),
+            ("empty", None),
+            (RETRY_ORIGIN_HEADER, b"orders"),
+            (RETRY_ATTEMPT_HEADER, b"1"),
+        ]
+    )
+
+    await subscriber._forward(
+        SimpleNamespace(raw_message=record), ValueError("boom")
+    )
+
+    ((topic, headers),) = published
+    assert topic == "orders.retry.2"
+    assert headers["trace"] == b"\xff\x00"
+    assert headers["tenant"] == "acme"
+    assert "empty" not in headers
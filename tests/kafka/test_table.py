@@ -0,0 +1,147 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from confluent_kafka import OFFSET_BEGINNING, TopicPartition
+from faststream.confluent import TestKafkaBroker
+from pydantic import BaseModel
+
+from fastloom.signals.kafka.depends import KafkaSubscriber
+from fastloom.signals.kafka.settings import KafkaSubscriptable
+from fastloom.signals.kafka.table import (
+    KafkaTable,
+    MemoryTableStore,
+    SqliteTableStore,
+)
+
+
+class Customer(BaseModel):
+    name: str
+
+
+class _Consumer:
+    def __init__(self, highs: dict[int, int], positions=None):
+        self.highs = highs
+        self.positions = positions or {}
+        self.assigned: list[tuple[int, int]] = []
+
+    def get_watermark_offsets(self, tp, timeout, cached):
+        return 0, self.highs[tp.partition]
+
+    def assign(self, partitions):
+        self.assigned = [(tp.partition, tp.offset) for tp in partitions]
+
+    def position(self, partitions):
+        return [
+            TopicPartition(
+                tp.topic, tp.partition, self.positions[tp.partition]
+            )
+            for tp in partitions
+        ]
+
+
+def _record(offset, key, value, partition=0):
+    return SimpleNamespace(
+        topic=lambda: "customers",
+        partition=lambda: partition,
+        offset=lambda: offset,
+        key=lambda: key,
+        value=lambda: value,
+    )
+
+
+def _assign(table, consumer, *partitions):
+    table.on_assign(
+        consumer, [TopicPartition("customers", p) for p in partitions]
+    )
+
+
+async def test_the_table_follows_the_topic():
+    KafkaSubscriber(
+        KafkaSubscriptable(
+            ENVIRONMENT="test", PROJECT_NAME="p", KAFKA_URI="localhost:1"
+        )
+    )
+    try:
+        customers = KafkaSubscriber.table("customers", Customer)
+        async with TestKafkaBroker(KafkaSubscriber.router.broker) as broker:
+            for key, value in [
+                (b"1", {"name": "ada"}),
+                (b"2", {"name": "bob"}),
+                (b"1", {"name": "ada lovelace"}),
+                (b"2", None),
+                (b"1", {"nome": "typo"}),
+            ]:
+                await broker.publish(value, "customers", key=key)
+    finally:
+        KafkaSubscriber.unbind()
+
+    assert customers.get("1") == Customer(name="ada lovelace")
+    assert b"2" not in customers
+    assert len(customers) == 1
+
+
+async def test_ready_once_every_partition_reached_its_snapshot():
+    table = KafkaTable("customers", Customer, MemoryTableStore())
+    consumer = _Consumer({0: 2, 1: 0})
+
+    _assign(table, consumer, 0, 1)
+    assert consumer.assigned == [(0, OFFSET_BEGINNING), (1, OFFSET_BEGINNING)]
+
+    table.apply(_record(0, b"1", b'{"name": "ada"}'))
+    assert not table.is_ready
+    table.apply(_record(1, b"2", b'{"name": "bob"}'))
+    await asyncio.wait_for(table.ready(), 1)
+    assert len(table) == 2
+
+
+async def test_a_log_ending_in_transaction_markers_still_gets_ready():
+    table = KafkaTable(
+        "customers", Customer, MemoryTableStore(), catch_up_interval=0.01
+    )
+    table.open()
+    consumer = _Consumer({0: 3}, positions={0: 3})
+    _assign(table, consumer, 0)
+    await asyncio.sleep(0)
+
+    # offset 1 holds the record, offset 2 the commit marker
+    table.apply(_record(1, b"1", b'{"name": "ada"}'))
+    await asyncio.wait_for(table.ready(), 1)
+    await table.close()
+
+
+async def test_a_stored_table_resumes_where_it_left_off(tmp_path):
+    path = str(tmp_path / "customers.db")
+    table = KafkaTable("customers", Customer, SqliteTableStore(path))
+    table.open()
+    _assign(table, _Consumer({0: 2}), 0)
+    table.apply(_record(0, b"1", b'{"name": "ada"}'))
+    table.apply(_record(1, b"2", b'{"name": "bob"}'))
+    table.apply(_record(2, b"2", None))
+    await table.close()
+
+    reopened = KafkaTable("customers", Customer, SqliteTableStore(path))
+    reopened.open()
+    consumer = _Consumer({0: 3})
+    _assign(reopened, consumer, 0)
+    await asyncio.sleep(0)
+
+    assert consumer.assigned == [(0, 3)]
+    assert reopened.is_ready
+    assert reopened.get("1") == Customer(name="ada")
+    assert "2" not in reopened
+    await reopened.close()
+
+
+@pytest.mark.parametrize("kwargs", [{"batch": True}, {"group_id": "g"}])
+def test_the_table_owns_its_consumer(kwargs):
+    KafkaSubscriber(
+        KafkaSubscriptable(
+            ENVIRONMENT="test", PROJECT_NAME="p", KAFKA_URI="localhost:1"
+        )
+    )
+    try:
+        with pytest.raises(ValueError):
+            KafkaSubscriber.table("customers", Customer, **kwargs)
+    finally:
+        KafkaSubscriber.unbind()
@@ -0,0 +1,226 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from fastloom.signals.kafka.depends import TOMBSTONE, KafkaSubscriber
+from fastloom.signals.kafka.settings import KafkaSubscriptable
+from fastloom.signals.kafka.transactions import (
+    KafkaOutput,
+    TransactionPolicy,
+    Transactor,
+)
+
+
+class _Producer:
+    def __init__(self, fail_commit: bool = False):
+        self.calls: list[tuple] = []
+        self.fail_commit = fail_commit
+
+    def init_transactions(self, timeout):
+        self.calls.append(("init",))
+
+    def begin_transaction(self):
+        self.calls.append(("begin",))
+
+    def produce(self, topic, value, key, headers):
+        self.calls.append(("produce", topic, value, key, dict(headers)))
+
+    def send_offsets_to_transaction(self, offsets, metadata, timeout):
+        offsets = [(o.topic, o.partition, o.offset) for o in offsets]
+        self.calls.append(("offsets", offsets, metadata))
+
+    def commit_transaction(self, timeout):
+        if self.fail_commit:
+            raise RuntimeError("coordinator unavailable")
+        self.calls.append(("commit",))
+
+    def abort_transaction(self, timeout):
+        self.calls.append(("abort",))
+
+    def flush(self, timeout):
+        pass
+
+    def kinds(self):
+        return [call[0] for call in self.calls]
+
+
+class _Consumer:
+    def __init__(self):
+        self.consumer = SimpleNamespace(
+            consumer_group_metadata=lambda: "g", seek=self._seek
+        )
+        self.seeks: list[tuple[str, int, int]] = []
+        # FastStream's consumer thread, blocked while on_revoke runs
+        self.thread = asyncio.Event()
+        self.thread.set()
+
+    async def seek(self, topic, partition, offset):
+        await self.thread.wait()
+        self.seeks.append((topic, partition, offset))
+
+    def _seek(self, partition):
+        self.seeks.append(
+            (partition.topic, partition.partition, partition.offset)
+        )
+
+
+def _message(consumer, offset, partition=0):
+    record = SimpleNamespace(
+        topic=lambda: "in",
+        partition=lambda: partition,
+        offset=lambda: offset,
+    )
+    return SimpleNamespace(raw_message=record, consumer=consumer)
+
+
+def _transactor(producer, **policy):
+    return Transactor(
+        TransactionPolicy(**policy),
+        config=dict,
+        name="t",
+        producer_factory=lambda _config: producer,
+    )
+
+
+async def _feed(transactor, handler, messages):
+    current = {}
+    handled = transactor.wrap(handler, lambda: current["message"])
+    for message in messages:
+        current["message"] = message
+        await handled(message.raw_message.offset())
+
+
+async def _derive(offset):
+    return KafkaOutput("out", {"offset": offset}, key=str(offset))
+
+
+async def test_outputs_and_offsets_commit_together():
+    producer, consumer = _Producer(), _Consumer()
+    transactor = _transactor(producer, max_records=2, commit_interval=10)
+
+    await _feed(
+        transactor,
+        _derive,
+        [_message(consumer, 4), _message(consumer, 7, partition=1)],
+    )
+
+    assert producer.kinds() == [
+        "init",
+        "begin",
+        "produce",
+        "produce",
+        "offsets",
+        "commit",
+    ]
+    _, offsets, metadata = producer.calls[4]
+    assert offsets == [("in", 0, 5), ("in", 1, 8)]
+    assert metadata == "g"
+    _, topic, value, key, headers = producer.calls[2]
+    assert (topic, json.loads(value), key) == ("out", {"offset": 4}, b"4")
+    assert headers["content-type"] == "application/json"
+    await transactor.close()
+
+
+async def test_an_open_transaction_commits_after_the_interval():
+    producer, consumer = _Producer(), _Consumer()
+    transactor = _transactor(producer, commit_interval=0.01)
+
+    await _feed(transactor, _derive, [_message(consumer, 0)])
+    assert "commit" not in producer.kinds()
+
+    await asyncio.sleep(0.05)
+    assert producer.kinds()[-1] == "commit"
+    await transactor.close()
+
+
+async def test_a_handler_error_aborts_and_rewinds_the_transaction():
+    producer, consumer = _Producer(), _Consumer()
+    transactor = _transactor(producer, max_records=10, commit_interval=10)
+
+    async def handler(offset):
+        if offset == 2:
+            raise ValueError("boom")
+        return await _derive(offset)
+
+    with pytest.raises(ValueError):
+        await _feed(
+            transactor, handler, [_message(consumer, o) for o in (1, 2)]
+        )
+    assert producer.kinds()[-1] == "abort"
+    assert consumer.seeks == [("in", 0, 1)]
+
+    # offset 3 was polled before the seek and comes again after 1 and 2
+    await _feed(transactor, _derive, [_message(consumer, 3)])
+    assert producer.kinds()[-1] == "abort"
+    await _feed(transactor, _derive, [_message(consumer, 1)])
+    assert producer.kinds()[-2:] == ["begin", "produce"]
+    await transactor.close()
+
+
+async def test_a_failed_commit_aborts_and_rewinds():
+    producer, consumer = _Producer(fail_commit=True), _Consumer()
+    transactor = _transactor(producer, max_records=1)
+
+    await _feed(transactor, _derive, [_message(consumer, 9)])
+
+    assert producer.kinds()[-1] == "abort"
+    assert consumer.seeks == [("in", 0, 9)]
+
+
+async def test_tombstones_produce_a_null_value():
+    producer, consumer = _Producer(), _Consumer()
+    transactor = _transactor(producer, max_records=1)
+
+    async def delete(offset):
+        return [KafkaOutput("out", TOMBSTONE, key=b"k")]
+
+    await _feed(transactor, delete, [_message(consumer, 0)])
+
+    (produced,) = [call for call in producer.calls if call[0] == "produce"]
+    assert produced[2] is None
+
+
+def test_transactional_subscriber_needs_its_own_offsets():
+    settings = KafkaSubscriptable(
+        ENVIRONMENT="test", PROJECT_NAME="p", KAFKA_URI="localhost:1"
+    )
+    try:
+        KafkaSubscriber(settings, retry="topics")
+        with pytest.raises(ValueError):
+            KafkaSubscriber.transactional_subscriber("in", group_id="g")
+        KafkaSubscriber.unbind()
+
+        KafkaSubscriber(settings)
+        with pytest.raises(ValueError):
+            KafkaSubscriber.transactional_subscriber(
+                "in", group_id="g", max_workers=4
+            )
+    finally:
+        KafkaSubscriber.unbind()
+
+
+def test_policy_rejects_an_interval_past_the_timeout():
+    with pytest.raises(ValueError):
+        TransactionPolicy(commit_interval=90, timeout=60)
+
+
+async def test_a_revoke_commits_the_open_transaction():
+    producer, consumer = _Producer(fail_commit=True), _Consumer()
+    transactor = _transactor(producer, commit_interval=10)
+
+    await _feed(
+        transactor,
+        _derive,
+        [_message(consumer, 3), _message(consumer, 5, partition=1)],
+    )
+    consumer.thread.clear()
+    async with asyncio.timeout(1):
+        assert await transactor.revoke([("in", 0)], 1) == []
+
+    # the commit failed - only the partition still owned is rewound, off
+    # the consumer thread
+    assert producer.kinds()[-1] == "abort"
+    assert consumer.seeks == [("in", 1, 5)]
+    await transactor.close()
@@ -0,0 +1,130 @@
+import asyncio
+from contextlib import suppress
+from types import SimpleNamespace
+
+import pytest
+
+from fastloom.signals.rabbit.adaptive import (
+    AdaptiveConcurrency,
+    AdaptiveLimit,
+)
+from fastloom.signals.rabbit.depends import (
+    RabbitSubscriber,
+    RabbitSubscriptable,
+)
+
+
+class _FakeChannel:
+    def __init__(self):
+        self.is_closed = False
+        self.qos: list[tuple[int, bool]] = []
+
+    async def set_qos(self, prefetch_count, global_):
+        self.qos.append((prefetch_count, global_))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(
+        "fastloom.signals.rabbit.adaptive.time.monotonic", lambda: clock.now
+    )
+    return clock
+
+
+async def _window(controller, latency, clock, failing=0):
+    async def call(index):
+        async with controller.slot():
+            clock.now += latency
+            if index < failing:
+                raise ValueError
+
+    for index in range(controller.config.window):
+        with suppress(ValueError):
+            await call(index)
+    await asyncio.sleep(0)  # let the qos update go out
+
+
+async def test_healthy_saturated_window_grows_the_limit(clock):
+    controller = AdaptiveConcurrency(
+        AdaptiveLimit(min_limit=1, max_limit=4, window=5), "orders"
+    )
+    controller.watch_channel(lambda: channel)
+    channel = _FakeChannel()
+
+    await _window(controller, latency=0.1, clock=clock)
+
+    assert controller.limit == controller.prefetch == 2
+    assert channel.qos == [(2, True)]
+
+
+async def test_slow_or_failing_windows_cut_the_limit(clock):
+    controller = AdaptiveConcurrency(
+        AdaptiveLimit(min_limit=2, max_limit=16, initial=12, window=5),
+        "orders",
+    )
+
+    await _window(controller, latency=2, clock=clock)
+    assert controller.limit == 6
+
+    await _window(controller, latency=0.1, clock=clock, failing=1)
+    assert controller.limit == 3
+
+    await _window(controller, latency=2, clock=clock)
+    assert controller.limit == 2  # min_limit
+
+
+async def test_unsaturated_window_keeps_the_limit(clock):
+    controller = AdaptiveConcurrency(
+        AdaptiveLimit(min_limit=1, max_limit=4, initial=3, window=5), "orders"
+    )
+
+    await _window(controller, latency=0.1, clock=clock)
+
+    assert controller.limit == 3
+
+
+async def test_the_gate_holds_calls_beyond_the_limit():
+    controller = AdaptiveConcurrency(AdaptiveLimit(max_limit=2), "orders")
+    release = asyncio.Event()
+    peak = 0
+
+    async def handler():
+        nonlocal peak
+        async with controller.slot():
+            peak = max(peak, controller.in_flight)
+            await release.wait()
+
+    tasks = [asyncio.create_task(handler()) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(*tasks)
+
+    assert peak == 1
+
+
+def test_adaptive_subscribers_get_a_dedicated_global_qos_channel():
+    try:
+        RabbitSubscriber(
+            RabbitSubscriptable(
+                ENVIRONMENT="test",
+                PROJECT_NAME="p",
+                RABBIT_URI="amqp://localhost",
+            )
+        )
+
+        @RabbitSubscriber.subscriber(
+            "orders", adaptive=AdaptiveLimit(initial=4)
+        )
+        async def handler(body: dict): ...
+
+        (subscriber,) = RabbitSubscriber.router.broker.subscribers
+        assert subscriber.channel.prefetch_count == 4
+        assert subscriber.channel.global_qos
+
+        with pytest.raises(ValueError):
+            RabbitSubscriber.subscriber(
+                "orders", batch_size=10, adaptive=AdaptiveLimit()
+            )
+    finally:
+        RabbitSubscriber.unbind()
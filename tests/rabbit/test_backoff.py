@@ -13,6 +13,9 @@ def _fake_message(routing_key: str, delivery_count: int = 0):
     return SimpleNamespace(
         headers=headers,
         body=b"payload",
+        message_id="m-1",
+        correlation_id="c-1",
+        content_type="application/json",
         raw_message=SimpleNamespace(routing_key=routing_key),
     )
 
@@ -24,20 +27,29 @@ def subscriber(monkeypatch):
     async def fake_get_ensured_dlx_queue(cls, routing_key, delay):
         return SimpleNamespace(name=f"{routing_key}.{delay}")
 
-    async def fake_publish(message, **kwargs):
-        published.append({"expiration": message.expiration, **kwargs})
+    async def fake_publish_retry(cls, message, queue):
+        published.append(
+            {
+                "expiration": message.expiration,
+                "queue": queue,
+                "message_id": message.message_id,
+            }
+        )
+        return True
 
     monkeypatch.setattr(
         RabbitSubscriber,
         "_get_ensured_dlx_queue",
         classmethod(fake_get_ensured_dlx_queue),
     )
+    monkeypatch.setattr(
+        RabbitSubscriber, "_publish_retry", classmethod(fake_publish_retry)
+    )
 
     settings = RabbitSubscriptable(
         ENVIRONMENT="test", PROJECT_NAME="p", RABBIT_URI="amqp://localhost"
     )
     sub = RabbitSubscriber(settings, base_delay=1, max_delay=8)
-    monkeypatch.setattr(sub.router.broker, "publish", fake_publish)
     sub.published = published  # type: ignore[attr-defined]
     yield sub
     RabbitSubscriber.unbind()
@@ -54,3 +66,9 @@ async def test_expiration_reflects_the_backoff_delay(subscriber, monkeypatch):
     await _fail(subscriber, delivery_count=3)  # attempt 4 -> delay = 8 (cap)
 
     assert subscriber.published[-1]["expiration"] == 8
+
+
+async def test_retries_keep_the_message_id(subscriber):
+    await _fail(subscriber)
+
+    assert subscriber.published[-1]["message_id"] == "m-1"
@@ -0,0 +1,116 @@
+from types import SimpleNamespace
+
+import pytest
+
+from fastloom.signals.rabbit.depends import (
+    RabbitSubscriber,
+    RabbitSubscriptable,
+)
+
+
+def _settings(**kwargs):
+    return RabbitSubscriptable(
+        ENVIRONMENT="test",
+        PROJECT_NAME="p",
+        RABBIT_URI="amqp://localhost",
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def subscriber(monkeypatch):
+    declared: list[tuple[str, int, bool]] = []
+    clock = SimpleNamespace(now=1000.0)
+
+    async def fake_get_dlx_queue(cls, routing_key, delay, fallback=False):
+        declared.append((routing_key, delay, fallback))
+        return SimpleNamespace(
+            arguments={
+                "x-message-ttl": delay * 1000,
+                "x-expires": delay * 2000,
+            },
+        )
+
+    monkeypatch.setattr(
+        RabbitSubscriber, "_get_dlx_queue", classmethod(fake_get_dlx_queue)
+    )
+    monkeypatch.setattr(
+        "fastloom.signals.rabbit.depends.time.monotonic", lambda: clock.now
+    )
+    sub = RabbitSubscriber(_settings(), base_delay=5, max_delay=30)
+    sub.declared = declared  # type: ignore[attr-defined]
+    sub.clock = clock  # type: ignore[attr-defined]
+    yield sub
+    RabbitSubscriber.unbind()
+
+
+def test_ladder_doubles_up_to_max_delay(subscriber):
+    assert subscriber._backoff_ladder() == [5, 10, 20, 30]
+
+
+async def test_ladder_covers_every_retry_backoff_routing_key(subscriber):
+    @RabbitSubscriber.subscriber("a", retry_backoff=True)
+    @RabbitSubscriber.subscriber("b", retry_backoff=True)
+    @RabbitSubscriber.subscriber("c")
+    async def handler(body: dict): ...
+
+    await RabbitSubscriber.declare_backoff_ladder()
+
+    assert sorted(subscriber.declared) == sorted(
+        (key, delay, fallback)
+        for key in "ab"
+        for delay in (5, 10, 20, 30)
+        for fallback in (False, True)
+    )
+
+
+async def test_ladder_skips_wildcard_routing_keys(subscriber):
+    @RabbitSubscriber.subscriber("orders.*", retry_backoff=True)
+    @RabbitSubscriber.subscriber("#", retry_backoff=True)
+    @RabbitSubscriber.subscriber("orders.created", retry_backoff=True)
+    async def handler(body: dict): ...
+
+    await RabbitSubscriber.declare_backoff_ladder()
+
+    assert sorted(subscriber.declared) == sorted(
+        ("orders.created", delay, fallback)
+        for delay in (5, 10, 20, 30)
+        for fallback in (False, True)
+    )
+    # the wildcard subscribers still consume their retries
+    queues = {s.queue.routing() for s in subscriber.router.broker.subscribers}
+    assert {"orders.*.p", "#.p"} <= queues
+
+
+async def test_refresh_only_redeclares_rungs_about_to_lapse(subscriber):
+    @RabbitSubscriber.subscriber("a", retry_backoff=True)
+    async def handler(body: dict): ...
+
+    await RabbitSubscriber.declare_backoff_ladder()
+    subscriber.declared.clear()
+
+    subscriber.clock.now += 5  # one refresher tick
+    await RabbitSubscriber.declare_backoff_ladder(horizon=5)
+
+    # 5s rung lapsed, 10s rung lapses within the next tick
+    assert sorted(subscriber.declared) == [
+        ("a", 5, False),
+        ("a", 5, True),
+        ("a", 10, False),
+        ("a", 10, True),
+    ]
+
+
+async def test_predeclare_setting_hooks_into_router_lifespan():
+    try:
+        sub = RabbitSubscriber(_settings(RABBIT_PREDECLARE_BACKOFF=True))
+        assert len(sub.router._after_startup_hooks) == 1
+        assert len(sub.router._on_shutdown_hooks) == 2  # + pool teardown
+    finally:
+        RabbitSubscriber.unbind()
+
+    try:
+        sub = RabbitSubscriber(_settings())
+        assert sub.router._after_startup_hooks == []
+    finally:
+        RabbitSubscriber.unbind()
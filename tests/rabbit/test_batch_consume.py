@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from faststream.rabbit import RabbitMessage, TestRabbitBroker
+from pydantic import BaseModel
+
+from fastloom.signals.rabbit.batch import PartialBatchFailure
+from fastloom.signals.rabbit.depends import (
+    RabbitSubscriber,
+    RabbitSubscriptable,
+)
+
+
+class _Order(BaseModel):
+    id: int
+
+
+@pytest.fixture
+def subscriber(monkeypatch):
+    retried: list[bytes] = []
+
+    async def fake_exc_handler(cls, exc: Exception, message: RabbitMessage):
+        retried.append(message.body)
+        raise exc
+
+    monkeypatch.setattr(
+        RabbitSubscriber, "_exc_handler", classmethod(fake_exc_handler)
+    )
+    settings = RabbitSubscriptable(
+        ENVIRONMENT="test", PROJECT_NAME="p", RABBIT_URI="amqp://localhost"
+    )
+    sub = RabbitSubscriber(settings)
+    sub.retried = retried  # type: ignore[attr-defined]
+    yield sub
+    RabbitSubscriber.unbind()
+
+
+async def _publish(*orders: _Order) -> None:
+    await asyncio.gather(
+        *(
+            RabbitSubscriber.router.broker.publish(
+                order, "orders", exchange=RabbitSubscriber.exchange
+            )
+            for order in orders
+        ),
+        return_exceptions=True,
+    )
+
+
+async def test_handler_receives_typed_batches(subscriber):
+    batches: list[list[_Order]] = []
+
+    @RabbitSubscriber.subscriber("orders", batch_size=2)
+    async def handler(orders: list[_Order]):
+        batches.append(orders)
+
+    async with TestRabbitBroker(RabbitSubscriber.router.broker):
+        await _publish(*(_Order(id=i) for i in range(3)))
+
+    assert [[order.id for order in batch] for batch in batches] == [
+        [0, 1],
+        [2],  # flushed by the timeout
+    ]
+
+
+async def test_only_failed_items_are_retried(subscriber):
+    @RabbitSubscriber.subscriber("orders", batch_size=3)
+    async def handler(orders: list[_Order]):
+        raise PartialBatchFailure({1: ValueError("bad order")})
+
+    async with TestRabbitBroker(RabbitSubscriber.router.broker):
+        await _publish(*(_Order(id=i) for i in range(3)))
+
+    assert subscriber.retried == [b'{"id":1}']
+
+
+async def test_a_failing_handler_retries_the_whole_batch(subscriber):
+    @RabbitSubscriber.subscriber("orders", batch_size=2)
+    async def handler(orders: list[_Order]):
+        raise ValueError("db down")
+
+    async with TestRabbitBroker(RabbitSubscriber.router.broker):
+        await _publish(_Order(id=0), _Order(id=1))
+
+    assert sorted(subscriber.retried) == [b'{"id":0}', b'{"id":1}']
+
+
+def test_batch_handlers_take_a_single_list(subscriber):
+    with pytest.raises(TypeError):
+
+        @RabbitSubscriber.subscriber("orders", batch_size=2)
+        async def handler(orders: list[_Order], extra: int): ...
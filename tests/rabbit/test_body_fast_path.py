@@ -0,0 +1,68 @@
+import pytest
+from fastapi import Depends
+from faststream.rabbit import TestRabbitBroker
+from pydantic import BaseModel
+
+from fastloom.signals.rabbit.depends import (
+    RabbitSubscriber,
+    RabbitSubscriptable,
+)
+
+
+class _Order(BaseModel):
+    id: int
+    sku: str
+
+
+@pytest.fixture
+def solved(monkeypatch):
+    """FastAPI dependency solving calls - the slow path"""
+    import faststream._internal.fastapi.route as route
+
+    calls: list[object] = []
+    original = route.solve_faststream_dependency
+
+    async def counting(**kwargs):
+        calls.append(kwargs["dependant"].call)
+        return await original(**kwargs)
+
+    monkeypatch.setattr(route, "solve_faststream_dependency", counting)
+    RabbitSubscriber(
+        RabbitSubscriptable(
+            ENVIRONMENT="test", PROJECT_NAME="p", RABBIT_URI="amqp://localhost"
+        )
+    )
+    yield calls
+    RabbitSubscriber.unbind()
+
+
+async def test_a_lone_model_body_skips_dependency_solving(solved):
+    received: list[_Order] = []
+
+    @RabbitSubscriber.subscriber("orders")
+    async def handler(order: _Order):
+        received.append(order)
+
+    async with TestRabbitBroker(RabbitSubscriber.router.broker) as broker:
+        await broker.publish(
+            {"id": 1, "sku": "a"}, "orders", exchange=RabbitSubscriber.exchange
+        )
+
+    assert received == [_Order(id=1, sku="a")]
+    assert solved == []
+
+
+async def test_handlers_with_dependencies_keep_the_full_path(solved):
+    received: list[int] = []
+
+    @RabbitSubscriber.subscriber("orders")
+    async def handler(order: _Order, tenant: int = Depends(lambda: 7)):
+        received.append(tenant)
+
+    async with TestRabbitBroker(RabbitSubscriber.router.broker) as broker:
+        await broker.publish(
+            {"id": 1, "sku": "a"}, "orders", exchange=RabbitSubscriber.exchange
+        )
+
+    assert received == [7]
+    assert len(solved) == 1
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from fastloom.signals.rabbit.pool import ChannelPool
+
+
+class _FakeChannel:
+    def __init__(self):
+        self.is_closed = False
+
+    async def close(self):
+        self.is_closed = True
+
+
+class _FakeConnection:
+    def __init__(self):
+        self.is_closed = False
+        self.opened: list[_FakeChannel] = []
+
+    async def channel(self):
+        self.opened.append(channel := _FakeChannel())
+        return channel
+
+
+@pytest.fixture
+def connection(monkeypatch):
+    connection = _FakeConnection()
+
+    async def connect_robust(uri):
+        return connection
+
+    monkeypatch.setattr("aio_pika.connect_robust", connect_robust)
+    return connection
+
+
+async def test_released_channels_are_reused(connection):
+    pool = ChannelPool("amqp://localhost", size=2)
+
+    for _ in range(3):
+        async with pool.acquire():
+            pass
+
+    assert len(connection.opened) == 1
+
+
+async def test_an_error_only_retires_its_own_channel(connection):
+    pool = ChannelPool("amqp://localhost", size=2)
+    healthy_released = asyncio.Event()
+
+    async def healthy():
+        async with pool.acquire() as channel:
+            await healthy_released.wait()
+        return channel
+
+    task = asyncio.create_task(healthy())
+    await asyncio.sleep(0)
+    with pytest.raises(RuntimeError):
+        async with pool.acquire() as broken:
+            raise RuntimeError("channel error")
+    healthy_released.set()
+    healthy_channel = await task
+
+    assert broken.is_closed
+    assert not healthy_channel.is_closed
+    async with pool.acquire() as channel:
+        assert channel is healthy_channel
+
+
+async def test_closed_idle_channels_are_skipped(connection):
+    pool = ChannelPool("amqp://localhost", size=1)
+    async with pool.acquire() as stale:
+        pass
+    stale.is_closed = True  # e.g. closed by the broker while idle
+
+    async with pool.acquire() as channel:
+        assert channel is not stale
+
+
+async def test_borrowers_beyond_size_wait_for_a_free_channel(connection):
+    pool = ChannelPool("amqp://localhost", size=1)
+    order: list[str] = []
+
+    async def borrow(name):
+        async with pool.acquire():
+            order.append(f"{name}-in")
+            await asyncio.sleep(0)
+            order.append(f"{name}-out")
+
+    await asyncio.gather(borrow("a"), borrow("b"))
+
+    assert order == ["a-in", "a-out", "b-in", "b-out"]
+    assert len(connection.opened) == 1
@@ -0,0 +1,127 @@
+import asyncio
+from contextlib import suppress
+
+import pytest
+
+from fastloom.signals.rabbit.adaptive import AdaptiveLimit
+from fastloom.signals.rabbit.breaker import (
+    BreakerPolicy,
+    CircuitBreaker,
+    CircuitState,
+)
+from fastloom.signals.rabbit.depends import (
+    RabbitSubscriber,
+    RabbitSubscriptable,
+)
+
+
+class _FakeChannel:
+    def __init__(self):
+        self.is_closed = False
+        self.qos: list[tuple[int, bool]] = []
+
+    async def set_qos(self, prefetch_count, global_):
+        self.qos.append((prefetch_count, global_))
+
+
+def _breaker(**policy):
+    policy = {"window": 4, "min_calls": 4, "open_for": 0.01} | policy
+    breaker = CircuitBreaker(BreakerPolicy(**policy), "orders")
+    channel = _FakeChannel()
+    breaker.watch_channel(lambda: channel)
+    return breaker, channel
+
+
+def _handler(outcomes: list[bool]):
+    calls: list[int] = []
+
+    async def handler():
+        calls.append(1)
+        if outcomes.pop(0):
+            raise ValueError
+
+    return handler, calls
+
+
+async def _call(guarded, times=1):
+    for _ in range(times):
+        with suppress(ValueError):
+            await guarded()
+    await asyncio.sleep(0)  # let the qos update go out
+
+
+async def test_failure_rate_past_the_threshold_opens_the_circuit():
+    breaker, channel = _breaker()
+    guarded = breaker.wrap(_handler([False, True, True, False])[0])
+
+    await _call(guarded, 3)
+    assert breaker.state is CircuitState.CLOSED  # below min_calls
+
+    await _call(guarded)
+    assert breaker.state is CircuitState.OPEN
+    assert channel.qos == [(1, True)]
+
+
+async def test_an_open_circuit_holds_calls_until_the_trial_succeeds():
+    breaker, channel = _breaker()
+    handler, calls = _handler([True] * 4 + [False] * 3)
+    guarded = breaker.wrap(handler)
+    await _call(guarded, 4)
+
+    held = [asyncio.create_task(guarded()) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert len(calls) == 4
+
+    await asyncio.wait_for(asyncio.gather(*held), 1)
+    assert breaker.state is CircuitState.CLOSED
+    assert len(calls) == 7
+    assert channel.qos == [(1, True), (10, True)]
+
+
+async def test_a_failed_trial_reopens_the_circuit():
+    breaker, channel = _breaker(open_for=60)
+    guarded = breaker.wrap(_handler([True] * 5)[0])
+    await _call(guarded, 4)
+
+    await breaker._half_open()
+    assert breaker.state is CircuitState.HALF_OPEN
+    await _call(guarded)
+
+    assert breaker.state is CircuitState.OPEN
+    assert channel.qos == [(1, True), (1, True)]
+
+
+def test_policy_rejects_inconsistent_thresholds():
+    with pytest.raises(ValueError):
+        BreakerPolicy(window=5, min_calls=10)
+    with pytest.raises(ValueError):
+        BreakerPolicy(failure_rate=0)
+
+
+def test_breaker_subscribers_get_a_dedicated_global_qos_channel():
+    try:
+        RabbitSubscriber(
+            RabbitSubscriptable(
+                ENVIRONMENT="test",
+                PROJECT_NAME="p",
+                RABBIT_URI="amqp://localhost",
+            )
+        )
+
+        @RabbitSubscriber.subscriber(
+            "orders", circuit_breaker=BreakerPolicy(prefetch=25)
+        )
+        async def handler(body: dict): ...
+
+        (subscriber,) = RabbitSubscriber.router.broker.subscribers
+        assert subscriber.channel.prefetch_count == 25
+        assert subscriber.channel.global_qos
+
+        with pytest.raises(ValueError):
+            RabbitSubscriber.subscriber(
+                "orders",
+                adaptive=AdaptiveLimit(),
+                circuit_breaker=BreakerPolicy(),
+            )
+    finally:
+        RabbitSubscriber.unbind()
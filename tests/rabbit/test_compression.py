@@ -0,0 +1,80 @@
+import gzip
+
+import pytest
+import zstandard
+from faststream.rabbit import TestRabbitBroker
+from pydantic import BaseModel
+
+from fastloom.signals.rabbit import compression as compression_module
+from fastloom.signals.rabbit.depends import (
+    RabbitSubscriber,
+    RabbitSubscriptable,
+)
+
+
+class _Document(BaseModel):
+    text: str
+
+
+@pytest.fixture
+def wire(monkeypatch):
+    wire: list[tuple[str, bytes]] = []
+    decompress = compression_module.decompress
+
+    def recording_decompress(body, content_encoding):
+        wire.append((content_encoding, body))
+        return decompress(body, content_encoding)
+
+    monkeypatch.setattr(compression_module, "decompress", recording_decompress)
+    settings = RabbitSubscriptable(
+        ENVIRONMENT="test",
+        PROJECT_NAME="p",
+        RABBIT_URI="amqp://localhost",
+        RABBIT_COMPRESSION_MIN_BYTES=100,
+    )
+    RabbitSubscriber(settings)
+    yield wire
+    RabbitSubscriber.unbind()
+
+
+@pytest.mark.parametrize(
+    ("compression", "unpack"),
+    [
+        ("zstd", zstandard.ZstdDecompressor().decompress),
+        ("gzip", gzip.decompress),
+    ],
+)
+async def test_large_bodies_are_compressed_and_transparently_decoded(
+    wire, compression, unpack
+):
+    publisher = RabbitSubscriber.publisher("docs", compression=compression)
+    received: list[_Document] = []
+
+    @RabbitSubscriber.subscriber("docs")
+    async def handler(document: _Document):
+        received.append(document)
+
+    document = _Document(text="x" * 1000)
+    async with TestRabbitBroker(RabbitSubscriber.router.broker):
+        await publisher.publish(document)
+
+    assert received == [document]
+    ((encoding, body),) = wire
+    assert encoding == compression
+    assert len(body) < 100
+    assert unpack(body) == document.model_dump_json().encode()
+
+
+async def test_small_bodies_are_sent_raw(wire):
+    publisher = RabbitSubscriber.publisher("docs", compression="zstd")
+    received: list[_Document] = []
+
+    @RabbitSubscriber.subscriber("docs")
+    async def handler(document: _Document):
+        received.append(document)
+
+    async with TestRabbitBroker(RabbitSubscriber.router.broker):
+        await publisher.publish(_Document(text="tiny"))
+
+    assert received == [_Document(text="tiny")]
+    assert wire == []
@@ -0,0 +1,153 @@
+from types import SimpleNamespace
+
+import pytest
+from faststream.rabbit import TestRabbitBroker
+
+from fastloom.cache.lifehooks import RedisHandler
+from fastloom.signals.rabbit.dedup import Deduplicator, DedupWindow
+from fastloom.signals.rabbit.depends import (
+    RabbitSubscriber,
+    RabbitSubscriptable,
+)
+
+
+class _MemoryRedis:
+    def __init__(self):
+        self.values: dict[str, int] = {}
+        self.lookups: list[str] = []
+
+    async def exists(self, key):
+        self.lookups.append(key)
+        return int(key in self.values)
+
+    def pipeline(self, transaction):
+        return _Pipeline(self)
+
+
+class _Pipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.pending: list[str] = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def set(self, key, value, ex):
+        self.pending.append(key)
+
+    async def execute(self):
+        self.redis.values |= dict.fromkeys(self.pending, 1)
+
+
+@pytest.fixture
+def redis():
+    redis = _MemoryRedis()
+    RedisHandler.bind(SimpleNamespace(redis=redis))
+    yield redis
+    RedisHandler.unbind()
+
+
+def _message(message_id, redelivered=False, **headers):
+    return SimpleNamespace(
+        message_id=message_id,
+        headers=headers,
+        raw_message=SimpleNamespace(redelivered=redelivered),
+    )
+
+
+def _counting(dedup: Deduplicator, message):
+    calls: list[int] = []
+
+    async def handler():
+        calls.append(1)
+
+    return dedup.wrap(handler, lambda: message), calls
+
+
+async def test_first_deliveries_skip_redis(redis):
+    dedup = Deduplicator(DedupWindow(), prefix="p:dedup:orders", name="o")
+    handled, calls = _counting(dedup, _message("a"))
+
+    await handled()
+    await dedup.flush()
+
+    assert calls == [1]
+    assert redis.lookups == []
+    assert redis.values == {"p:dedup:orders:a": 1}
+
+
+async def test_a_redelivery_handled_elsewhere_is_skipped(redis):
+    redis.values["p:dedup:orders:a"] = 1
+    dedup = Deduplicator(DedupWindow(), prefix="p:dedup:orders", name="o")
+
+    for message in (_message("a", redelivered=True), _message("a")):
+        handled, calls = _counting(dedup, message)
+        await handled()
+        assert calls == []
+    assert redis.lookups == ["p:dedup:orders:a"]  # then the local LRU
+
+
+async def test_retries_are_checked_but_failures_are_not_recorded(redis):
+    dedup = Deduplicator(DedupWindow(), prefix="p", name="o")
+
+    async def failing():
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        await dedup.wrap(failing, lambda: _message("a"))()
+    retried, calls = _counting(dedup, _message("a", **{"x-delivery-count": 1}))
+    await retried()
+    await dedup.flush()
+
+    assert calls == [1]
+    assert redis.lookups == ["p:a"]
+
+
+async def test_local_lru_is_bounded(redis):
+    dedup = Deduplicator(DedupWindow(local_size=2), prefix="p", name="o")
+    for message_id in "abc":
+        await _counting(dedup, _message(message_id))[0]()
+
+    assert list(dedup._seen) == ["b", "c"]
+
+
+async def test_messages_without_a_key_always_run(redis):
+    dedup = Deduplicator(DedupWindow(), prefix="p", name="o")
+    handled, calls = _counting(dedup, _message(None))
+
+    await handled()
+    await handled()
+    await dedup.flush()
+
+    assert calls == [1, 1]
+    assert redis.values == {}
+
+
+async def test_subscriber_skips_a_duplicate_delivery(redis):
+    RabbitSubscriber(
+        RabbitSubscriptable(
+            ENVIRONMENT="test", PROJECT_NAME="p", RABBIT_URI="amqp://localhost"
+        )
+    )
+    calls: list[dict] = []
+    try:
+
+        @RabbitSubscriber.subscriber("orders", dedup=DedupWindow())
+        async def handler(body: dict):
+            calls.append(body)
+
+        async with TestRabbitBroker(RabbitSubscriber.router.broker) as br:
+            for _ in range(2):
+                await br.publish(
+                    {"id": 1},
+                    routing_key="orders",
+                    exchange=RabbitSubscriber.exchange,
+                    message_id="order-1",
+                )
+    finally:
+        RabbitSubscriber.unbind()
+
+    assert calls == [{"id": 1}]
@@ -0,0 +1,218 @@
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from faststream.rabbit import TestRabbitBroker
+from faststream.rabbit.fastapi import RabbitMessage
+
+from fastloom.signals.rabbit.depends import (
+    RabbitSubscriber,
+    RabbitSubscriptable,
+)
+
+
+def _fake_message(routing_key: str, delivery_count: int = 0):
+    headers = {"x-delivery-count": delivery_count} if delivery_count else {}
+    return SimpleNamespace(
+        headers=headers,
+        body=b"payload",
+        message_id="m-1",
+        correlation_id="c-1",
+        content_type="application/json",
+        raw_message=SimpleNamespace(routing_key=routing_key),
+    )
+
+
+def _subscriber(**settings):
+    return RabbitSubscriber(
+        RabbitSubscriptable(
+            ENVIRONMENT="test",
+            PROJECT_NAME="p",
+            RABBIT_URI="amqp://localhost",
+            RABBIT_BUCKETED_DELAYS=True,
+            **settings,
+        ),
+        base_delay=5,
+        max_delay=60,
+    )
+
+
+@pytest.fixture
+def tiers(monkeypatch):
+    tiers = SimpleNamespace(declared=[], published=[], returned=set())
+
+    async def fake_declare_tier_queue(cls, tier):
+        tiers.declared.append(tier)
+        cls._declared_tiers.add(tier)
+
+    async def fake_publish(cls, message, routing_key, tier):
+        if tier not in cls._declared_tiers:
+            await cls._declare_tier_queue(tier)
+        tiers.published.append((routing_key, tier, message.expiration))
+        if tier in tiers.returned:
+            tiers.returned.discard(tier)
+            return False
+        return True
+
+    monkeypatch.setattr(
+        RabbitSubscriber,
+        "_declare_tier_queue",
+        classmethod(fake_declare_tier_queue),
+    )
+    monkeypatch.setattr(
+        RabbitSubscriber, "_publish_to_tier", classmethod(fake_publish)
+    )
+    yield tiers
+    RabbitSubscriber.unbind()
+
+
+async def _fail(routing_key="orders", delivery_count=0):
+    message = _fake_message(routing_key, delivery_count)
+    with pytest.raises(ValueError):
+        await RabbitSubscriber._exc_handler(ValueError("boom"), message)
+
+
+async def test_every_routing_key_shares_the_same_tier_queues(tiers):
+    _subscriber()
+
+    await _fail("orders")
+    await _fail("users")
+    await _fail("orders.p", delivery_count=1)
+
+    assert tiers.declared == [5, 10]
+    assert tiers.published == [
+        ("orders.p", 5, None),
+        ("users.p", 5, None),
+        ("orders.p", 10, None),
+    ]
+
+
+async def test_delays_round_to_the_nearest_configured_tier(tiers):
+    _subscriber(RABBIT_DELAY_TIERS=[60, 15])
+
+    assert RabbitSubscriber._delay_tiers() == [15, 60]
+    for delivery_count, tier in ((0, 15), (1, 15), (2, 15), (3, 60)):
+        await _fail(delivery_count=delivery_count)  # 5, 10, 20, 40
+        assert tiers.published[-1][1] == tier
+
+
+async def test_a_returned_retry_redeclares_its_tier_once(tiers):
+    _subscriber()
+    await _fail()
+    tiers.returned.add(5)
+
+    await _fail()
+
+    assert tiers.declared == [5, 5]
+    assert [tier for _, tier, _ in tiers.published] == [5, 5, 5]
+
+
+async def test_predeclare_only_declares_the_tiers(tiers):
+    _subscriber(RABBIT_PREDECLARE_BACKOFF=True)
+
+    @RabbitSubscriber.subscriber("orders", retry_backoff=True)
+    async def handler(body: dict): ...
+
+    await RabbitSubscriber._start_backoff_ladder(None)
+
+    assert sorted(tiers.declared) == [5, 10, 20, 40, 60]
+    assert RabbitSubscriber._ladder_task is None
+
+
+def _headers_match(arguments, headers):
+    # RabbitMQ's headers exchange: `x-` arguments aren't matched on, unless
+    # x-match is one of the `-with-x` modes
+    mode = arguments.get("x-match", "all")
+    keys = [
+        key
+        for key in arguments
+        if key != "x-match"
+        and (mode.endswith("-with-x") or not key.startswith("x-"))
+    ]
+    found = [key in headers and headers[key] == arguments[key] for key in keys]
+    return all(found) if mode.startswith("all") else any(found)
+
+
+class _HeadersExchange:
+    def __init__(self):
+        self.bindings: dict[str, list[dict]] = {}
+        self.queues: dict[str, list[object]] = {}
+
+    async def publish(self, message, routing_key, mandatory):
+        routed = {
+            queue
+            for queue, bindings in self.bindings.items()
+            for arguments in bindings
+            if _headers_match(arguments, message.headers)
+        }
+        for queue in routed:
+            self.queues.setdefault(queue, []).append(message)
+
+
+class _Queue:
+    def __init__(self, name, exchange):
+        self.name = name
+        self._exchange = exchange
+
+    async def bind(self, exchange, arguments):
+        self._exchange.bindings.setdefault(self.name, []).append(arguments)
+
+
+@pytest.fixture
+def headers_exchange(monkeypatch):
+    exchange = _HeadersExchange()
+
+    async def declare_exchange(name, type, durable):
+        return exchange
+
+    async def get_exchange(name, ensure):
+        return exchange
+
+    async def declare_queue(name, durable, arguments):
+        return _Queue(name, exchange)
+
+    @asynccontextmanager
+    async def acquire():
+        yield SimpleNamespace(
+            declare_exchange=declare_exchange,
+            get_exchange=get_exchange,
+            declare_queue=declare_queue,
+        )
+
+    sub = _subscriber()
+    monkeypatch.setattr(sub._topology_pool, "acquire", acquire)
+    yield exchange
+    RabbitSubscriber.unbind()
+
+
+async def test_a_retry_reaches_only_its_tier_queue(headers_exchange):
+    for tier in RabbitSubscriber._delay_tiers():
+        await RabbitSubscriber._declare_tier_queue(tier)
+    message = SimpleNamespace(headers={"x-delivery-count": 1})
+
+    assert await RabbitSubscriber._publish_to_tier(message, "orders.p", 10)
+
+    assert list(headers_exchange.queues) == ["test_p.delay.10"]
+
+
+async def test_the_tier_header_is_dropped_once_a_retry_is_consumed():
+    _subscriber()
+    seen: list[dict] = []
+
+    @RabbitSubscriber.subscriber("orders", retry_backoff=True)
+    async def handler(body: dict, message: RabbitMessage):
+        seen.append(message.headers)
+
+    try:
+        async with TestRabbitBroker(RabbitSubscriber.router.broker) as br:
+            # as dead-lettered back from a tier queue
+            await br.publish(
+                {},
+                "orders.p",
+                exchange=RabbitSubscriber.exchange,
+                headers={"delay-tier": 10, "x-delivery-count": 1},
+            )
+    finally:
+        RabbitSubscriber.unbind()
+
+    assert seen == [{"x-delivery-count": 1}]
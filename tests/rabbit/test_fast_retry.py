@@ -0,0 +1,113 @@
+import pytest
+from faststream.rabbit import RabbitMessage, TestRabbitBroker
+
+from fastloom.signals.rabbit.depends import (
+    RabbitSubscriber,
+    RabbitSubscriptable,
+)
+from fastloom.signals.rabbit.retry import FastRetry
+
+
+class _Transient(Exception): ...
+
+
+@pytest.fixture(autouse=True)
+def sleeps(monkeypatch):
+    sleeps: list[float] = []
+
+    async def sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr("fastloom.signals.rabbit.retry.asyncio.sleep", sleep)
+    return sleeps
+
+
+def _flaky(failures: list[Exception]):
+    calls: list[int] = []
+
+    async def handler(body: dict):
+        calls.append(1)
+        if failures:
+            raise failures.pop(0)
+        return body
+
+    return handler, calls
+
+
+async def test_transient_failures_are_retried_in_process(sleeps):
+    handler, calls = _flaky([_Transient(), _Transient()])
+    retry = FastRetry((_Transient,), attempts=3, base_delay=0.1)
+
+    assert await retry.wrap(handler, "orders")({"id": 1}) == {"id": 1}
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+    assert 0.09 <= sleeps[0] <= 0.11 and 0.18 <= sleeps[1] <= 0.22
+
+
+async def test_exhausted_retries_raise_into_the_dlx_path(sleeps):
+    handler, calls = _flaky([_Transient()] * 5)
+
+    with pytest.raises(_Transient):
+        await FastRetry((_Transient,), attempts=2).wrap(handler, "orders")({})
+    assert len(calls) == 3
+
+
+async def test_unselected_exceptions_are_not_retried(sleeps):
+    handler, calls = _flaky([ValueError()])
+
+    with pytest.raises(ValueError):
+        await FastRetry((_Transient,)).wrap(handler, "orders")({})
+    assert len(calls) == 1
+    assert sleeps == []
+
+
+def test_wrapped_handler_keeps_its_signature():
+    handler, _ = _flaky([])
+
+    wrapped = FastRetry((_Transient,)).wrap(handler, "orders")
+
+    assert wrapped.__name__ == "handler"
+    assert wrapped.__annotations__ == handler.__annotations__
+
+
+async def test_subscriber_only_hands_exhausted_retries_to_the_dlx(
+    monkeypatch,
+):
+    dead_lettered: list[bytes] = []
+
+    async def fake_exc_handler(cls, exc: Exception, message: RabbitMessage):
+        dead_lettered.append(message.body)
+        raise exc
+
+    monkeypatch.setattr(
+        RabbitSubscriber, "_exc_handler", classmethod(fake_exc_handler)
+    )
+    RabbitSubscriber(
+        RabbitSubscriptable(
+            ENVIRONMENT="test", PROJECT_NAME="p", RABBIT_URI="amqp://localhost"
+        )
+    )
+    failures = {1: 1, 2: 10}
+
+    try:
+
+        @RabbitSubscriber.subscriber(
+            "orders", fast_retry=FastRetry((_Transient,), attempts=2)
+        )
+        async def handler(body: dict):
+            if failures[body["id"]]:
+                failures[body["id"]] -= 1
+                raise _Transient
+
+        async with TestRabbitBroker(RabbitSubscriber.router.broker) as br:
+            await br.publish(
+                {"id": 1}, "orders", exchange=RabbitSubscriber.exchange
+            )
+            with pytest.raises(_Transient):
+                await br.publish(
+                    {"id": 2}, "orders", exchange=RabbitSubscriber.exchange
+                )
+    finally:
+        RabbitSubscriber.unbind()
+
+    assert dead_lettered == [b'{"id":2}']
@@ -0,0 +1,136 @@
+from types import SimpleNamespace
+
+import pytest
+from opentelemetry import trace
+from opentelemetry.trace import (
+    NonRecordingSpan,
+    SpanContext,
+    TraceFlags,
+)
+from pydantic import BaseModel
+
+from fastloom.signals.rabbit.middlewares import (
+    RabbitPayloadTelemetrySettingsProvider,
+    message_body_to_str,
+)
+from fastloom.signals.rabbit.settings import RabbitmqSettings
+
+BODY = "messaging.message.body"
+
+
+class _Order(BaseModel):
+    id: int
+    note: str = ""
+
+
+def _provider(**kwargs):
+    return RabbitPayloadTelemetrySettingsProvider(
+        RabbitmqSettings(RABBIT_URI="amqp://localhost", **kwargs)
+    )
+
+
+def _message(body: bytes, routing_key="orders.create", headers=None):
+    return SimpleNamespace(
+        body=body,
+        headers=headers or {},
+        message_id="1",
+        correlation_id="1",
+        raw_message=SimpleNamespace(
+            routing_key=routing_key, delivery_tag=1, exchange="amq.topic"
+        ),
+    )
+
+
+def _command(body, routing_key="orders.create"):
+    return SimpleNamespace(
+        body=body,
+        destination=routing_key,
+        correlation_id="1",
+        exchange=SimpleNamespace(name="amq.topic"),
+    )
+
+
+def test_without_settings_the_whole_body_is_captured():
+    provider = RabbitPayloadTelemetrySettingsProvider()
+
+    attrs = provider.get_consume_attrs_from_message(_message(b"x" * 1000))
+
+    assert attrs[BODY] == "x" * 1000
+
+
+def test_bodies_over_max_bytes_are_truncated():
+    provider = _provider(RABBIT_PAYLOAD_CAPTURE_MAX_BYTES=10)
+
+    attrs = provider.get_publish_attrs_from_cmd(
+        _command(_Order(id=1, note="x" * 100))
+    )
+
+    assert attrs[BODY] == '{"id":1,"n'
+    assert attrs["messaging.message.body.truncated"] is True
+    short = provider.get_consume_attrs_from_message(_message(b"short"))
+    assert short[BODY] == "short"
+    assert "messaging.message.body.truncated" not in short
+
+
+def test_models_over_max_bytes_stop_serializing_at_the_cap():
+    class _Batch(BaseModel):
+        orders: list[_Order]
+
+    batch = _Batch(orders=[_Order(id=i, note="ü") for i in range(10_000)])
+
+    rendered = message_body_to_str(batch, 50)
+
+    assert 50 < len(rendered) < 100
+    assert batch.model_dump_json().startswith(rendered)
+
+
+@pytest.mark.parametrize(
+    ("allow", "deny", "captured"),
+    [
+        ([], [], True),
+        (["orders.*"], [], True),
+        (["users.#"], [], False),
+        ([], ["#.create"], False),
+        (["orders.#"], ["orders.create"], False),
+    ],
+)
+def test_routing_key_allow_and_deny_lists(allow, deny, captured):
+    provider = _provider(
+        RABBIT_PAYLOAD_CAPTURE_ALLOW=allow, RABBIT_PAYLOAD_CAPTURE_DENY=deny
+    )
+
+    attrs = provider.get_consume_attrs_from_message(_message(b"{}"))
+
+    assert (BODY in attrs) is captured
+
+
+def test_unsampled_bodies_are_never_serialized(monkeypatch):
+    provider = _provider(RABBIT_PAYLOAD_CAPTURE_SAMPLE_RATE=0.5)
+    monkeypatch.setattr("random.random", lambda: 0.9)
+
+    class _Unserializable:
+        def __str__(self):
+            raise AssertionError("serialized")
+
+    attrs = provider.get_publish_attrs_from_cmd(_command(_Unserializable()))
+
+    assert BODY not in attrs
+
+
+def test_unsampled_parent_spans_skip_capture():
+    provider = _provider()
+    parent = SpanContext(
+        trace_id=1, span_id=1, is_remote=False, trace_flags=TraceFlags(0)
+    )
+
+    with trace.use_span(NonRecordingSpan(parent)):
+        attrs = provider.get_publish_attrs_from_cmd(_command({"id": 1}))
+    consumed = provider.get_consume_attrs_from_message(
+        _message(
+            b"{}",
+            headers={"traceparent": f"00-{1:032x}-{1:016x}-00"},
+        )
+    )
+
+    assert BODY not in attrs
+    assert BODY not in consumed
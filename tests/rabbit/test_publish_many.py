@@ -0,0 +1,124 @@
+import asyncio
+import gzip
+import json
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from aio_pika.exceptions import DeliveryError
+from aiormq.abc import DeliveredMessage
+from pydantic import BaseModel
+
+from fastloom.signals.rabbit.batch import UnroutableMessage
+from fastloom.signals.rabbit.depends import (
+    RabbitSubscriber,
+    RabbitSubscriptable,
+)
+
+
+class _Order(BaseModel):
+    id: int
+
+
+class _FakeExchange:
+    def __init__(self):
+        self.sent: list[tuple[str, bytes]] = []
+        self.messages: list = []
+        self.outcomes: dict[int, object] = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def publish(self, message, routing_key, mandatory, timeout):
+        index = len(self.sent)
+        self.sent.append((routing_key, message.body))
+        self.messages.append(message)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0)  # confirm arrives later
+        self.in_flight -= 1
+        outcome = self.outcomes.get(index)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def exchange(monkeypatch):
+    exchange = _FakeExchange()
+
+    async def get_exchange(name, ensure):
+        return exchange
+
+    @asynccontextmanager
+    async def acquire():
+        yield SimpleNamespace(get_exchange=get_exchange)
+
+    settings = RabbitSubscriptable(
+        ENVIRONMENT="test", PROJECT_NAME="p", RABBIT_URI="amqp://localhost"
+    )
+    sub = RabbitSubscriber(settings)
+    monkeypatch.setattr(sub._topology_pool, "acquire", acquire)
+    yield exchange
+    RabbitSubscriber.unbind()
+
+
+async def test_publish_many_pipelines_confirms(exchange):
+    failures = await RabbitSubscriber.publish_many(
+        "orders", [_Order(id=i) for i in range(5)]
+    )
+
+    assert failures == []
+    assert exchange.max_in_flight == 5  # none awaited before the next send
+    assert [json.loads(body) for _, body in exchange.sent] == [
+        {"id": i} for i in range(5)
+    ]
+
+
+async def test_publish_many_reports_per_message_failures(exchange):
+    nack = DeliveryError(None, None)
+    exchange.outcomes = {
+        1: nack,
+        3: DeliveredMessage.__new__(DeliveredMessage),
+    }
+
+    failures = await RabbitSubscriber.publish_many("orders", range(5))
+
+    assert [(f.index, f.routing_key) for f in failures] == [
+        (1, "orders"),
+        (3, "orders"),
+    ]
+    assert failures[0].error is nack
+    assert isinstance(failures[1].error, UnroutableMessage)
+
+
+async def test_batch_flushes_mixed_routing_keys_on_exit(exchange):
+    async with RabbitSubscriber.batch() as batch:
+        batch.publish("orders", {"id": 1})
+        batch.publish("users", {"id": 2})
+        assert exchange.sent == []
+
+    assert [key for key, _ in exchange.sent] == ["orders", "users"]
+    assert batch.failures == []
+
+
+async def test_batch_is_dropped_when_the_block_raises(exchange):
+    with pytest.raises(RuntimeError):
+        async with RabbitSubscriber.batch() as batch:
+            batch.publish("orders", {"id": 1})
+            raise RuntimeError
+
+    assert exchange.sent == []
+
+
+async def test_publish_many_runs_the_broker_publish_middlewares(exchange):
+    body = {"id": 1, "note": "x" * 4096}
+
+    await RabbitSubscriber.publish_many("orders", [body], compression="gzip")
+    await RabbitSubscriber.publish_many("orders", [{"id": 2}])
+
+    compressed, plain = exchange.messages
+    assert compressed.content_encoding == "gzip"
+    assert json.loads(gzip.decompress(compressed.body)) == body
+    assert plain.content_encoding is None
+    assert json.loads(plain.body) == {"id": 2}
+    assert compressed.correlation_id != plain.correlation_id
@@ -0,0 +1,123 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from faststream.rabbit import TestRabbitBroker
+
+from fastloom.signals.rabbit.depends import (
+    RabbitSubscriber,
+    RabbitSubscriptable,
+)
+from fastloom.signals.rabbit.rpc import REPLY_QUEUE, RpcClient, RpcError
+
+
+def _reply(correlation_id, body):
+    async def decode():
+        return body
+
+    return SimpleNamespace(
+        correlation_id=correlation_id, headers={}, decode=decode
+    )
+
+
+@pytest.fixture
+def rpc():
+    RabbitSubscriber(
+        RabbitSubscriptable(
+            ENVIRONMENT="test",
+            PROJECT_NAME="p",
+            RABBIT_URI="amqp://localhost",
+            RABBIT_RPC=True,
+        )
+    )
+
+    @RabbitSubscriber.rpc_subscriber("math.double")
+    async def double(body: dict) -> dict:
+        if body["x"] < 0:
+            raise ValueError("negative")
+        return {"y": body["x"] * 2}
+
+    yield RabbitSubscriber
+    RabbitSubscriber.unbind()
+
+
+async def test_concurrent_calls_get_their_own_replies(rpc):
+    async with TestRabbitBroker(RabbitSubscriber.router.broker):
+        replies = await asyncio.gather(
+            *(RabbitSubscriber.rpc("math.double", {"x": x}) for x in range(5))
+        )
+
+    assert replies == [{"y": 2 * x} for x in range(5)]
+    assert RabbitSubscriber._rpc.pending == {}
+
+
+async def test_handler_errors_reach_the_caller(rpc):
+    async with TestRabbitBroker(RabbitSubscriber.router.broker):
+        with pytest.raises(RpcError) as raised:
+            await RabbitSubscriber.rpc("math.double", {"x": -1})
+
+    assert raised.value.error == "ValueError"
+    assert raised.value.detail == "negative"
+
+
+async def test_requests_ask_for_a_direct_reply():
+    sent: list[dict] = []
+
+    async def publish(payload, **kwargs):
+        sent.append(kwargs)
+        client.resolve(_reply(kwargs["correlation_id"], payload))
+
+    client = RpcClient(publish, max_in_flight=4)
+
+    assert await client.call("echo", {"a": 1}, timeout=2) == {"a": 1}
+    (kwargs,) = sent
+    assert kwargs["reply_to"] == REPLY_QUEUE
+    assert kwargs["expiration"] == 2
+
+
+async def test_calls_past_max_in_flight_wait_for_a_slot():
+    sent: list[str] = []
+
+    async def publish(payload, correlation_id, **kwargs):
+        sent.append(correlation_id)
+
+    client = RpcClient(publish, max_in_flight=2)
+    calls = [asyncio.create_task(client.call("k", i, 1)) for i in range(3)]
+    await asyncio.sleep(0)
+    assert len(sent) == 2
+
+    client.resolve(_reply(sent[0], "first"))
+    await asyncio.sleep(0.01)
+    assert len(sent) == 3
+
+    for correlation_id in sent[1:]:
+        client.resolve(_reply(correlation_id, "rest"))
+    assert await asyncio.gather(*calls) == ["first", "rest", "rest"]
+
+
+async def test_timed_out_calls_free_their_slot_and_drop_late_replies():
+    sent: list[str] = []
+
+    async def publish(payload, correlation_id, **kwargs):
+        sent.append(correlation_id)
+
+    client = RpcClient(publish, max_in_flight=1)
+    with pytest.raises(TimeoutError):
+        await client.call("k", None, timeout=0.01)
+
+    client.resolve(_reply(sent[0], "late"))
+    assert client.pending == {}
+    assert client._slots._value == 1
+
+
+def test_rpc_needs_the_setting():
+    RabbitSubscriber(
+        RabbitSubscriptable(
+            ENVIRONMENT="test", PROJECT_NAME="p", RABBIT_URI="amqp://localhost"
+        )
+    )
+    try:
+        with pytest.raises(RuntimeError):
+            asyncio.run(RabbitSubscriber.rpc("k", None))
+    finally:
+        RabbitSubscriber.unbind()
@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+
+from fastloom.signals.rabbit.depends import (
+    RabbitSubscriber,
+    RabbitSubscriptable,
+)
+from fastloom.signals.rabbit.stream import StreamOffsetTracker
+
+
+class _MemoryStore:
+    def __init__(self, **offsets: int):
+        self.offsets = dict(offsets)
+
+    async def load(self, key):
+        return self.offsets.get(key)
+
+    async def save(self, key, offset):
+        self.offsets[key] = offset
+
+
+@pytest.fixture
+def subscriber():
+    RabbitSubscriber(
+        RabbitSubscriptable(
+            ENVIRONMENT="test",
+            PROJECT_NAME="p",
+            RABBIT_URI="amqp://localhost",
+            RABBIT_INSTANCE_ID="pod",
+        )
+    )
+    yield RabbitSubscriber
+    RabbitSubscriber.unbind()
+
+
+async def test_offset_never_passes_a_delivery_still_in_flight():
+    tracker = StreamOffsetTracker(_MemoryStore(), "k", interval=60)
+    offsets = iter([10, 11, 12])
+    release = {offset: asyncio.Event() for offset in (10, 11, 12)}
+
+    async def handler(offset):
+        await release[offset].wait()
+
+    tracked = tracker.wrap(handler, lambda: next(offsets))
+    tasks = [asyncio.create_task(tracked(o)) for o in (10, 11, 12)]
+    await asyncio.sleep(0)
+
+    release[11].set()
+    release[12].set()
+    await asyncio.sleep(0)
+    await tracker.flush()
+    assert tracker.store.offsets == {"k": 9}
+
+    release[10].set()
+    await asyncio.gather(*tasks)
+    await tracker.flush()
+    assert tracker.store.offsets == {"k": 12}
+
+
+async def test_failed_deliveries_still_advance_the_offset():
+    tracker = StreamOffsetTracker(_MemoryStore(), "k", interval=60)
+
+    async def handler():
+        raise ValueError
+
+    with pytest.raises(ValueError):
+        await tracker.wrap(handler, lambda: 5)()
+    await tracker.flush()
+
+    assert tracker.store.offsets == {"k": 5}
+
+
+async def test_resume_offset_prefers_the_stored_one():
+    tracker = StreamOffsetTracker(_MemoryStore(k=41), "k", interval=60)
+    fresh = StreamOffsetTracker(_MemoryStore(), "k", interval=60)
+
+    assert await tracker.resume_offset("first") == 42
+    assert await fresh.resume_offset("first") == "first"
+
+
+async def test_stream_subscriber_resumes_from_the_stored_offset(
+    subscriber, monkeypatch
+):
+    started: list[dict] = []
+
+    async def start(self):
+        started.append(dict(self.consume_args))
+
+    monkeypatch.setattr(
+        "faststream.rabbit.subscriber.usecase.RabbitSubscriber.start", start
+    )
+    monkeypatch.setattr(
+        "fastloom.signals.rabbit.depends.claim_worker_slot",
+        lambda name: 3,
+    )
+    store = _MemoryStore(
+        **{
+            # another replica's offset
+            "p:stream_offset:test_p.feed:other-0": 7,
+            "p:stream_offset:test_p.feed:pod-3": 99,
+        }
+    )
+
+    @RabbitSubscriber.stream_subscriber(
+        "feed", prefetch=500, offset_store=store
+    )
+    async def handler(body: dict): ...
+
+    (stream,) = RabbitSubscriber.router.broker.subscribers
+    await stream.start()
+    for hook in RabbitSubscriber.router._on_shutdown_hooks:
+        await hook(None)
+
+    assert stream.queue.arguments["x-queue-type"] == "stream"
+    assert stream.channel.prefetch_count == 500
+    assert started == [{"x-stream-offset": 100}]
+
+
+def test_stream_subscriber_owns_its_channel(subscriber):
+    with pytest.raises(ValueError):
+        RabbitSubscriber.stream_subscriber("feed", channel=object())
+
+
+async def test_a_named_stream_consumer_shares_its_offset(
+    subscriber, monkeypatch
+):
+    started: list[dict] = []
+
+    async def start(self):
+        started.append(dict(self.consume_args))
+
+    monkeypatch.setattr(
+        "faststream.rabbit.subscriber.usecase.RabbitSubscriber.start", start
+    )
+    store = _MemoryStore(**{"p:stream_offset:readers": 5})
+
+    @RabbitSubscriber.stream_subscriber(
+        "feed", offset_store=store, consumer_name="readers"
+    )
+    async def handler(body: dict): ...
+
+    (stream,) = RabbitSubscriber.router.broker.subscribers
+    await stream.start()
+    for hook in RabbitSubscriber.router._on_shutdown_hooks:
+        await hook(None)
+
+    assert started == [{"x-stream-offset": 6}]
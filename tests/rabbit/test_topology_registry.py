@@ -0,0 +1,93 @@
+from types import SimpleNamespace
+
+import pytest
+
+from fastloom.signals.rabbit.depends import (
+    RabbitSubscriber,
+    RabbitSubscriptable,
+)
+
+
+@pytest.fixture
+def subscriber(monkeypatch):
+    declared: list[tuple[str, int]] = []
+    routable: list[bool] = []
+    published: list[str] = []
+    clock = SimpleNamespace(now=1000.0)
+
+    async def fake_get_dlx_queue(cls, routing_key, delay, fallback=False):
+        declared.append((routing_key, delay))
+        return SimpleNamespace(
+            name=f"{routing_key}.{delay}",
+            arguments={
+                "x-message-ttl": delay * 1000,
+                "x-expires": delay * 2000,
+            },
+        )
+
+    async def fake_publish_retry(cls, message, queue):
+        published.append(queue.name)
+        return routable.pop(0) if routable else True
+
+    monkeypatch.setattr(
+        RabbitSubscriber, "_get_dlx_queue", classmethod(fake_get_dlx_queue)
+    )
+    monkeypatch.setattr(
+        RabbitSubscriber, "_publish_retry", classmethod(fake_publish_retry)
+    )
+    monkeypatch.setattr(
+        "fastloom.signals.rabbit.depends.time.monotonic", lambda: clock.now
+    )
+
+    settings = RabbitSubscriptable(
+        ENVIRONMENT="test", PROJECT_NAME="p", RABBIT_URI="amqp://localhost"
+    )
+    sub = RabbitSubscriber(settings, base_delay=1, max_delay=8)
+    sub.declared = declared  # type: ignore[attr-defined]
+    sub.routable = routable  # type: ignore[attr-defined]
+    sub.published = published  # type: ignore[attr-defined]
+    sub.clock = clock  # type: ignore[attr-defined]
+    yield sub
+    RabbitSubscriber.unbind()
+
+
+async def _fail(subscriber, routing_key="foo", delivery_count=0):
+    message = SimpleNamespace(
+        headers={"x-delivery-count": delivery_count} if delivery_count else {},
+        body=b"payload",
+        message_id="m-1",
+        correlation_id="c-1",
+        content_type="application/json",
+        raw_message=SimpleNamespace(routing_key=routing_key),
+    )
+    with pytest.raises(ValueError):
+        await subscriber._exc_handler(ValueError("boom"), message)
+
+
+async def test_hot_retry_path_declares_each_delay_queue_once(subscriber):
+    for _ in range(3):
+        await _fail(subscriber)
+
+    assert subscriber.declared == [("foo", 1)]
+    assert subscriber.published == ["foo.1"] * 3
+
+
+async def test_entry_is_trusted_for_x_expires_minus_message_ttl(subscriber):
+    await _fail(subscriber, delivery_count=2)  # delay 4 -> x-expires 8s
+    subscriber.clock.now += 3.9
+    await _fail(subscriber, delivery_count=2)
+    assert subscriber.declared == [("foo", 4)]
+
+    subscriber.clock.now += 0.1  # 4s: a message now would outlive the queue
+    await _fail(subscriber, delivery_count=2)
+    assert subscriber.declared == [("foo", 4), ("foo", 4)]
+
+
+async def test_unroutable_return_redeclares_and_republishes(subscriber):
+    await _fail(subscriber)
+    subscriber.routable.append(False)  # basic.return from the broker
+
+    await _fail(subscriber)
+
+    assert subscriber.declared == [("foo", 1), ("foo", 1)]
+    assert subscriber.published == ["foo.1"] * 3
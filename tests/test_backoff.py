@@ -1,4 +1,4 @@
-from fastloom.utils import exponential_backoff
+from fastloom.utils import backoff_ladder, exponential_backoff
 
 
 def test_exponential_backoff_doubles_across_several_attempts():
@@ -17,3 +17,8 @@ def test_exponential_backoff_caps_at_max_delay():
     ]
 
     assert delays == [1, 2, 4, 8, 8, 8, 8]
+
+
+def test_backoff_ladder_lists_each_delay_up_to_max_delay():
+    assert backoff_ladder(base_delay=5, max_delay=30) == [5, 10, 20, 30]
+    assert backoff_ladder(base_delay=5, max_delay=5) == [5]
@@ -1,5 +1,6 @@
-from unittest.mock import MagicMock, Mock
+from unittest.mock import AsyncMock, MagicMock, Mock
 
+import pytest
 from fastapi import APIRouter
 
 import fastloom.launcher.main as launcher_main
@@ -52,3 +53,23 @@ def test_app_instruments_and_constructs_subscribers_before_get_app(
         for name in ("setup_brokers", "get_app", "InitMonitoring")
     ]
     assert positions == sorted(positions)
+
+
+async def test_an_outbox_without_redis_fails_at_startup(monkeypatch):
+    configs = MagicMock(documents_enabled=True, cache_enabled=False)
+    configs.__getitem__.return_value.general.MONGO_OUTBOX = True
+    start_outbox_relays = AsyncMock()
+    monkeypatch.setattr(launcher_main, "Configs", configs)
+    monkeypatch.setattr(launcher_main, "init_streams", Mock())
+    monkeypatch.setattr(
+        launcher_main, "get_app", Mock(return_value=Mock(load=AsyncMock()))
+    )
+    monkeypatch.setattr(
+        launcher_main, "start_outbox_relays", start_outbox_relays
+    )
+
+    with pytest.raises(RuntimeError, match="MONGO_OUTBOX needs Redis"):
+        async with launcher_main.lifespan(Mock()):
+            pass
+
+    start_outbox_relays.assert_not_called()
@@ -19,8 +19,13 @@ _MODULES = (
     "fastloom.signals.rabbit.depends",
     "fastloom.signals.rabbit.middlewares",
     "fastloom.signals.rabbit.healthcheck",
+    "fastloom.signals.rabbit.pool",
+    "fastloom.signals.rabbit.adaptive",
+    "fastloom.signals.rabbit.compression",
     "fastloom.signals.kafka.depends",
     "fastloom.signals.kafka.healthcheck",
+    "fastloom.signals.route",
+    "fastloom.signals.slots",
     "fastloom.db.signals",
     "fastloom.file.signals",
     "fastloom.tenant.depends",
@@ -0,0 +1,10 @@
+from fastloom.signals.slots import claim_worker_slot
+
+
+def test_a_worker_slot_is_the_lowest_one_free(tmp_path):
+    claim = claim_worker_slot.__wrapped__
+
+    assert claim("svc", str(tmp_path)) == 0
+    # held by the first claim's lock, as if by another worker
+    assert claim("svc", str(tmp_path)) == 1
+    assert claim("other", str(tmp_path)) == 0